@@ -0,0 +1 @@
+"""Micro benchmarks for hello-litestar-htmx."""
@@ -0,0 +1,116 @@
+"""依存性注入のコスト比較（リクエストごとの生成 vs lifespan で作成済みのリソース）
+
+``todo_service`` を注入するだけのハンドラを提供方法の異なる3つのアプリで用意し、ASGI アプリを
+直接呼び出して1秒あたりのリクエスト数を比較します。
+
+- per-request: 旧来の ``provide_todo_service``（毎回 ``TodoService`` を生成）
+- state: ``state`` を注入して ``state.resources`` から作成済みのサービスを返す
+- lifespan: ``ResourceRegistry`` が起動時に作成したサービスを引数なしで返す
+
+HTTP クライアントを挟まないので、差はほぼ DI とハンドラ呼び出しのコストです。
+
+    uv run python -m benchmarks.bench_di
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+
+from litestar import Litestar, get
+from litestar.datastructures import State
+from litestar.di import Provide
+
+from hello_litestar_htmx.repositories.todo import InMemoryTodoRepository
+from hello_litestar_htmx.resources import AppResources, ResourceRegistry
+from hello_litestar_htmx.services.jobs import JobRunner
+from hello_litestar_htmx.services.todo import TodoService
+
+REQUESTS = 20_000
+PROVIDER_CALLS = 1_000_000
+
+_repository = InMemoryTodoRepository()
+_jobs = JobRunner()
+_registry = ResourceRegistry()
+_registry.resources = AppResources(repository=_repository, jobs=_jobs)
+
+
+def provide_todo_service_per_request() -> TodoService:
+    return TodoService(_repository, _jobs)
+
+
+def provide_todo_service_from_state(state: State) -> TodoService:
+    return state.resources.todo_service
+
+
+@get("/service", sync_to_thread=False)
+def handler(todo_service: TodoService) -> str:
+    return "ok"
+
+
+def _make_app(provider: Callable[..., TodoService]) -> Litestar:
+    app = Litestar(
+        route_handlers=[handler],
+        dependencies={"todo_service": Provide(provider, sync_to_thread=False)},
+    )
+    app.state.resources = _registry.resources
+    return app
+
+
+async def _requests_per_sec(app: Litestar, n: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/service",
+        "raw_path": b"/service",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    for _ in range(1_000):
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return n / (time.perf_counter() - start)
+
+
+def _provider_ns(func: Callable[[], TodoService], n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def main() -> None:
+    state = _make_app(provide_todo_service_per_request).state
+    providers = (
+        ("per-request", provide_todo_service_per_request, provide_todo_service_per_request),
+        ("state", provide_todo_service_from_state, lambda: provide_todo_service_from_state(state)),
+        ("lifespan", _registry.provide_todo_service, _registry.provide_todo_service),
+    )
+
+    print(f"{'provider':<14}{'req/s':>12}{'ns/provide':>14}")
+    baseline = None
+    for name, provider, call in providers:
+        rps = asyncio.run(_requests_per_sec(_make_app(provider), REQUESTS))
+        ns = _provider_ns(call, PROVIDER_CALLS)
+        baseline = baseline or rps
+        print(f"{name:<14}{rps:>12,.0f}{ns:>14,.0f}  ({rps / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""フォームのパース + バリデーションのマイクロベンチマーク
+
+POST /todos のボディを「untyped dict + TodoCreate」で処理する旧経路と、
+msgspec の TodoCreateForm に直接デコードして ``to_model()`` する新経路を比較します。
+
+    uv run python -m benchmarks.bench_form_validation
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+
+import msgspec
+from pydantic import ValidationError
+
+from hello_litestar_htmx.models.todo import TodoCreate, TodoCreateForm
+
+VALID = {"title": "  Litestarを学ぶ  ", "_csrf_token": "x" * 128}
+INVALID = {"title": "   ", "_csrf_token": "x" * 128}
+
+
+def _dict_path(data: dict) -> None:
+    # Litestar が Annotated[dict, Body(...)] に対して行う変換と同じ
+    form = msgspec.convert(data, dict, strict=False)
+    try:
+        TodoCreate(title=form.get("title", ""))
+    except ValidationError as e:
+        _ = e.errors()[0]["msg"] if e.errors() else "入力エラー"
+
+
+def _form_path(data: dict) -> None:
+    form = msgspec.convert(data, TodoCreateForm, strict=False)
+    try:
+        form.to_model()
+    except ValidationError as e:
+        errors = e.errors()
+        _ = errors[0]["msg"] if errors else "入力エラー"
+
+
+def _ops_per_sec(func: Callable[[dict], None], data: dict, n: int = 100_000) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        func(data)
+    return n / (time.perf_counter() - start)
+
+
+def main() -> None:
+    print(f"{'path':<8}{'valid/s':>14}{'invalid/s':>14}")
+    for name, func in (("dict", _dict_path), ("form", _form_path)):
+        valid = _ops_per_sec(func, VALID)
+        invalid = _ops_per_sec(func, INVALID, n=20_000)
+        print(f"{name:<8}{valid:>14,.0f}{invalid:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
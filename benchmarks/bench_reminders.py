@@ -0,0 +1,129 @@
+"""リマインダーのスケジューリングコスト（保留中のリマインダー数に対して）
+
+保留中のリマインダーを N 件（すべて1時間以上先）登録したリポジトリで、次を計測します。
+
+- wake: スケジューラが1回起きたときのコスト（``pop_due`` + ``next_due``、何も発火しない）
+- fire: 期限が来たリマインダー1件を取り出すコスト
+- reschedule: 期限の変更1件のコスト（ヒープへの追加 + 古いエントリの遅延削除）
+- scan: 比較用。タイマーで毎回全件を走査して期限切れを探す素朴な方法の1回分
+- late p99: 実際の ``ReminderScheduler`` で、0〜0.5秒後に期限が来る200件が何ms遅れて発火したか
+
+ヒープ方式のコストは N にほぼ依存せず（O(log N)）、走査方式は N に比例します。
+
+    uv run python -m benchmarks.bench_reminders --sizes 1000,10000,100000,1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import UTC, datetime, timedelta
+
+from hello_litestar_htmx.models.todo import TodoImport, TodoUpdate
+from hello_litestar_htmx.repositories.todo import InMemoryTodoRepository
+from hello_litestar_htmx.services.reminders import ReminderScheduler
+
+OPS = 2_000
+LATENESS_REMINDERS = 200
+
+
+def _populate(size: int) -> InMemoryTodoRepository:
+    repository = InMemoryTodoRepository()
+    start = datetime.now(UTC) + timedelta(hours=1)
+    repository.create_many(
+        TodoImport(title=f"todo {i}", due_at=start + timedelta(seconds=i)) for i in range(size)
+    )
+    return repository
+
+
+def _per_op_us(func, n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        func(i)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def _wake_us(repository: InMemoryTodoRepository) -> float:
+    def wake(_: int) -> None:
+        repository.pop_due(time.time(), 100)
+        repository.next_due()
+
+    return _per_op_us(wake, OPS)
+
+
+def _reschedule_us(repository: InMemoryTodoRepository, size: int) -> float:
+    later = datetime.now(UTC) + timedelta(days=1)
+    updates = [TodoUpdate(due_at=later + timedelta(seconds=i)) for i in range(OPS)]
+    return _per_op_us(lambda i: repository.update(i % size + 1, updates[i]), OPS)
+
+
+def _fire_us(repository: InMemoryTodoRepository, size: int) -> float:
+    past = datetime.now(UTC) - timedelta(seconds=1)
+    count = min(OPS, size)
+    for i in range(count):
+        repository.update(i + 1, TodoUpdate(due_at=past))
+    start = time.perf_counter()
+    fired = repository.pop_due(time.time(), count)
+    elapsed = time.perf_counter() - start
+    assert len(fired) == count
+    return elapsed / count * 1e6
+
+
+def _scan_us(repository: InMemoryTodoRepository) -> float:
+    now = datetime.now(UTC)
+    start = time.perf_counter()
+    due = [t for t in repository.get_all() if t.due_at is not None and t.due_at <= now]
+    elapsed = time.perf_counter() - start
+    assert not due
+    return elapsed * 1e6
+
+
+async def _lateness_ms(repository: InMemoryTodoRepository) -> float:
+    scheduler = ReminderScheduler(repository)
+    base = repository.count() + 1
+    now = datetime.now(UTC)
+    expected: dict[int, float] = {}
+    for i in range(LATENESS_REMINDERS):
+        due_at = now + timedelta(seconds=0.1 + 0.4 * i / LATENESS_REMINDERS)
+        repository.update(base - 1 - i, TodoUpdate(due_at=due_at))
+        expected[base - 1 - i] = due_at.timestamp()
+
+    late: list[float] = []
+    received = scheduler.subscribe()
+    scheduler.start()
+    try:
+        while len(late) < LATENESS_REMINDERS:
+            batch = await anext(received)
+            fired_at = time.time()
+            late.extend((fired_at - expected[t.id]) * 1000 for t in batch)
+    finally:
+        await received.aclose()
+        await scheduler.stop()
+    return statistics.quantiles(late, n=100, method="inclusive")[98]
+
+
+def main(sizes: list[int]) -> None:
+    print(
+        f"{'pending':>10}{'wake µs':>10}{'fire µs':>10}{'resched µs':>12}"
+        f"{'scan µs':>12}{'late p99':>11}"
+    )
+    for size in sizes:
+        repository = _populate(size)
+        wake = _wake_us(repository)
+        scan = _scan_us(repository)
+        reschedule = _reschedule_us(repository, size)
+        fire = _fire_us(repository, size)
+        late = asyncio.run(_lateness_ms(repository))
+        print(
+            f"{size:>10,}{wake:>10.2f}{fire:>10.2f}{reschedule:>12.2f}"
+            f"{scan:>12,.0f}{late:>9.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    args = parser.parse_args()
+    main([int(size) for size in args.sizes.split(",")])
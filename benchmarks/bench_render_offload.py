@@ -0,0 +1,129 @@
+"""大きなテンプレート描画中のイベントループ遅延（インライン描画 vs スレッドプール描画）
+
+Todo を ``--todos`` 件登録し、``GET /todos`` の大きなページ描画を ``--concurrency`` 本並行して
+流し続けながら、同じイベントループで次の2つを計測します。
+
+- loop lag: 1ms ごとに起きるティッカーの寝過ごし時間（イベントループが止まっていた時間）
+- /hello: 小さなフラグメントを返すリクエストのレイテンシ
+
+``offload_threshold`` を描画件数より大きくした場合（inline）と 0 にした場合（offload）を比較します。
+ASGI アプリを直接呼び出すので HTTP クライアントのコストは含みません。
+
+    uv run python -m benchmarks.bench_render_offload --todos 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from hello_litestar_htmx.app import app, resources
+from hello_litestar_htmx.models.todo import TodoCreate
+from hello_litestar_htmx.rendering import RenderConfig
+
+TICK = 0.001
+
+
+def _scope(path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+
+async def _get(path: str) -> float:
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    start = time.perf_counter()
+    await app(_scope(path), receive, send)
+    return time.perf_counter() - start
+
+
+async def _ticker(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def _large_renders(stop: asyncio.Event, durations: list[float]) -> None:
+    while not stop.is_set():
+        durations.append(await _get("/todos"))
+
+
+async def _small_requests(latencies: list[float], stop: asyncio.Event) -> None:
+    # 送信予定時刻から数えるので、ループが止まっていて送れなかった時間も含む
+    while not stop.is_set():
+        due = time.perf_counter() + TICK
+        await asyncio.sleep(TICK)
+        await _get("/hello")
+        latencies.append(time.perf_counter() - due)
+
+
+def _ms(values: list[float], quantile: float) -> float:
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[int(quantile * 100) - 1] * 1000
+
+
+async def _run(threshold: int, concurrency: int, seconds: float) -> tuple[list, list, list]:
+    resources.resources.renderer.config = RenderConfig(offload_threshold=threshold)
+    stop = asyncio.Event()
+    lags: list[float] = []
+    latencies: list[float] = []
+    renders: list[float] = []
+    tasks = [
+        asyncio.create_task(_ticker(lags, stop)),
+        asyncio.create_task(_small_requests(latencies, stop)),
+        *(asyncio.create_task(_large_renders(stop, renders)) for _ in range(concurrency)),
+    ]
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return lags, latencies, renders
+
+
+async def main(todos: int, concurrency: int, seconds: float) -> None:
+    async with resources.lifespan(app):
+        service = resources.resources.todo_service
+        for i in range(todos):
+            service.create_todo(TodoCreate(title=f"todo {i}"))
+        await _get("/todos")
+
+        print(f"{todos:,} todos, {concurrency} concurrent /todos renders, {seconds:.0f}s each")
+        print(
+            f"{'mode':<10}{'lag p50':>10}{'lag p99':>10}{'lag max':>10}"
+            f"{'/hello p50':>12}{'/hello p99':>12}{'/todos/s':>10}"
+        )
+        for name, threshold in (("inline", todos + 1), ("offload", 0)):
+            lags, latencies, renders = await _run(threshold, concurrency, seconds)
+            print(
+                f"{name:<10}{_ms(lags, 0.5):>8.1f}ms{_ms(lags, 0.99):>8.1f}ms"
+                f"{max(lags) * 1000:>8.1f}ms{_ms(latencies, 0.5):>10.1f}ms"
+                f"{_ms(latencies, 0.99):>10.1f}ms{len(renders) / seconds:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--todos", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.todos, args.concurrency, args.seconds))
@@ -0,0 +1,91 @@
+"""インポート/エクスポートのスループットとメモリのベンチマーク
+
+エクスポートはリポジトリからのバッチ読み出し + エンコード、インポートはチャンク単位の
+パース + バリデーション + 空のリポジトリへの追加（`create_many`）を計測します。
+ピークメモリは tracemalloc で、処理中に追加で確保された量（元のリポジトリを除き、
+インポート先のリポジトリは含む）を表示します。
+
+    uv run python -m benchmarks.bench_transfer --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from collections.abc import AsyncIterator
+
+from hello_litestar_htmx.models.todo import ExportFormat, TodoImport
+from hello_litestar_htmx.repositories.todo import InMemoryTodoRepository
+from hello_litestar_htmx.services.transfer import csv_header, encode_batch, read_import_batches
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _fill(rows: int) -> InMemoryTodoRepository:
+    repository = InMemoryTodoRepository()
+    repository.create_many(
+        TodoImport(title=f"todo {i}", completed=i % 3 == 0) for i in range(rows)
+    )
+    return repository
+
+
+def _export(repository: InMemoryTodoRepository, fmt: ExportFormat) -> tuple[int, list[bytes]]:
+    """Encode everything, keeping only the first chunk (as a socket would)."""
+    total = len(csv_header()) if fmt == ExportFormat.CSV else 0
+    first: list[bytes] = []
+    for batch in repository.iter_batches():
+        chunk = encode_batch(batch, fmt)
+        total += len(chunk)
+        if not first:
+            first.append(chunk)
+    return total, first
+
+
+async def _chunks(repository: InMemoryTodoRepository, fmt: ExportFormat) -> AsyncIterator[bytes]:
+    """Re-chunk an export into fixed-size pieces like an HTTP upload."""
+    buffer = csv_header() if fmt == ExportFormat.CSV else b""
+    for batch in repository.iter_batches():
+        buffer += encode_batch(batch, fmt)
+        while len(buffer) >= CHUNK_SIZE:
+            yield buffer[:CHUNK_SIZE]
+            buffer = buffer[CHUNK_SIZE:]
+    if buffer:
+        yield buffer
+
+
+async def _import(repository: InMemoryTodoRepository, fmt: ExportFormat) -> int:
+    target = InMemoryTodoRepository()
+    count = 0
+    async for batch in read_import_batches(_chunks(repository, fmt), fmt):
+        count += target.create_many(batch)
+    return count
+
+
+def _measure(label: str, rows: int, func) -> None:
+    # tracemalloc slows allocation-heavy code down, so time and memory are measured separately
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<16}{rows / elapsed:>14,.0f} rows/s{peak / 1024 / 1024:>10.1f} MiB peak")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"filling repository with {args.rows:,} todos...")
+    repository = _fill(args.rows)
+    for fmt in ExportFormat:
+        _measure(f"export {fmt.value}", args.rows, lambda: _export(repository, fmt))
+        _measure(f"import {fmt.value}", args.rows, lambda: asyncio.run(_import(repository, fmt)))
+
+
+if __name__ == "__main__":
+    main()
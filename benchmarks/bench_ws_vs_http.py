@@ -0,0 +1,56 @@
+"""WebSocket チャネルと HTTP ルートの ops/sec 比較
+
+同じ操作（トグル）を HTTP の POST /todos/{id}/toggle と、1本の WebSocket 上の
+メッセージで繰り返し、1秒あたりの操作数を比較します。どちらもインプロセスの
+TestClient 経由なので、ネットワーク遅延を除いたサーバー側のコストの差になります。
+
+    uv run python -m benchmarks.bench_ws_vs_http
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+
+os.environ.setdefault("LITESTAR_CSRF_SECRET", "bench-csrf-secret")
+
+from litestar.testing import TestClient  # noqa: E402
+
+from hello_litestar_htmx.app import app  # noqa: E402
+
+OPS = 2_000
+
+
+def main() -> None:
+    # TestClient のリクエストごとの httpx ログを抑制（HTTP 側だけが不利にならないように）
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    with TestClient(app=app) as client:
+        csrf_token = client.get("/todos").cookies.get("csrf_token")
+        created = client.post(
+            "/todos",
+            data={"title": "bench"},
+            headers={"x-csrftoken": csrf_token},
+        )
+        todo_id = created.text.split('id="todo-')[1].split('"')[0]
+
+        start = time.perf_counter()
+        for _ in range(OPS):
+            client.post(f"/todos/{todo_id}/toggle", headers={"x-csrftoken": csrf_token})
+        http = OPS / (time.perf_counter() - start)
+
+        with client.websocket_connect(f"/todos/ws?csrf_token={csrf_token}") as ws:
+            message = {"action": "toggle", "id": todo_id}
+            start = time.perf_counter()
+            for _ in range(OPS):
+                ws.send_json(message)
+                ws.receive_text()
+            websocket = OPS / (time.perf_counter() - start)
+
+    print(f"{'channel':<12}{'ops/s':>10}")
+    print(f"{'http':<12}{http:>10,.0f}")
+    print(f"{'websocket':<12}{websocket:>10,.0f}  ({websocket / http:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,26 +21,83 @@ from litestar.middleware import DefineMiddleware
 from litestar.template.config import TemplateConfig
 from litestar.status_codes import HTTP_403_FORBIDDEN
 
-from hello_litestar_htmx.repositories.todo import InMemoryTodoRepository
-from hello_litestar_htmx.routes import pages_router, todos_router
-from hello_litestar_htmx.services.todo import TodoService
+from hello_litestar_htmx.rendering import RenderConfig
+from hello_litestar_htmx.repositories.archive import ArchiveConfig
+from hello_litestar_htmx.resources import ResourceRegistry
+from hello_litestar_htmx.routes import (
+    jobs_router,
+    live_router,
+    pages_router,
+    profiles_router,
+    todos_router,
+)
+from hello_litestar_htmx.middleware.access_log import AccessLogMiddleware
 from hello_litestar_htmx.middleware.csrf import RotatingCSRFMiddleware
+from hello_litestar_htmx.middleware.idempotency import (
+    IdempotencyConfig,
+    IdempotencyMiddleware,
+    new_idempotency_key,
+)
+from hello_litestar_htmx.middleware.profiling import ProfilingConfig, ProfilingMiddleware
+from hello_litestar_htmx.services.audit import AuditLog, AuditLogConfig
+
+_STATE_DIR = Path(__file__).resolve().parents[2] / ".litestar"
+
+
+def _get_audit_log() -> AuditLog | None:
+    """アクセス/監査ログの設定を環境変数から読み込む
+
+    `LITESTAR_AUDIT_DIR` を設定すると有効になります。GETリクエストは
+    `LITESTAR_AUDIT_GET_SAMPLE_RATE` の割合だけ記録します（既定 0）。
+    """
+    directory = os.environ.get("LITESTAR_AUDIT_DIR")
+    if not directory:
+        return None
+    return AuditLog(
+        AuditLogConfig(
+            directory=Path(directory),
+            queue_size=int(os.environ.get("LITESTAR_AUDIT_QUEUE_SIZE") or 10_000),
+            get_sample_rate=float(os.environ.get("LITESTAR_AUDIT_GET_SAMPLE_RATE") or 0.0),
+        )
+    )
+
 
-# グローバルなリポジトリインスタンス
-# 本番環境では、アプリケーション状態やDB接続プールを使用
-_todo_repository = InMemoryTodoRepository()
+def _get_archive_config() -> ArchiveConfig | None:
+    """アーカイブ設定を環境変数から読み込む
 
+    `LITESTAR_ARCHIVE_DIR` を設定すると有効になり、完了から
+    `LITESTAR_ARCHIVE_AFTER` 秒（既定: 1日）経ったTodoをそのディレクトリに移します。
+    """
+    directory = os.environ.get("LITESTAR_ARCHIVE_DIR")
+    if not directory:
+        return None
+    return ArchiveConfig(
+        directory=Path(directory),
+        archive_after=float(os.environ.get("LITESTAR_ARCHIVE_AFTER") or 24 * 60 * 60),
+        sweep_interval=float(os.environ.get("LITESTAR_ARCHIVE_SWEEP_INTERVAL") or 60),
+    )
 
-def provide_todo_service() -> TodoService:
-    """Dependency provider for TodoService.
 
-    Litestarの依存性注入システムが自動的にこの関数を呼び出し、
-    TodoServiceインスタンスをルートハンドラに注入します。
+def _get_render_config() -> RenderConfig:
+    """テンプレート描画の設定を環境変数から読み込む
 
-    Returns:
-        TodoService instance with injected repository.
+    `LITESTAR_RENDER_OFFLOAD_THRESHOLD` 件（既定: 500）以上のTodoを描画するページは
+    イベントループではなくスレッドプールで描画します。
     """
-    return TodoService(_todo_repository)
+    return RenderConfig(
+        offload_threshold=int(os.environ.get("LITESTAR_RENDER_OFFLOAD_THRESHOLD") or 500),
+        max_workers=int(os.environ.get("LITESTAR_RENDER_WORKERS") or 2),
+    )
+
+
+# リポジトリ・サービス・ジョブランナーは lifespan で起動時に一度だけ作成し、
+# ResourceRegistry が保持する（リクエストごとには作成しない）
+audit_log = _get_audit_log()
+resources = ResourceRegistry(
+    audit=audit_log,
+    archive_config=_get_archive_config(),
+    render_config=_get_render_config(),
+)
 
 
 def _get_csrf_secret() -> str:
@@ -48,8 +105,7 @@ def _get_csrf_secret() -> str:
     if env_secret:
         return env_secret
 
-    repo_root = Path(__file__).resolve().parents[2]
-    state_dir = repo_root / ".litestar"
+    state_dir = _STATE_DIR
     state_dir.mkdir(parents=True, exist_ok=True)
     secret_path = state_dir / "csrf-secret"
 
@@ -75,6 +131,11 @@ csrf_config = CSRFConfig(
     header_name="x-csrftoken",  # デフォルトと同じだが明示的に指定
 )
 
+def configure_template_engine(engine: JinjaTemplateEngine) -> None:
+    """テンプレートから使う関数を登録する"""
+    engine.engine.globals["idempotency_key"] = new_idempotency_key
+
+
 def csrf_exception_handler(request: Request, exc: PermissionDeniedException) -> Response:
     """CSRF例外をハンドリングしてログに記録"""
     return Response(
@@ -84,15 +145,58 @@ def csrf_exception_handler(request: Request, exc: PermissionDeniedException) ->
     )
 
 
+def _get_profiling_config() -> ProfilingConfig:
+    """プロファイリング設定を環境変数から読み込む
+
+    `LITESTAR_PROFILE_TOKEN` を設定すると有効になります。プロファイルの一覧も同じトークンで
+    保護するため、トークンなしで `LITESTAR_PROFILE_SAMPLE_RATE` だけを設定すると
+    起動時にエラーになります。
+    """
+    return ProfilingConfig(
+        directory=Path(os.environ.get("LITESTAR_PROFILE_DIR") or _STATE_DIR / "profiles"),
+        token=os.environ.get("LITESTAR_PROFILE_TOKEN") or None,
+        sample_rate=float(os.environ.get("LITESTAR_PROFILE_SAMPLE_RATE") or 0.0),
+        max_profiles=int(os.environ.get("LITESTAR_PROFILE_MAX") or 50),
+    )
+
+
+profiling_config = _get_profiling_config()
+
+route_handlers = [pages_router, todos_router, jobs_router, live_router]
+dependencies = {
+    "todo_service": Provide(resources.provide_todo_service, sync_to_thread=False),
+    "job_runner": Provide(resources.provide_job_runner, sync_to_thread=False),
+    "renderer": Provide(resources.provide_template_renderer, sync_to_thread=False),
+    "reminders": Provide(resources.provide_reminder_scheduler, sync_to_thread=False),
+    "csrf_config": Provide(lambda: csrf_config, sync_to_thread=False),
+}
+# 冪等キーのキャッシュはCSRF検証の内側に置き、検証を通ったリクエストだけを記録・再送する
+middleware = [
+    DefineMiddleware(RotatingCSRFMiddleware, config=csrf_config),
+    DefineMiddleware(IdempotencyMiddleware, config=IdempotencyConfig()),
+]
+
+# CSRFで拒否されたリクエストも記録できるよう、CSRFミドルウェアの外側に置く
+if audit_log is not None:
+    middleware.insert(0, DefineMiddleware(AccessLogMiddleware, audit=audit_log))
+
+# 無効時はミドルウェア自体を登録しない（オーバーヘッドゼロ）
+# 有効時は最も外側に置き、CSRF・DI・テンプレートを含むリクエスト全体を計測する
+if profiling_config.enabled:
+    route_handlers.append(profiles_router)
+    dependencies["profiling_config"] = Provide(lambda: profiling_config, sync_to_thread=False)
+    middleware.insert(0, DefineMiddleware(ProfilingMiddleware, config=profiling_config))
+
+
 app = Litestar(
-    route_handlers=[pages_router, todos_router],
+    route_handlers=route_handlers,
     template_config=TemplateConfig(
         directory="templates",
         engine=JinjaTemplateEngine,
+        engine_callback=configure_template_engine,
     ),
-    dependencies={
-        "todo_service": Provide(provide_todo_service, sync_to_thread=False),
-    },
-    middleware=[DefineMiddleware(RotatingCSRFMiddleware, config=csrf_config)],
+    dependencies=dependencies,
+    middleware=middleware,
     exception_handlers={PermissionDeniedException: csrf_exception_handler},
+    lifespan=[resources.lifespan],
 )
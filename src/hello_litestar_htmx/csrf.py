@@ -10,9 +10,14 @@ should use the token from state instead of only reading the request cookies.
 
 from __future__ import annotations
 
-from litestar import Request
+from secrets import compare_digest
+
+from litestar import Request, WebSocket
+from litestar.config.csrf import CSRFConfig
 from litestar.utils.scope.state import ScopeState
 
+from hello_litestar_htmx.middleware.csrf import is_valid_csrf_token
+
 
 def get_csrf_token(request: Request) -> str:
     """Return the CSRF token for the current request, if available."""
@@ -22,3 +27,19 @@ def get_csrf_token(request: Request) -> str:
         return token
     return request.cookies.get("csrf_token", "")
 
+
+def verify_websocket_csrf(socket: WebSocket, config: CSRFConfig) -> bool:
+    """Check the CSRF token of a WebSocket handshake.
+
+    `CSRFMiddleware` only protects HTTP requests. A WebSocket handshake carries
+    the CSRF cookie automatically, so the page must also pass the token as the
+    ``csrf_token`` query parameter; both must match and carry a valid signature.
+    """
+    cookie = socket.cookies.get(config.cookie_name, "")
+    token = socket.query_params.get("csrf_token", "")
+    return bool(
+        cookie
+        and token
+        and compare_digest(cookie, token)
+        and is_valid_csrf_token(cookie, config.secret)
+    )
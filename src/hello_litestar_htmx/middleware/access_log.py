@@ -0,0 +1,49 @@
+"""Access logging through the non-blocking `AuditLog` pipeline.
+
+`AccessLogMiddleware` records method, path, status and duration of every
+non-GET request, and of a configurable sample of GET requests. Recording only
+enqueues a dict, so the response is never held up by disk I/O.
+"""
+
+from __future__ import annotations
+
+import time
+
+from litestar.types import ASGIApp, Message, Receive, Scope, Send
+
+from hello_litestar_htmx.services.audit import AuditLog
+
+
+class AccessLogMiddleware:
+    """ASGI middleware that enqueues one access record per (sampled) request."""
+
+    def __init__(self, app: ASGIApp, audit: AuditLog) -> None:
+        self.app = app
+        self.audit = audit
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.audit.should_log_request(scope["method"]):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            client = scope.get("client")
+            self.audit.record(
+                "http.request",
+                method=scope["method"],
+                path=scope["path"],
+                status=status,
+                duration_ms=round((time.perf_counter() - start) * 1000, 3),
+                client=client[0] if client else None,
+            )
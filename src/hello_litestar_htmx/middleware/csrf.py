@@ -25,7 +25,8 @@ def _generate_csrf_hash(token: str, secret: str) -> str:
     return hmac.new(secret.encode(), token.encode(), hashlib.sha256).hexdigest()
 
 
-def _is_valid_csrf_token(token: str, secret: str) -> bool:
+def is_valid_csrf_token(token: str, secret: str) -> bool:
+    """Return True if ``token`` was issued with ``secret``."""
     if len(token) < CSRF_SECRET_LENGTH + 1:
         return False
     token_secret = token[:CSRF_SECRET_LENGTH]
@@ -42,7 +43,7 @@ class RotatingCSRFMiddleware(CSRFMiddleware):
             request = scope["litestar_app"].request_class(scope=scope, receive=receive)
             csrf_cookie = request.cookies.get(self.config.cookie_name)
             if csrf_cookie and request.method in self.config.safe_methods:
-                if not _is_valid_csrf_token(csrf_cookie, self.config.secret):
+                if not is_valid_csrf_token(csrf_cookie, self.config.secret):
                     request.cookies.pop(self.config.cookie_name, None)
         return await super().__call__(scope, receive, send)
 
@@ -0,0 +1,206 @@
+"""Idempotency keys for unsafe requests.
+
+Templates render a fresh key into the ``hx-headers`` of every mutating control
+(the add form, each todo's checkbox and delete button), so a double click or an
+HTMX retry sends the same ``Idempotency-Key`` header twice, while the next
+deliberate action carries a new key.
+
+`IdempotencyMiddleware` remembers the first successful (2xx) response for each
+key and replays it for repeats without calling the handler again. A repeat that
+arrives while the first request is still running waits for it instead of
+running concurrently, and only runs itself if the first one did not succeed.
+Keys are scoped to the client's CSRF cookie, method and path, so one client can
+never replay another client's response. The cache is bounded by entry count
+and evicts entries after a TTL. Cached responses keep their status, headers
+(minus ``Set-Cookie``) and body; large bodies are not cached.
+
+Requests without the header, and safe methods, pass straight through.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from litestar.types import ASGIApp, Message, Receive, Scope, Send
+
+REPLAYED_HEADER = b"idempotent-replayed"
+
+
+def new_idempotency_key() -> str:
+    """Return a fresh idempotency key for a rendered control."""
+    return secrets.token_urlsafe(12)
+
+
+@dataclass
+class IdempotencyConfig:
+    """Configuration for `IdempotencyMiddleware`."""
+
+    ttl: float = 300.0
+    """Seconds a response is replayed for repeats of its key."""
+    max_entries: int = 10_000
+    max_body_bytes: int = 64 * 1024
+    """Responses with a larger body are not cached."""
+    header_name: str = "idempotency-key"
+    max_key_length: int = 128
+    scope_cookie: str = "csrf_token"
+    """Cookie that identifies the client; keys are only matched within one client."""
+    safe_methods: frozenset[str] = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A response recorded for replay."""
+
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    expires_at: float
+
+
+class IdempotencyCache:
+    """Bounded, TTL-evicted map of idempotency keys to responses.
+
+    Entries are stored in insertion order, and every entry has the same TTL, so
+    expired entries are always at the front and eviction never scans.
+    """
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._responses: OrderedDict[tuple[str, ...], CachedResponse] = OrderedDict()
+        self._pending: dict[tuple[str, ...], asyncio.Future[CachedResponse | None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def get(self, key: tuple[str, ...]) -> CachedResponse | None:
+        """Return the cached response for ``key`` if it has not expired."""
+        response = self._responses.get(key)
+        if response is not None and response.expires_at <= time.monotonic():
+            del self._responses[key]
+            return None
+        return response
+
+    def pending(self, key: tuple[str, ...]) -> asyncio.Future[CachedResponse | None] | None:
+        """Return the future of an in-flight request with ``key``, if any."""
+        return self._pending.get(key)
+
+    def begin(self, key: tuple[str, ...]) -> asyncio.Future[CachedResponse | None]:
+        """Mark ``key`` as in flight. Repeats can await the returned future."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        return future
+
+    def finish(
+        self,
+        key: tuple[str, ...],
+        status: int | None = None,
+        headers: list[tuple[bytes, bytes]] | None = None,
+        body: bytes = b"",
+    ) -> None:
+        """Complete an in-flight key, caching the response if one is given."""
+        response = None
+        if status is not None:
+            response = CachedResponse(status, headers or [], body, time.monotonic() + self.ttl)
+            self._responses[key] = response
+            self._responses.move_to_end(key)
+            self._evict()
+        future = self._pending.pop(key)
+        if not future.done():
+            future.set_result(response)
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._responses:
+            response = next(iter(self._responses.values()))
+            if response.expires_at > now and len(self._responses) <= self.max_entries:
+                break
+            self._responses.popitem(last=False)
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware that replays responses for repeated idempotency keys."""
+
+    def __init__(self, app: ASGIApp, config: IdempotencyConfig) -> None:
+        self.app = app
+        self.config = config
+        self.cache = IdempotencyCache(config.ttl, config.max_entries)
+        self._header = config.header_name.encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in self.config.safe_methods:
+            await self.app(scope, receive, send)
+            return
+        idempotency_key = self._find_header(scope)
+        if not idempotency_key or len(idempotency_key) > self.config.max_key_length:
+            await self.app(scope, receive, send)
+            return
+
+        key = (self._client_id(scope, receive), scope["method"], scope["path"], idempotency_key)
+        while (pending := self.cache.pending(key)) is not None:
+            # A repeat of an in-flight request; if that one fails, the next waiter runs
+            await asyncio.shield(pending)
+        cached = self.cache.get(key)
+        if cached is not None:
+            await self._replay(cached, send)
+            return
+        await self._run_and_record(key, scope, receive, send)
+
+    async def _run_and_record(
+        self, key: tuple[str, ...], scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        self.cache.begin(key)
+        status: int | None = None
+        headers: list[tuple[bytes, bytes]] = []
+        body: list[bytes] = []
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers.extend(
+                    (name, value) for name, value in message.get("headers", [])
+                    if name.lower() != b"set-cookie"
+                )
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size <= self.config.max_body_bytes:
+                    body.append(chunk)
+            await send(message)
+
+        cacheable = False
+        try:
+            await self.app(scope, receive, send_wrapper)
+            cacheable = status is not None and 200 <= status < 300
+            cacheable = cacheable and size <= self.config.max_body_bytes
+        finally:
+            if cacheable:
+                self.cache.finish(key, status, headers, b"".join(body))
+            else:
+                self.cache.finish(key)
+
+    async def _replay(self, cached: CachedResponse, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": cached.status,
+                "headers": [*cached.headers, (REPLAYED_HEADER, b"true")],
+            }
+        )
+        await send({"type": "http.response.body", "body": cached.body, "more_body": False})
+
+    def _find_header(self, scope: Scope) -> str | None:
+        for name, value in scope["headers"]:
+            if name == self._header:
+                return value.decode("latin-1")
+        return None
+
+    def _client_id(self, scope: Scope, receive: Receive) -> str:
+        request = scope["litestar_app"].request_class(scope=scope, receive=receive)
+        return request.cookies.get(self.config.scope_cookie, "")
@@ -0,0 +1,128 @@
+"""On-demand request profiling.
+
+When enabled, `ProfilingMiddleware` wraps the whole ASGI stack (CSRF middleware,
+dependency injection, services and template rendering) in `cProfile` for
+requests that either carry the configured `x-profile` header token or are
+picked by the sampling rate. Each profile is written as a pstats file into a
+bounded directory; the oldest files are pruned once `max_profiles` is exceeded.
+Writing and pruning run in a worker thread, off the event loop.
+
+Profiles reveal the code paths and timings of the application, so a token is
+always required: it authorizes both header-triggered profiling and the
+``/_profiles`` listing, and sampling without a token is rejected.
+
+The middleware is only installed when profiling is enabled, so a disabled
+configuration adds no per-request overhead at all.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from secrets import compare_digest
+
+import anyio.to_thread
+from litestar.types import ASGIApp, Receive, Scope, Send
+
+PROFILE_SUFFIX = ".prof"
+
+_UNSAFE_PATH_CHARS = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+@dataclass
+class ProfilingConfig:
+    """Configuration for `ProfilingMiddleware`."""
+
+    directory: Path
+    token: str | None = None
+    """Requests whose `header_name` header equals this token are profiled."""
+    sample_rate: float = 0.0
+    """Fraction of requests (0.0-1.0) profiled without a header."""
+    max_profiles: int = 50
+    header_name: str = "x-profile"
+
+    def __post_init__(self) -> None:
+        if self.sample_rate > 0 and not self.token:
+            raise ValueError("sampled profiling requires a token to protect the profiles")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token)
+
+    def is_authorized(self, value: str | None) -> bool:
+        """Return True if a header value matches the configured token."""
+        return bool(self.token and value and compare_digest(value, self.token))
+
+
+@dataclass(frozen=True)
+class ProfileInfo:
+    """Metadata of a stored profile file."""
+
+    name: str
+    size: int
+    created_at: float
+
+
+def list_profiles(config: ProfilingConfig) -> list[ProfileInfo]:
+    """Return stored profiles, newest first."""
+    if not config.directory.exists():
+        return []
+    profiles = []
+    for path in config.directory.glob(f"*{PROFILE_SUFFIX}"):
+        stat = path.stat()
+        profiles.append(ProfileInfo(name=path.name, size=stat.st_size, created_at=stat.st_mtime))
+    profiles.sort(key=lambda p: p.name, reverse=True)
+    return profiles
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles selected requests with cProfile."""
+
+    def __init__(self, app: ASGIApp, config: ProfilingConfig) -> None:
+        self.app = app
+        self.config = config
+        # cProfile can only have one active profiler per interpreter (3.12+),
+        # and interleaved coroutines would pollute each other's profile anyway.
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        if not self._lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                profiler.disable()
+            await anyio.to_thread.run_sync(self._store, profiler, scope)
+        finally:
+            self._lock.release()
+
+    def _should_profile(self, scope: Scope) -> bool:
+        header = self.config.header_name.encode("latin-1")
+        for name, value in scope["headers"]:
+            if name == header:
+                return self.config.is_authorized(value.decode("latin-1"))
+        return self.config.sample_rate > 0 and random.random() < self.config.sample_rate
+
+    def _store(self, profiler: cProfile.Profile, scope: Scope) -> None:
+        directory = self.config.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = _UNSAFE_PATH_CHARS.sub("_", scope["path"]).strip("_") or "root"
+        name = f"{time.time_ns()}-{scope['method']}-{slug}{PROFILE_SUFFIX}"
+        profiler.dump_stats(directory / name)
+
+        stored = sorted(directory.glob(f"*{PROFILE_SUFFIX}"))
+        for old in stored[: max(len(stored) - self.config.max_profiles, 0)]:
+            old.unlink(missing_ok=True)
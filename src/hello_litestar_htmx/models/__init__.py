@@ -1,5 +1,37 @@
 """Data models for the application."""
 
-from hello_litestar_htmx.models.todo import Todo, TodoCreate, TodoUpdate
+from hello_litestar_htmx.models.todo import (
+    ArchivedTodo,
+    ChangeKind,
+    ExportFormat,
+    SortOrder,
+    TagMatch,
+    Todo,
+    TodoChange,
+    TodoCreate,
+    TodoCreateForm,
+    TodoFilter,
+    TodoImport,
+    TodoLiveMessage,
+    TodoMoveForm,
+    TodoUpdate,
+    TodoUpdateForm,
+)
 
-__all__ = ["Todo", "TodoCreate", "TodoUpdate"]
+__all__ = [
+    "ArchivedTodo",
+    "ChangeKind",
+    "ExportFormat",
+    "SortOrder",
+    "TagMatch",
+    "Todo",
+    "TodoChange",
+    "TodoCreate",
+    "TodoCreateForm",
+    "TodoFilter",
+    "TodoImport",
+    "TodoLiveMessage",
+    "TodoMoveForm",
+    "TodoUpdate",
+    "TodoUpdateForm",
+]
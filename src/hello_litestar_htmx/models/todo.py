@@ -1,12 +1,61 @@
 """Todo model definitions using Pydantic."""
 
+from datetime import datetime
+from enum import StrEnum
+from typing import Literal
+
+import msgspec
 from pydantic import BaseModel, Field, field_validator
 
+TITLE_MAX_LENGTH = 200
+TAG_MAX_LENGTH = 30
+MAX_TAGS = 10
+
+
+def _as_aware(value: datetime | None) -> datetime | None:
+    """Interpret a datetime without a timezone (e.g. from a form) as local time."""
+    if value is not None and value.tzinfo is None:
+        return value.astimezone()
+    return value
+
+
+def _normalize_tags(tags: tuple[str, ...] | None) -> tuple[str, ...] | None:
+    """Strip tags, drop empty ones and duplicates (keeping the first), and check limits."""
+    if tags is None:
+        return None
+    normalized = tuple(dict.fromkeys(tag.strip() for tag in tags if tag.strip()))
+    if len(normalized) > MAX_TAGS:
+        raise ValueError(f"タグは{MAX_TAGS}個までです")
+    if any(len(tag) > TAG_MAX_LENGTH for tag in normalized):
+        raise ValueError(f"タグは{TAG_MAX_LENGTH}文字以内で入力してください")
+    return normalized
+
+
+def split_tags(text: str) -> tuple[str, ...]:
+    """Split a comma-separated form value (``,`` or ``、``) into tags."""
+    return tuple(text.replace("、", ",").split(","))
+
 
 class TodoBase(BaseModel):
     """Base Todo schema with common fields."""
 
-    title: str = Field(..., min_length=1, max_length=200, description="Todo item title")
+    title: str = Field(
+        ..., min_length=1, max_length=TITLE_MAX_LENGTH, description="Todo item title"
+    )
+    due_at: datetime | None = Field(default=None, description="When a reminder is due")
+    tags: tuple[str, ...] = Field(default=(), description="Labels used to filter the list")
+
+    @field_validator("due_at")
+    @classmethod
+    def due_at_must_be_aware(cls, v: datetime | None) -> datetime | None:
+        """Interpret a due time without a timezone as local time."""
+        return _as_aware(v)
+
+    @field_validator("tags")
+    @classmethod
+    def tags_must_be_valid(cls, v: tuple[str, ...]) -> tuple[str, ...]:
+        """Normalize tags and enforce the count and length limits."""
+        return _normalize_tags(v)
 
 
 class TodoCreate(TodoBase):
@@ -16,24 +65,44 @@ class TodoCreate(TodoBase):
     @classmethod
     def title_must_not_be_empty(cls, v: str) -> str:
         """Validate that title is not empty after stripping whitespace."""
-        if not v.strip():
+        stripped = v.strip()
+        if not stripped:
             raise ValueError("タイトルを入力してください")
-        return v.strip()
+        return stripped
 
 
 class TodoUpdate(BaseModel):
     """Schema for updating a Todo."""
 
-    title: str | None = Field(None, min_length=1, max_length=200)
+    title: str | None = Field(None, min_length=1, max_length=TITLE_MAX_LENGTH)
     completed: bool | None = None
+    due_at: datetime | None = None
+    """Only applied if set explicitly; an explicit None removes the due time."""
+    tags: tuple[str, ...] | None = None
+    """Replaces all tags if given."""
+
+    @field_validator("due_at")
+    @classmethod
+    def due_at_must_be_aware(cls, v: datetime | None) -> datetime | None:
+        """Interpret a due time without a timezone as local time."""
+        return _as_aware(v)
+
+    @field_validator("tags")
+    @classmethod
+    def tags_must_be_valid(cls, v: tuple[str, ...] | None) -> tuple[str, ...] | None:
+        """Normalize tags and enforce the count and length limits."""
+        return _normalize_tags(v)
 
     @field_validator("title")
     @classmethod
     def title_must_not_be_empty(cls, v: str | None) -> str | None:
         """Validate that title is not empty after stripping whitespace."""
-        if v is not None and not v.strip():
+        if v is None:
+            return None
+        stripped = v.strip()
+        if not stripped:
             raise ValueError("タイトルを入力してください")
-        return v.strip() if v is not None else None
+        return stripped
 
 
 class Todo(TodoBase):
@@ -41,6 +110,7 @@ class Todo(TodoBase):
 
     id: int = Field(..., description="Unique identifier")
     completed: bool = Field(default=False, description="Completion status")
+    position: float = Field(default=0.0, description="Sort key of the todo in the list")
 
     model_config = {
         "json_schema_extra": {
@@ -49,7 +119,142 @@ class Todo(TodoBase):
                     "id": 1,
                     "title": "Litestarを学ぶ",
                     "completed": False,
+                    "position": 1.0,
                 }
             ]
         }
     }
+
+
+class ArchivedTodo(Todo):
+    """A completed Todo moved to cold storage."""
+
+    completed_at: datetime = Field(..., description="When the todo was completed")
+    archived_at: datetime = Field(..., description="When the todo was archived")
+
+
+class TodoImport(TodoCreate):
+    """Schema for a Todo read from an import file."""
+
+    completed: bool = False
+
+
+class ChangeKind(StrEnum):
+    """Kind of change recorded in a repository change log."""
+
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class TagMatch(StrEnum):
+    """How a list view combines several tag filters."""
+
+    ALL = "all"
+    """Todos with every selected tag (AND)."""
+    ANY = "any"
+    """Todos with at least one selected tag (OR)."""
+
+
+class TodoChange(BaseModel):
+    """Net change of one todo since a change-log cursor."""
+
+    kind: ChangeKind
+    todo_id: int
+    todo: Todo | None = None
+    """Current state of the todo; None for deletions."""
+
+
+class TodoFilter(StrEnum):
+    """Which todos a list view shows."""
+
+    ALL = "all"
+    ACTIVE = "active"
+    COMPLETED = "completed"
+
+
+class SortOrder(StrEnum):
+    """Direction of a list view: list order (new todos last, unless moved) or reversed."""
+
+    ASC = "asc"
+    DESC = "desc"
+
+
+class ExportFormat(StrEnum):
+    """Serialization format for todo import/export."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class TodoCreateForm(msgspec.Struct):
+    """Typed form payload for creating a Todo.
+
+    Litestar decodes URL-encoded bodies straight into this struct with a
+    precompiled msgspec converter, so handlers never touch an untyped dict.
+    Unknown fields such as ``_csrf_token`` are ignored.
+    """
+
+    title: str = ""
+    due_at: str = ""
+    """Value of a ``datetime-local`` input; empty for no due time."""
+    tags: str = ""
+    """Comma-separated tags."""
+    order: SortOrder = SortOrder.ASC
+    """Direction of the list view the form belongs to."""
+
+    def to_model(self) -> TodoCreate:
+        """Validate the form into a TodoCreate.
+
+        Raises:
+            pydantic.ValidationError: If the title, due time or tags are invalid.
+        """
+        return TodoCreate(title=self.title, due_at=self.due_at or None, tags=split_tags(self.tags))
+
+
+class TodoUpdateForm(msgspec.Struct):
+    """Typed form payload for updating a Todo."""
+
+    title: str | None = None
+    completed: bool | None = None
+    due_at: str | None = None
+    """Omitted to keep the due time, empty to remove it."""
+    tags: str | None = None
+    """Comma-separated tags; omitted to keep the current tags."""
+
+    def to_model(self) -> TodoUpdate:
+        """Validate the form into a TodoUpdate.
+
+        Raises:
+            pydantic.ValidationError: If the title, due time or tags are invalid.
+        """
+        fields: dict[str, object] = {"title": self.title, "completed": self.completed}
+        if self.due_at is not None:
+            fields["due_at"] = self.due_at or None
+        if self.tags is not None:
+            fields["tags"] = split_tags(self.tags)
+        return TodoUpdate(**fields)
+
+
+class TodoMoveForm(msgspec.Struct):
+    """Form payload sent after a todo was dragged to a new place in a list view.
+
+    ``prev_id`` and ``next_id`` are the todos displayed directly above and
+    below it (omitted at either end); ``order`` is the direction of the view.
+    """
+
+    prev_id: int | None = None
+    next_id: int | None = None
+    order: SortOrder = SortOrder.ASC
+
+
+class TodoLiveMessage(msgspec.Struct):
+    """A mutation sent over the live WebSocket channel.
+
+    The HTMX ws extension sends form values (and ``hx-vals``) as JSON strings,
+    so messages are decoded non-strictly, e.g. ``"3"`` for ``id``.
+    """
+
+    action: Literal["create", "toggle", "delete"]
+    id: int | None = None
+    title: str = ""
@@ -0,0 +1,91 @@
+"""Off-loop rendering for large template responses.
+
+Litestar renders a `Template` response synchronously on the event loop. That is
+fine for fragments such as ``todo_item.html``, but rendering ``todos.html`` for
+thousands of todos is CPU-bound work that stalls every other connection on the
+worker. `TemplateRenderer.respond` keeps small renders inline (returning a
+plain `Template`) and renders anything with at least ``offload_threshold``
+items in a bounded thread pool, returning the finished HTML.
+
+On free-threaded builds the pool renders truly in parallel with the loop. With
+the GIL, a rendering thread is still preempted every ``sys.getswitchinterval()``
+(5 ms by default), so other requests wait a few milliseconds instead of the
+whole render. A process pool was not used: pickling the todos and loading a
+Jinja environment per process would cost more than the render itself.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from litestar import Request, Response
+from litestar.enums import MediaType
+from litestar.response import Template
+from litestar.status_codes import HTTP_200_OK
+from litestar.template import TemplateEngineProtocol
+
+
+@dataclass
+class RenderConfig:
+    """Configuration for `TemplateRenderer`."""
+
+    offload_threshold: int = 500
+    """Renders with at least this many items run in the thread pool."""
+    max_workers: int = 2
+    """Maximum number of renders running off the loop at once."""
+
+
+class TemplateRenderer:
+    """Renders large templates in a bounded thread pool."""
+
+    def __init__(self, engine: TemplateEngineProtocol, config: RenderConfig) -> None:
+        """Initialize the renderer.
+
+        Args:
+            engine: The application's template engine.
+            config: Threshold and pool size.
+        """
+        self.engine = engine
+        self.config = config
+        self._executor: ThreadPoolExecutor | None = None
+
+    async def respond(
+        self,
+        request: Request,
+        template_name: str,
+        context: dict[str, Any],
+        size: int,
+        status_code: int = HTTP_200_OK,
+    ) -> Response:
+        """Build a template response, rendering it off the loop if it is large.
+
+        Args:
+            request: The current request (added to the context like `Template` does).
+            template_name: Name of the template to render.
+            context: Template context.
+            size: Number of items the template will render, compared with the threshold.
+            status_code: Response status code.
+
+        Returns:
+            A `Template` for small renders, or a `Response` with the rendered HTML.
+        """
+        template = Template(template_name=template_name, context=context, status_code=status_code)
+        if size < self.config.offload_threshold:
+            return template
+
+        full_context = template.create_template_context(request)
+        render = functools.partial(self.engine.get_template(template_name).render, **full_context)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config.max_workers, thread_name_prefix="render"
+            )
+        body = await asyncio.get_running_loop().run_in_executor(self._executor, render)
+        return Response(content=body, media_type=MediaType.HTML, status_code=status_code)
+
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
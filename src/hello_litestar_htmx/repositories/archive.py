@@ -0,0 +1,216 @@
+"""Cold storage for archived (completed) todos.
+
+Archived todos are written to append-only segment files in blocks. Each block
+holds up to one sweep batch of todos, sorted by id, as zlib-compressed JSON
+lines behind a small fixed header::
+
+    >II  compressed payload length, record count
+    ...  zlib(ndjson)
+
+A segment is closed once it grows past ``segment_max_bytes``, and a new one is
+started. Files are never rewritten, except to cut off a block whose write
+failed: a failed append truncates the segment back to where the block started
+(or, if even that fails, moves on to a new segment), and on startup a torn
+block or header at the end of a segment is cut off. So a retried append never
+lands behind a partial block.
+
+Only a compact index stays in memory: per block its location and a sorted
+``array`` of the ids it contains (8 bytes per archived todo). Looking up a todo
+by id bisects the id arrays of the blocks whose id range covers it, and reading
+a page decompresses only the blocks it touches. A few recently decompressed
+blocks are cached. The index is rebuilt from the segment files on startup.
+
+All public methods are thread-safe and do blocking file I/O, so callers on
+the event loop should run them in a worker thread.
+"""
+
+import struct
+import threading
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from hello_litestar_htmx.models.todo import ArchivedTodo
+
+SEGMENT_GLOB = "segment-*.seg"
+_HEADER = struct.Struct(">II")
+
+
+@dataclass
+class ArchiveConfig:
+    """Configuration for `TodoArchive` and the archive sweep."""
+
+    directory: Path
+    archive_after: float = 24 * 60 * 60
+    """Seconds a todo must have been completed before it is archived."""
+    sweep_interval: float = 60.0
+    """Seconds between archive sweeps."""
+    block_size: int = 1000
+    """Maximum todos per compressed block (and per sweep batch)."""
+    segment_max_bytes: int = 8 * 1024 * 1024
+    cached_blocks: int = 8
+
+
+@dataclass(frozen=True)
+class _Block:
+    segment: Path
+    offset: int
+    length: int
+    ids: array
+
+
+class TodoArchive:
+    """Append-only, compressed archive of todos with an in-memory id index."""
+
+    def __init__(self, config: ArchiveConfig) -> None:
+        """Open the archive, rebuilding the index from existing segments.
+
+        Args:
+            config: Location and sizing of the archive.
+        """
+        self.config = config
+        self._lock = threading.Lock()
+        self._blocks: list[_Block] = []
+        self._count = 0
+        self._max_id = 0
+        self._cache: OrderedDict[int, list[bytes]] = OrderedDict()
+        self._roll_segment = False
+        config.directory.mkdir(parents=True, exist_ok=True)
+        self._segments = sorted(config.directory.glob(SEGMENT_GLOB))
+        for segment in self._segments:
+            self._load_segment(segment)
+
+    @property
+    def max_id(self) -> int:
+        """Highest archived id (0 if empty), so new todos never reuse an id."""
+        return self._max_id
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, todos: Sequence[ArchivedTodo]) -> None:
+        """Append todos as one block (or several, if more than ``block_size``).
+
+        Args:
+            todos: The todos to archive.
+        """
+        size = self.config.block_size
+        for start in range(0, len(todos), size):
+            self._append_block(sorted(todos[start : start + size], key=lambda t: t.id))
+
+    def get(self, todo_id: int) -> ArchivedTodo | None:
+        """Look up an archived todo by id."""
+        with self._lock:
+            for block_no, block in enumerate(self._blocks):
+                ids = block.ids
+                if not ids or todo_id < ids[0] or todo_id > ids[-1]:
+                    continue
+                i = bisect_left(ids, todo_id)
+                if i < len(ids) and ids[i] == todo_id:
+                    return ArchivedTodo.model_validate_json(self._lines(block_no)[i])
+        return None
+
+    def page(self, offset: int, limit: int) -> list[ArchivedTodo]:
+        """Read archived todos, most recently archived first.
+
+        Args:
+            offset: Number of todos to skip.
+            limit: Maximum number of todos to return.
+
+        Returns:
+            Up to ``limit`` archived todos.
+        """
+        result: list[ArchivedTodo] = []
+        with self._lock:
+            for block_no in range(len(self._blocks) - 1, -1, -1):
+                count = len(self._blocks[block_no].ids)
+                if offset >= count:
+                    offset -= count
+                    continue
+                lines = self._lines(block_no)
+                end = count - offset
+                start = max(end - (limit - len(result)), 0)
+                result.extend(
+                    ArchivedTodo.model_validate_json(line) for line in reversed(lines[start:end])
+                )
+                offset = 0
+                if len(result) >= limit:
+                    break
+        return result
+
+    def _append_block(self, todos: list[ArchivedTodo]) -> None:
+        payload = zlib.compress(b"".join(t.model_dump_json().encode() + b"\n" for t in todos))
+        ids = array("q", (t.id for t in todos))
+        with self._lock:
+            segment = self._current_segment(len(payload))
+            with segment.open("ab") as f:
+                start = f.tell()
+                try:
+                    f.write(_HEADER.pack(len(payload), len(todos)))
+                    f.write(payload)
+                    f.flush()
+                except BaseException:
+                    self._discard_partial(f, start)
+                    raise
+            self._add_block(_Block(segment, start + _HEADER.size, len(payload), ids))
+
+    def _discard_partial(self, f: BinaryIO, start: int) -> None:
+        try:
+            f.truncate(start)
+        except OSError:
+            # The partial block stays at the end of this segment, where the
+            # loader cuts it off; later blocks go to a new segment
+            self._roll_segment = True
+
+    def _current_segment(self, incoming: int) -> Path:
+        if self._segments and not self._roll_segment:
+            last = self._segments[-1]
+            if last.stat().st_size + incoming <= self.config.segment_max_bytes:
+                return last
+        number = len(self._segments) + 1
+        segment = self.config.directory / f"segment-{number:06d}.seg"
+        self._segments.append(segment)
+        self._roll_segment = False
+        return segment
+
+    def _load_segment(self, segment: Path) -> None:
+        data = segment.read_bytes()
+        position = 0
+        while position < len(data):
+            offset = position + _HEADER.size
+            length = _HEADER.unpack_from(data, position)[0] if offset <= len(data) else 0
+            if offset > len(data) or offset + length > len(data):
+                # Torn header or block at the end of the segment: cut it off so
+                # later appends stay readable
+                with segment.open("r+b") as f:
+                    f.truncate(position)
+                break
+            lines = zlib.decompress(data[offset : offset + length]).splitlines()
+            ids = array("q", (ArchivedTodo.model_validate_json(line).id for line in lines))
+            self._add_block(_Block(segment, offset, length, ids))
+            position = offset + length
+
+    def _add_block(self, block: _Block) -> None:
+        self._blocks.append(block)
+        self._count += len(block.ids)
+        if block.ids:
+            self._max_id = max(self._max_id, block.ids[-1])
+
+    def _lines(self, block_no: int) -> list[bytes]:
+        lines = self._cache.get(block_no)
+        if lines is not None:
+            self._cache.move_to_end(block_no)
+            return lines
+        block = self._blocks[block_no]
+        with block.segment.open("rb") as f:
+            f.seek(block.offset)
+            lines = zlib.decompress(f.read(block.length)).splitlines()
+        self._cache[block_no] = lines
+        if len(self._cache) > self.config.cached_blocks:
+            self._cache.popitem(last=False)
+        return lines
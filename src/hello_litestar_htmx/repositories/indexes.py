@@ -0,0 +1,223 @@
+"""Secondary index structures for in-memory repositories."""
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from typing import Any, Generic, TypeVar
+
+K = TypeVar("K", bound=Any)
+
+
+class SortedIndex(Generic[K]):
+    """Sorted set of comparable keys.
+
+    Keys are kept in a list of sorted buckets of bounded size (the layout used by
+    ``sortedcontainers.SortedList``), so inserting or removing a key in the
+    middle only shifts one small bucket instead of the whole index. Appending
+    a new largest key, the common case for fresh todos, is O(1).
+    """
+
+    LOAD = 512
+
+    def __init__(self, keys: Iterable[K] = ()) -> None:
+        """Initialize the index with optional keys (in any order).
+
+        The keys are sorted once and sliced straight into buckets of `LOAD`
+        keys, rather than added one at a time.
+        """
+        ordered = list(dict.fromkeys(sorted(keys)))
+        self._buckets: list[list[K]] = [
+            ordered[i : i + self.LOAD] for i in range(0, len(ordered), self.LOAD)
+        ]
+        self._maxes: list[K] = [bucket[-1] for bucket in self._buckets]
+        self._len = len(ordered)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[K]:
+        for bucket in self._buckets:
+            yield from bucket
+
+    def __reversed__(self) -> Iterator[K]:
+        for bucket in reversed(self._buckets):
+            yield from reversed(bucket)
+
+    def __contains__(self, key: object) -> bool:
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            return False
+        bucket = self._buckets[pos]
+        return bucket[bisect_left(bucket, key)] == key
+
+    def add(self, key: K) -> None:
+        """Insert a key (no-op if already present)."""
+        if not self._maxes:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            return
+
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            pos -= 1
+            bucket = self._buckets[pos]
+            bucket.append(key)
+            self._maxes[pos] = key
+        else:
+            bucket = self._buckets[pos]
+            i = bisect_left(bucket, key)
+            if bucket[i] == key:
+                return
+            bucket.insert(i, key)
+        self._len += 1
+
+        if len(bucket) > 2 * self.LOAD:
+            self._buckets.insert(pos + 1, bucket[self.LOAD :])
+            del bucket[self.LOAD :]
+            self._maxes.insert(pos, bucket[-1])
+
+    def discard(self, key: K) -> bool:
+        """Remove a key. Returns True if it was present."""
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            return False
+        bucket = self._buckets[pos]
+        i = bisect_left(bucket, key)
+        if bucket[i] != key:
+            return False
+
+        del bucket[i]
+        self._len -= 1
+        if not bucket:
+            del self._buckets[pos]
+            del self._maxes[pos]
+        elif i == len(bucket):
+            self._maxes[pos] = bucket[-1]
+        return True
+
+    def after(self, key: K, limit: int) -> list[K]:
+        """Return up to ``limit`` keys greater than ``key``, ascending."""
+        pos = bisect_right(self._maxes, key)
+        if pos == len(self._buckets):
+            return []
+        bucket = self._buckets[pos]
+        start = bisect_right(bucket, key)
+        result = bucket[start : start + limit]
+        for i in range(pos + 1, len(self._buckets)):
+            if len(result) >= limit:
+                break
+            result.extend(self._buckets[i][: limit - len(result)])
+        return result
+
+    def before(self, key: K, limit: int) -> list[K]:
+        """Return up to ``limit`` keys less than ``key``, descending."""
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._buckets):
+            pos -= 1
+        if pos < 0:
+            return []
+        bucket = self._buckets[pos]
+        end = bisect_left(bucket, key)
+        result = bucket[max(end - limit, 0) : end][::-1]
+        for i in range(pos - 1, -1, -1):
+            if len(result) >= limit:
+                break
+            bucket = self._buckets[i]
+            result.extend(reversed(bucket[max(len(bucket) - (limit - len(result)), 0) :]))
+        return result
+
+    def pop_last(self, limit: int) -> list[K]:
+        """Remove and return up to ``limit`` of the largest keys, ascending."""
+        removed: list[K] = []
+        while self._buckets and len(removed) < limit:
+            bucket = self._buckets[-1]
+            take = min(limit - len(removed), len(bucket))
+            removed[:0] = bucket[len(bucket) - take :]
+            del bucket[len(bucket) - take :]
+            if bucket:
+                self._maxes[-1] = bucket[-1]
+            else:
+                self._buckets.pop()
+                self._maxes.pop()
+        self._len -= len(removed)
+        return removed
+
+
+class SortedIdIndex(SortedIndex[int]):
+    """Sorted set of integer ids."""
+
+    def __contains__(self, todo_id: object) -> bool:
+        return isinstance(todo_id, int) and super().__contains__(todo_id)
+
+
+class Bitmap:
+    """Compact set of non-negative integer ids.
+
+    Ids are stored as bits in fixed-size chunks (``CHUNK_BITS`` ids per chunk,
+    each chunk a Python int), and only chunks with at least one bit set are
+    kept. Adding or removing an id touches one small chunk, and intersections
+    and unions work chunk by chunk, so their cost depends on how many chunks
+    hold ids rather than on the highest id.
+    """
+
+    CHUNK_BITS = 1024
+
+    __slots__ = ("_chunks",)
+
+    def __init__(self, ids: Iterable[int] = ()) -> None:
+        """Initialize the bitmap with optional ids."""
+        self._chunks: dict[int, int] = {}
+        for todo_id in ids:
+            self.add(todo_id)
+
+    def __len__(self) -> int:
+        return sum(chunk.bit_count() for chunk in self._chunks.values())
+
+    def __bool__(self) -> bool:
+        return bool(self._chunks)
+
+    def __contains__(self, todo_id: object) -> bool:
+        if not isinstance(todo_id, int):
+            return False
+        chunk_no, bit = divmod(todo_id, self.CHUNK_BITS)
+        return bool(self._chunks.get(chunk_no, 0) >> bit & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the ids in ascending order."""
+        for chunk_no in sorted(self._chunks):
+            chunk = self._chunks[chunk_no]
+            base = chunk_no * self.CHUNK_BITS
+            while chunk:
+                low = chunk & -chunk
+                yield base + low.bit_length() - 1
+                chunk ^= low
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        small, large = sorted((self._chunks, other._chunks), key=len)
+        result = Bitmap()
+        for chunk_no, chunk in small.items():
+            common = chunk & large.get(chunk_no, 0)
+            if common:
+                result._chunks[chunk_no] = common
+        return result
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        result = Bitmap()
+        result._chunks = dict(self._chunks)
+        for chunk_no, chunk in other._chunks.items():
+            result._chunks[chunk_no] = result._chunks.get(chunk_no, 0) | chunk
+        return result
+
+    def add(self, todo_id: int) -> None:
+        """Insert an id."""
+        chunk_no, bit = divmod(todo_id, self.CHUNK_BITS)
+        self._chunks[chunk_no] = self._chunks.get(chunk_no, 0) | 1 << bit
+
+    def discard(self, todo_id: int) -> None:
+        """Remove an id if present."""
+        chunk_no, bit = divmod(todo_id, self.CHUNK_BITS)
+        chunk = self._chunks.get(chunk_no, 0) & ~(1 << bit)
+        if chunk:
+            self._chunks[chunk_no] = chunk
+        else:
+            self._chunks.pop(chunk_no, None)
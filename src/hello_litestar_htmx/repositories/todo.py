@@ -1,8 +1,31 @@
 """Todo repository for data access layer."""
 
+import heapq
+import operator
+import time
+from collections import OrderedDict, deque
+from collections.abc import Iterable, Iterator, Sequence
+from functools import reduce
+from itertools import islice
 from typing import Protocol
 
-from hello_litestar_htmx.models.todo import Todo, TodoCreate, TodoUpdate
+from hello_litestar_htmx.models.todo import (
+    ChangeKind,
+    SortOrder,
+    TagMatch,
+    Todo,
+    TodoChange,
+    TodoCreate,
+    TodoFilter,
+    TodoImport,
+    TodoUpdate,
+)
+from hello_litestar_htmx.repositories.indexes import Bitmap, SortedIdIndex, SortedIndex
+
+POSITION_STEP = 1.0
+"""Distance between the positions of consecutive todos when appended or rebalanced."""
+MIN_POSITION_GAP = 1e-6
+"""A move that leaves a smaller gap between two neighbours asks for a rebalance."""
 
 
 class TodoRepositoryProtocol(Protocol):
@@ -11,8 +34,26 @@ class TodoRepositoryProtocol(Protocol):
     This allows for easy mocking in tests and switching implementations (e.g., from in-memory to database).
     """
 
-    def get_all(self) -> list[Todo]:
-        """Get all todos."""
+    def get_all(
+        self,
+        status: TodoFilter = TodoFilter.ALL,
+        order: SortOrder = SortOrder.ASC,
+        tags: Sequence[str] = (),
+        tag_match: TagMatch = TagMatch.ALL,
+    ) -> list[Todo]:
+        """Get todos matching ``status`` and ``tags``, in list (position) order."""
+        ...
+
+    def get_tags(self) -> dict[str, int]:
+        """Get every tag in use with its number of todos, sorted by tag."""
+        ...
+
+    def iter_batches(self, batch_size: int = 1000) -> Iterator[list[Todo]]:
+        """Iterate over all todos in creation order, ``batch_size`` at a time."""
+        ...
+
+    def count(self, status: TodoFilter = TodoFilter.ALL) -> int:
+        """Count todos matching ``status``."""
         ...
 
     def get_by_id(self, todo_id: int) -> Todo | None:
@@ -23,6 +64,10 @@ class TodoRepositoryProtocol(Protocol):
         """Create a new todo."""
         ...
 
+    def create_many(self, todos: Iterable[TodoImport]) -> int:
+        """Create todos in bulk. Returns the number created."""
+        ...
+
     def update(self, todo_id: int, todo_data: TodoUpdate) -> Todo | None:
         """Update a todo. Returns None if not found."""
         ...
@@ -35,38 +80,216 @@ class TodoRepositoryProtocol(Protocol):
         """Toggle the completed status of a todo. Returns None if not found."""
         ...
 
+    def move(
+        self, todo_id: int, after_id: int | None = None, before_id: int | None = None
+    ) -> Todo | None:
+        """Move a todo directly after ``after_id`` or, failing that, before ``before_id``.
+
+        With neither, the todo moves to the end of the list. Only the moved
+        todo is rewritten. Returns None if the todo or the anchor is not found.
+        """
+        ...
+
+    def needs_rebalance(self) -> bool:
+        """Whether moves have left gaps between positions that are nearly exhausted."""
+        ...
+
+    def rebalance_positions(self) -> int:
+        """Spread positions evenly again, keeping the order. Returns the number of todos."""
+        ...
+
+    def iter_rebalance(self, batch_size: int = 1000) -> Iterator[int]:
+        """Spread positions evenly again, ``batch_size`` todos at a time.
+
+        Yields the number of todos handled by each batch. The order stays
+        valid between batches, so other writes may run in between.
+        """
+        ...
+
+    def clear_completed(self, limit: int) -> int:
+        """Delete up to ``limit`` completed todos. Returns the number deleted."""
+        ...
+
+    def pop_completed_before(self, cutoff: float, limit: int) -> list[tuple[Todo, float]]:
+        """Remove up to ``limit`` todos completed before ``cutoff`` (epoch seconds).
+
+        Returns the removed todos with their completion times, oldest first.
+        """
+        ...
+
+    def restore(self, todos: Iterable[tuple[Todo, float]]) -> None:
+        """Put back todos returned by `pop_completed_before` (e.g. if archiving failed)."""
+        ...
+
+    def next_due(self) -> float | None:
+        """Get the due time (epoch seconds) of the earliest pending reminder, if any."""
+        ...
+
+    def pop_due(self, now: float, limit: int) -> list[Todo]:
+        """Remove and return up to ``limit`` todos whose reminder is due at ``now``.
+
+        Each reminder fires once; it is pending again only if the due time is
+        changed or the todo is marked incomplete again.
+        """
+        ...
+
+    def get_version(self) -> int:
+        """Get the sequence number of the latest change."""
+        ...
+
+    def get_changes(self, since: int) -> list[TodoChange] | None:
+        """Get net changes after version ``since``.
+
+        Returns None if ``since`` is no longer covered by the change log, in
+        which case the caller must reload everything.
+        """
+        ...
+
 
 class InMemoryTodoRepository:
     """In-memory implementation of TodoRepository.
 
     This is suitable for development and testing. In production, you would use
     a database-backed implementation (e.g., SQLAlchemy, Tortoise ORM).
+
+    Todos are stored in a dict keyed by id, and sorted id indexes per
+    completion status are kept up to date on every write, so filtered views
+    never scan the whole collection.
+
+    List order is a float ``position`` per todo: new todos go one
+    `POSITION_STEP` after the last one, and a move takes the midpoint between
+    its new neighbours, so it rewrites a single todo. ``(position, id)`` keys
+    are kept in sorted indexes (one for all todos, one per completion status),
+    which `get_all` walks in order without sorting. Repeated moves into the
+    same gap halve it each time; once a gap falls below `MIN_POSITION_GAP`,
+    `needs_rebalance` turns true and `iter_rebalance` (run by the service in
+    the background, one batch at a time) spreads all positions out again.
+
+    Every write also appends ``(version, kind, id)`` to a bounded change log,
+    so clients can fetch only what changed since the version they last saw.
+
+    Completion times are kept in an OrderedDict in completion order, so the
+    todos eligible for archiving are always at its front.
+
+    Each tag has a `Bitmap` of the ids of its todos, so tag filters are
+    chunk-wise AND/OR operations whose cost depends on the tagged todos, not on
+    the list size. Only the matches are then put in position order.
+
+    Pending reminders (incomplete todos with a due time) are a dict of id to
+    due timestamp plus a min-heap of ``(timestamp, id)``. Changing or removing
+    a reminder only updates the dict; the old heap entry no longer matches it
+    and is skipped when it reaches the top. The heap is rebuilt from the dict
+    when stale entries outnumber live ones, so finding the next reminder stays
+    O(log n) and no operation ever scans the todos.
     """
 
-    def __init__(self) -> None:
-        """Initialize the repository with empty storage."""
-        self._todos: list[Todo] = []
-        self._next_id: int = 1
+    def __init__(self, max_changes: int = 1000, next_id: int = 1) -> None:
+        """Initialize the repository with empty storage.
+
+        Args:
+            max_changes: Number of change-log entries retained for delta sync.
+            next_id: First id to assign (e.g. after the highest archived id).
+        """
+        self._todos: dict[int, Todo] = {}
+        self._ids_by_completed: dict[bool, SortedIdIndex] = {
+            False: SortedIdIndex(),
+            True: SortedIdIndex(),
+        }
+        self._order: SortedIndex[tuple[float, int]] = SortedIndex()
+        self._order_by_completed: dict[bool, SortedIndex[tuple[float, int]]] = {
+            False: SortedIndex(),
+            True: SortedIndex(),
+        }
+        self._needs_rebalance = False
+        self._completed_at: OrderedDict[int, float] = OrderedDict()
+        self._tags: dict[str, Bitmap] = {}
+        self._due: dict[int, float] = {}
+        self._due_heap: list[tuple[float, int]] = []
+        self._next_id: int = next_id
+        self._version: int = 0
+        self._changes: deque[tuple[int, ChangeKind, int]] = deque(maxlen=max_changes)
+
+    def get_all(
+        self,
+        status: TodoFilter = TodoFilter.ALL,
+        order: SortOrder = SortOrder.ASC,
+        tags: Sequence[str] = (),
+        tag_match: TagMatch = TagMatch.ALL,
+    ) -> list[Todo]:
+        """Get todos matching ``status`` and ``tags``, in list (position) order.
+
+        Without tags, the position index of the status is walked in order.
+        With tags, the tag bitmaps are combined first and only the matching
+        todos are filtered by status and sorted.
+        """
+        if tags:
+            return self._get_tagged(status, order, tags, tag_match)
+        if status == TodoFilter.ALL:
+            index = self._order
+        else:
+            index = self._order_by_completed[status == TodoFilter.COMPLETED]
+        keys = reversed(index) if order == SortOrder.DESC else index
+        todos = self._todos
+        return [todos[todo_id] for _, todo_id in keys]
+
+    def get_tags(self) -> dict[str, int]:
+        """Get every tag in use with its number of todos, sorted by tag."""
+        return {tag: len(self._tags[tag]) for tag in sorted(self._tags)}
+
+    def iter_batches(self, batch_size: int = 1000) -> Iterator[list[Todo]]:
+        """Iterate over all todos in creation order, ``batch_size`` at a time.
 
-    def get_all(self) -> list[Todo]:
-        """Get all todos."""
-        return self._todos.copy()
+        Each batch is looked up from the status indexes by id cursor, so the
+        iterator holds only one batch in memory and tolerates writes between
+        batches (unlike iterating the underlying dict directly).
+        """
+        last_id = 0
+        while True:
+            ids: list[int] = []
+            for index in self._ids_by_completed.values():
+                ids.extend(index.after(last_id, batch_size))
+            if not ids:
+                return
+            ids.sort()
+            del ids[batch_size:]
+            last_id = ids[-1]
+            yield [self._todos[i] for i in ids]
+
+    def count(self, status: TodoFilter = TodoFilter.ALL) -> int:
+        """Count todos matching ``status``."""
+        if status == TodoFilter.ALL:
+            return len(self._todos)
+        return len(self._ids_by_completed[status == TodoFilter.COMPLETED])
 
     def get_by_id(self, todo_id: int) -> Todo | None:
         """Get a todo by ID."""
-        return next((t for t in self._todos if t.id == todo_id), None)
+        return self._todos.get(todo_id)
 
     def create(self, todo_data: TodoCreate) -> Todo:
         """Create a new todo."""
-        todo = Todo(
-            id=self._next_id,
-            title=todo_data.title,
-            completed=False,
-        )
-        self._todos.append(todo)
+        todo = self._new_todo(todo_data, completed=False, position=self._next_position())
+        self._todos[todo.id] = todo
+        self._index(todo)
         self._next_id += 1
+        self._record(ChangeKind.CREATE, todo.id)
         return todo
 
+    def create_many(self, todos: Iterable[TodoImport]) -> int:
+        """Create todos in bulk. Returns the number created."""
+        count = 0
+        position = self._next_position()
+        for todo_data in todos:
+            todo = self._new_todo(todo_data, completed=todo_data.completed, position=position)
+            self._todos[todo.id] = todo
+            self._index(todo)
+            if todo.completed:
+                self._completed_at[todo.id] = time.time()
+            self._next_id += 1
+            position += POSITION_STEP
+            self._record(ChangeKind.CREATE, todo.id)
+            count += 1
+        return count
+
     def update(self, todo_id: int, todo_data: TodoUpdate) -> Todo | None:
         """Update a todo. Returns None if not found."""
         todo = self.get_by_id(todo_id)
@@ -76,16 +299,27 @@ class InMemoryTodoRepository:
         # Update only provided fields
         if todo_data.title is not None:
             todo.title = todo_data.title
+        if "due_at" in todo_data.model_fields_set:
+            todo.due_at = todo_data.due_at
+            self._schedule_due(todo)
+        if todo_data.tags is not None:
+            self._untag(todo)
+            todo.tags = todo_data.tags
+            self._tag(todo)
         if todo_data.completed is not None:
-            todo.completed = todo_data.completed
+            self._set_completed(todo, todo_data.completed)
 
+        self._record(ChangeKind.UPDATE, todo_id)
         return todo
 
     def delete(self, todo_id: int) -> bool:
         """Delete a todo. Returns True if deleted, False if not found."""
-        initial_length = len(self._todos)
-        self._todos = [t for t in self._todos if t.id != todo_id]
-        return len(self._todos) < initial_length
+        todo = self._todos.pop(todo_id, None)
+        if todo is None:
+            return False
+        self._unindex(todo)
+        self._record(ChangeKind.DELETE, todo_id)
+        return True
 
     def toggle_completed(self, todo_id: int) -> Todo | None:
         """Toggle the completed status of a todo. Returns None if not found."""
@@ -93,9 +327,351 @@ class InMemoryTodoRepository:
         if todo is None:
             return None
 
-        todo.completed = not todo.completed
+        self._set_completed(todo, not todo.completed)
+        self._record(ChangeKind.UPDATE, todo_id)
+        return todo
+
+    def move(
+        self, todo_id: int, after_id: int | None = None, before_id: int | None = None
+    ) -> Todo | None:
+        """Move a todo directly after ``after_id`` or, failing that, before ``before_id``.
+
+        The new position is the midpoint between the neighbours found in the
+        position index, so the cost does not depend on the list size. If the
+        gap is too small to split (float precision is exhausted), positions are
+        rebalanced first.
+        """
+        todo = self._todos.get(todo_id)
+        if todo is None:
+            return None
+        if after_id is not None:
+            anchor = self._todos.get(after_id)
+            if anchor is None:
+                return None
+            if anchor is todo:
+                return todo
+            prev_key = (anchor.position, anchor.id)
+            next_key = self._neighbour(self._order.after(prev_key, 2), todo_id)
+        elif before_id is not None:
+            anchor = self._todos.get(before_id)
+            if anchor is None:
+                return None
+            if anchor is todo:
+                return todo
+            next_key = (anchor.position, anchor.id)
+            prev_key = self._neighbour(self._order.before(next_key, 2), todo_id)
+        else:
+            prev_key = self._neighbour(reversed(self._order), todo_id)
+            next_key = None
+        if prev_key is None and next_key is None:
+            return todo
+        if next_key is None:
+            position = prev_key[0] + POSITION_STEP
+        elif prev_key is None:
+            position = next_key[0] - POSITION_STEP
+        else:
+            position = (prev_key[0] + next_key[0]) / 2
+            if not prev_key[0] < position < next_key[0]:
+                self.rebalance_positions()
+                return self.move(todo_id, after_id, before_id)
+            if min(position - prev_key[0], next_key[0] - position) < MIN_POSITION_GAP:
+                self._needs_rebalance = True
+
+        self._remove_order(todo)
+        todo.position = position
+        self._add_order(todo)
+        self._record(ChangeKind.UPDATE, todo_id)
         return todo
 
+    def needs_rebalance(self) -> bool:
+        """Whether moves have left gaps between positions that are nearly exhausted."""
+        return self._needs_rebalance
+
+    def rebalance_positions(self) -> int:
+        """Spread positions evenly again, keeping the order. Returns the number of todos.
+
+        This rewrites every todo, but only the internal sort keys change, so no
+        change-log entries are recorded.
+        """
+        todos = [self._todos[todo_id] for _, todo_id in self._order]
+        for i, todo in enumerate(todos, 1):
+            todo.position = i * POSITION_STEP
+        self._order = SortedIndex((todo.position, todo.id) for todo in todos)
+        self._order_by_completed = {
+            completed: SortedIndex(
+                (todo.position, todo.id) for todo in todos if todo.completed is completed
+            )
+            for completed in (False, True)
+        }
+        self._needs_rebalance = False
+        return len(todos)
+
+    def iter_rebalance(self, batch_size: int = 1000) -> Iterator[int]:
+        """Spread positions evenly again, ``batch_size`` todos at a time.
+
+        Rewriting positions front to back would let a todo's new position pass
+        a later todo that still has its old one, so this runs two passes that
+        each keep every todo between its neighbours. The first walks back from
+        the end, lifting todos into a range above all current positions; the
+        second walks forward from the start, placing them `POSITION_STEP` apart
+        below that range. Todos created or moved between batches are picked up
+        by whichever pass has not reached them yet, and a todo whose target
+        would not fit between its neighbours is left where it is. As with
+        `rebalance_positions`, no change-log entries are recorded.
+        """
+        self._needs_rebalance = False
+        last = next(reversed(self._order), None)
+        if last is None:
+            return
+        position = max(last[0], 0.0) + 2 * (len(self._order) + 1) * POSITION_STEP
+        keys = list(islice(reversed(self._order), batch_size))
+        while keys:
+            for key in keys:
+                cursor = self._reposition(key, position - POSITION_STEP)
+                position = cursor[0]
+            yield len(keys)
+            keys = self._order.before(cursor, batch_size)
+
+        position = 0.0
+        keys = list(islice(self._order, batch_size))
+        while keys:
+            for key in keys:
+                cursor = self._reposition(key, position + POSITION_STEP)
+                position = cursor[0]
+            yield len(keys)
+            keys = self._order.after(cursor, batch_size)
+
+    def clear_completed(self, limit: int) -> int:
+        """Delete up to ``limit`` completed todos. Returns the number deleted.
+
+        Removes the newest completed todos first, so each call only trims the
+        tail of the completed index.
+        """
+        removed = self._ids_by_completed[True].pop_last(limit)
+        for todo_id in removed:
+            todo = self._todos.pop(todo_id)
+            self._remove_order(todo)
+            self._untag(todo)
+            del self._completed_at[todo_id]
+            self._record(ChangeKind.DELETE, todo_id)
+        return len(removed)
+
+    def pop_completed_before(self, cutoff: float, limit: int) -> list[tuple[Todo, float]]:
+        """Remove up to ``limit`` todos completed before ``cutoff`` (epoch seconds).
+
+        Only the front of the completion-ordered dict is visited, so the cost
+        is proportional to the number of todos removed.
+        """
+        removed = []
+        while self._completed_at and len(removed) < limit:
+            todo_id, completed_at = next(iter(self._completed_at.items()))
+            if completed_at >= cutoff:
+                break
+            todo = self._todos.pop(todo_id)
+            self._unindex(todo)
+            self._record(ChangeKind.DELETE, todo_id)
+            removed.append((todo, completed_at))
+        return removed
+
+    def restore(self, todos: Iterable[tuple[Todo, float]]) -> None:
+        """Put back todos returned by `pop_completed_before`.
+
+        Restored todos keep their positions, so they return to their place in
+        the list. Completion order is re-sorted; this is a rare recovery path.
+        """
+        for todo, completed_at in todos:
+            self._todos[todo.id] = todo
+            self._index(todo)
+            if todo.completed:
+                self._completed_at[todo.id] = completed_at
+            self._record(ChangeKind.CREATE, todo.id)
+        self._completed_at = OrderedDict(sorted(self._completed_at.items(), key=lambda i: i[1]))
+
+    def next_due(self) -> float | None:
+        """Get the due time (epoch seconds) of the earliest pending reminder, if any."""
+        heap = self._due_heap
+        while heap and self._due.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now: float, limit: int) -> list[Todo]:
+        """Remove and return up to ``limit`` todos whose reminder is due at ``now``.
+
+        Only due heap entries (and stale ones in front of them) are visited.
+        """
+        fired: list[Todo] = []
+        heap = self._due_heap
+        while heap and heap[0][0] <= now and len(fired) < limit:
+            due, todo_id = heapq.heappop(heap)
+            if self._due.get(todo_id) == due:
+                del self._due[todo_id]
+                fired.append(self._todos[todo_id])
+        return fired
+
+    def get_version(self) -> int:
+        """Get the sequence number of the latest change."""
+        return self._version
+
+    def get_changes(self, since: int) -> list[TodoChange] | None:
+        """Get net changes after version ``since``, oldest first.
+
+        Multiple changes to one todo collapse into one: a todo created and
+        deleted within the window is omitted, and a todo created and then
+        updated is reported as created. Cost is proportional to the number of
+        changes since ``since``, not to the number of todos.
+
+        Returns None if ``since`` is no longer covered by the change log (or is
+        from the future, e.g. after a restart).
+        """
+        oldest = self._changes[0][0] if self._changes else self._version + 1
+        if since > self._version or since < oldest - 1:
+            return None
+
+        # Walk newest to oldest; per todo remember (earliest, latest) kind
+        kinds: dict[int, tuple[ChangeKind, ChangeKind]] = {}
+        for seq, kind, todo_id in reversed(self._changes):
+            if seq <= since:
+                break
+            latest = kinds[todo_id][1] if todo_id in kinds else kind
+            kinds[todo_id] = (kind, latest)
+
+        changes = []
+        for todo_id, (earliest, latest) in reversed(kinds.items()):
+            if latest == ChangeKind.DELETE:
+                if earliest != ChangeKind.CREATE:
+                    changes.append(TodoChange(kind=ChangeKind.DELETE, todo_id=todo_id))
+                continue
+            kind = ChangeKind.CREATE if earliest == ChangeKind.CREATE else ChangeKind.UPDATE
+            changes.append(TodoChange(kind=kind, todo_id=todo_id, todo=self._todos[todo_id]))
+        return changes
+
+    def _new_todo(self, todo_data: TodoCreate, completed: bool, position: float) -> Todo:
+        fields: dict[str, object] = {
+            "id": self._next_id,
+            "title": todo_data.title,
+            "completed": completed,
+            "position": position,
+        }
+        # Pydantic keeps a set of the explicitly passed fields on every
+        # instance; a fifth entry would make that set four times larger, so
+        # optional fields are only passed when they are set
+        if todo_data.due_at is not None:
+            fields["due_at"] = todo_data.due_at
+        if todo_data.tags:
+            fields["tags"] = todo_data.tags
+        return Todo(**fields)
+
+    def _get_tagged(
+        self, status: TodoFilter, order: SortOrder, tags: Sequence[str], tag_match: TagMatch
+    ) -> list[Todo]:
+        bitmaps = [self._tags.get(tag) for tag in tags]
+        if tag_match == TagMatch.ALL:
+            if None in bitmaps:
+                return []
+            matched = reduce(operator.and_, bitmaps)
+        else:
+            matched = reduce(operator.or_, [b for b in bitmaps if b is not None], Bitmap())
+        todos = [self._todos[todo_id] for todo_id in matched]
+        if status != TodoFilter.ALL:
+            completed = status == TodoFilter.COMPLETED
+            todos = [todo for todo in todos if todo.completed == completed]
+        todos.sort(key=operator.attrgetter("position"), reverse=order == SortOrder.DESC)
+        return todos
+
+    def _set_completed(self, todo: Todo, completed: bool) -> None:
+        if todo.completed == completed:
+            return
+        self._unindex(todo)
+        todo.completed = completed
+        self._index(todo)
+        if completed:
+            self._completed_at[todo.id] = time.time()
+
+    def _index(self, todo: Todo) -> None:
+        self._ids_by_completed[todo.completed].add(todo.id)
+        self._add_order(todo)
+        self._tag(todo)
+        if todo.due_at is not None:
+            self._schedule_due(todo)
+
+    def _unindex(self, todo: Todo) -> None:
+        self._ids_by_completed[todo.completed].discard(todo.id)
+        self._remove_order(todo)
+        self._untag(todo)
+        self._completed_at.pop(todo.id, None)
+        if self._due.pop(todo.id, None) is not None:
+            self._compact_due()
+
+    def _tag(self, todo: Todo) -> None:
+        for tag in todo.tags:
+            bitmap = self._tags.get(tag)
+            if bitmap is None:
+                bitmap = self._tags[tag] = Bitmap()
+            bitmap.add(todo.id)
+
+    def _untag(self, todo: Todo) -> None:
+        for tag in todo.tags:
+            bitmap = self._tags[tag]
+            bitmap.discard(todo.id)
+            if not bitmap:
+                del self._tags[tag]
+
+    def _schedule_due(self, todo: Todo) -> None:
+        if todo.due_at is None or todo.completed:
+            if self._due.pop(todo.id, None) is not None:
+                self._compact_due()
+            return
+        due = todo.due_at.timestamp()
+        self._due[todo.id] = due
+        heapq.heappush(self._due_heap, (due, todo.id))
+        self._compact_due()
+
+    def _compact_due(self) -> None:
+        # Drop stale heap entries once they outnumber the pending reminders
+        if len(self._due_heap) > 2 * len(self._due) + 64:
+            self._due_heap = [(due, todo_id) for todo_id, due in self._due.items()]
+            heapq.heapify(self._due_heap)
+
+    def _add_order(self, todo: Todo) -> None:
+        key = (todo.position, todo.id)
+        self._order.add(key)
+        self._order_by_completed[todo.completed].add(key)
+
+    def _remove_order(self, todo: Todo) -> None:
+        key = (todo.position, todo.id)
+        self._order.discard(key)
+        self._order_by_completed[todo.completed].discard(key)
+
+    def _reposition(self, key: tuple[float, int], position: float) -> tuple[float, int]:
+        """Move the todo at ``key`` to ``position`` if it stays between its neighbours.
+
+        Returns the todo's key afterwards.
+        """
+        lower = self._order.before(key, 1)
+        upper = self._order.after(key, 1)
+        if lower and position <= lower[0][0] or upper and position >= upper[0][0]:
+            return key
+        todo = self._todos[key[1]]
+        self._remove_order(todo)
+        todo.position = position
+        self._add_order(todo)
+        return position, todo.id
+
+    def _next_position(self) -> float:
+        last = next(reversed(self._order), None)
+        return POSITION_STEP if last is None else last[0] + POSITION_STEP
+
+    @staticmethod
+    def _neighbour(
+        keys: Iterable[tuple[float, int]], todo_id: int
+    ) -> tuple[float, int] | None:
+        """Return the first key that is not the todo being moved."""
+        return next((key for key in keys if key[1] != todo_id), None)
+
+    def _record(self, kind: ChangeKind, todo_id: int) -> None:
+        self._version += 1
+        self._changes.append((self._version, kind, todo_id))
+
 
 # Type alias for dependency injection
 TodoRepository = TodoRepositoryProtocol
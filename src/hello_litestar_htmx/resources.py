@@ -0,0 +1,216 @@
+"""Long-lived application resources managed by the Litestar lifespan.
+
+The repository, the job runner and the `TodoService` that wraps them are built
+once at startup by `ResourceRegistry.lifespan` and held by the registry, which
+is their only owner. The registry's providers take no arguments and only
+return the prebuilt objects, so resolving ``todo_service`` for a request
+allocates nothing. (Injecting Litestar's ``state`` into a provider would work
+too, but the extra kwarg and the `State` lookup cost more than building a
+`TodoService` did.)
+
+Startup also opens the todo archive (new ids continue after the highest
+archived one), warms the Jinja template cache so the first request to each
+page does not pay for compiling its templates, and starts the audit log writer,
+the reminder scheduler and the periodic archive sweep. On shutdown the sweep
+and the scheduler are stopped, running jobs
+get a grace period to finish before they are cancelled, then buffered audit
+records are flushed and the job and render worker threads are stopped.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from litestar import Litestar
+
+from hello_litestar_htmx.rendering import RenderConfig, TemplateRenderer
+from hello_litestar_htmx.repositories.archive import ArchiveConfig, TodoArchive
+from hello_litestar_htmx.repositories.todo import InMemoryTodoRepository, TodoRepository
+from hello_litestar_htmx.services.audit import AuditLog
+from hello_litestar_htmx.services.jobs import JobRunner
+from hello_litestar_htmx.services.reminders import ReminderScheduler
+from hello_litestar_htmx.services.todo import TodoService
+
+logger = logging.getLogger(__name__)
+
+SHUTDOWN_GRACE_PERIOD = 5.0
+"""Seconds running jobs may keep going after shutdown starts."""
+
+
+@dataclass
+class AppResources:
+    """Container for the resources shared by all requests."""
+
+    repository: TodoRepository = field(default_factory=InMemoryTodoRepository)
+    jobs: JobRunner = field(default_factory=JobRunner)
+    audit: AuditLog | None = None
+    archive: TodoArchive | None = None
+    renderer: TemplateRenderer | None = None
+    reminders: ReminderScheduler = field(init=False)
+    todo_service: TodoService = field(init=False)
+    _sweeper: asyncio.Task[None] | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.reminders = ReminderScheduler(self.repository)
+        self.todo_service = TodoService(
+            self.repository, self.jobs, self.audit, self.archive, self.reminders
+        )
+
+    def warm(self, app: Litestar) -> int:
+        """Compile every template up front.
+
+        Args:
+            app: The application whose template engine should be warmed.
+
+        Returns:
+            Number of templates compiled.
+        """
+        engine = app.template_engine
+        if engine is None:
+            return 0
+        names = [n for n in engine.engine.list_templates() if n.endswith(".html")]
+        for name in names:
+            engine.get_template(name)
+        return len(names)
+
+    async def start(self) -> None:
+        """Start background writers, the reminder scheduler and the archive sweep."""
+        if self.audit is not None:
+            await self.audit.start()
+        self.reminders.start()
+        if self.archive is not None:
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_archive())
+
+    async def close(self, grace_period: float = SHUTDOWN_GRACE_PERIOD) -> None:
+        """Drain background jobs, flush the audit log and release worker threads.
+
+        Args:
+            grace_period: Seconds to let running jobs finish before cancelling them.
+        """
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sweeper
+            self._sweeper = None
+        await self.reminders.stop()
+        await self.jobs.shutdown(grace_period=grace_period)
+        if self.audit is not None:
+            await self.audit.stop()
+        if self.renderer is not None:
+            await asyncio.to_thread(self.renderer.shutdown)
+
+    async def _sweep_archive(self) -> None:
+        config = self.archive.config
+        while True:
+            await asyncio.sleep(config.sweep_interval)
+            # A failed sweep put its batch back; try again on the next round
+            try:
+                await self.todo_service.archive_completed(older_than=config.archive_after)
+            except Exception:
+                logger.exception("Archive sweep failed; retrying in %ss", config.sweep_interval)
+
+
+class ResourceRegistry:
+    """Owns the `AppResources` of a running application and provides them for DI."""
+
+    def __init__(
+        self,
+        audit: AuditLog | None = None,
+        archive_config: ArchiveConfig | None = None,
+        render_config: RenderConfig | None = None,
+    ) -> None:
+        """Initialize the registry.
+
+        Args:
+            audit: Audit log started and stopped with the application, if logging is enabled.
+                It exists before startup so that middleware can hold a reference to it.
+            archive_config: Where and when to archive completed todos; no archive if None.
+            render_config: When to render templates off the event loop.
+        """
+        self.audit = audit
+        self.archive_config = archive_config
+        self.render_config = render_config or RenderConfig()
+        self.resources: AppResources | None = None
+
+    @asynccontextmanager
+    async def lifespan(self, app: Litestar) -> AsyncIterator[AppResources]:
+        """Create, warm and finally close the application's resources.
+
+        Args:
+            app: The Litestar application.
+
+        Yields:
+            The resources, also available as `current` while the app is running.
+        """
+        if self.resources is not None:
+            # 同じアプリの lifespan が入れ子で動く場合（TestClient の多重起動など）は
+            # 外側のリソースを共有し、閉じるのも外側に任せる
+            yield self.resources
+            return
+
+        archive = None
+        next_id = 1
+        if self.archive_config is not None:
+            archive = await asyncio.to_thread(TodoArchive, self.archive_config)
+            next_id = archive.max_id + 1
+        renderer = None
+        if app.template_engine is not None:
+            renderer = TemplateRenderer(app.template_engine, self.render_config)
+        resources = AppResources(
+            repository=InMemoryTodoRepository(next_id=next_id),
+            audit=self.audit,
+            archive=archive,
+            renderer=renderer,
+        )
+        resources.warm(app)
+        await resources.start()
+        self.resources = resources
+        try:
+            yield resources
+        finally:
+            await resources.close()
+            self.resources = None
+
+    @property
+    def current(self) -> AppResources:
+        """The resources of the running application.
+
+        Raises:
+            RuntimeError: If the lifespan is not running.
+        """
+        if self.resources is None:
+            raise RuntimeError("resources not initialised; is the lifespan running?")
+        return self.resources
+
+    def provide_todo_service(self) -> TodoService:
+        """Dependency provider for TodoService.
+
+        Litestarの依存性注入システムが自動的にこの関数を呼び出し、
+        起動時に作成したTodoServiceをルートハンドラに注入します。
+
+        Returns:
+            The application-wide TodoService instance.
+        """
+        return self.current.todo_service
+
+    def provide_job_runner(self) -> JobRunner:
+        """Dependency provider for the background JobRunner."""
+        return self.current.jobs
+
+    def provide_reminder_scheduler(self) -> ReminderScheduler:
+        """Dependency provider for the ReminderScheduler."""
+        return self.current.reminders
+
+    def provide_template_renderer(self) -> TemplateRenderer:
+        """Dependency provider for the off-loop TemplateRenderer.
+
+        Raises:
+            RuntimeError: If the lifespan is not running or the app has no template engine.
+        """
+        renderer = self.current.renderer
+        if renderer is None:
+            raise RuntimeError("template renderer not available; the app has no template engine")
+        return renderer
@@ -1,6 +1,9 @@
 """Route handlers for the application."""
 
+from hello_litestar_htmx.routes.jobs import router as jobs_router
+from hello_litestar_htmx.routes.live import router as live_router
 from hello_litestar_htmx.routes.pages import router as pages_router
+from hello_litestar_htmx.routes.profiles import router as profiles_router
 from hello_litestar_htmx.routes.todos import router as todos_router
 
-__all__ = ["pages_router", "todos_router"]
+__all__ = ["jobs_router", "live_router", "pages_router", "profiles_router", "todos_router"]
@@ -0,0 +1,33 @@
+"""Routes for background job status."""
+
+from litestar import Router, get
+from litestar.exceptions import NotFoundException
+from litestar.response import Template
+
+from hello_litestar_htmx.services.jobs import JobRunner
+
+
+@get("/jobs/{job_id:str}")
+async def get_job(job_id: str, job_runner: JobRunner) -> Template:
+    """ジョブの進捗（HTMXポーリング用の部分HTML）
+
+    実行中は `hx-trigger="every 1s"` 付きの断片を返し、完了すると
+    ポーリングなしの結果表示に置き換わります。
+
+    Args:
+        job_id: The ID of the job.
+        job_runner: Injected JobRunner instance.
+
+    Returns:
+        Template response with the job status fragment.
+    """
+    job = job_runner.get(job_id)
+    if job is None:
+        raise NotFoundException(f"Job {job_id} not found")
+    return Template(template_name="job_status.html", context={"job": job})
+
+
+router = Router(
+    path="",
+    route_handlers=[get_job],
+)
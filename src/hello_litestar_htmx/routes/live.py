@@ -0,0 +1,117 @@
+"""Routes for the live (WebSocket) Todo page.
+
+Each checkbox click on the regular page is a full HTTP request: cookie parsing,
+a CSRF HMAC check, dependency resolution and a new template response. The live
+page instead opens one WebSocket through the HTMX ws extension. CSRF is checked
+and TodoService is resolved once per connection, and every mutation is answered
+with `todo_item.html` fragments that HTMX swaps in out-of-band by id.
+"""
+
+from typing import Annotated
+
+import msgspec
+from jinja2 import Template as JinjaTemplate
+from litestar import Request, Response, Router, WebSocket, get, websocket
+from litestar.config.csrf import CSRFConfig
+from litestar.params import Dependency
+from litestar.status_codes import WS_1008_POLICY_VIOLATION
+from pydantic import ValidationError
+
+from hello_litestar_htmx.csrf import get_csrf_token, verify_websocket_csrf
+from hello_litestar_htmx.models.todo import TodoCreateForm, TodoLiveMessage
+from hello_litestar_htmx.rendering import TemplateRenderer
+from hello_litestar_htmx.services.todo import TodoService
+
+
+@get("/todos/live")
+async def get_live_page(
+    request: Request, todo_service: TodoService, renderer: TemplateRenderer
+) -> Response:
+    """ライブモードのTodoリストページ（WebSocket経由で更新）
+
+    Args:
+        request: The HTTP request object.
+        todo_service: Injected TodoService instance.
+        renderer: Injected TemplateRenderer (large lists are rendered off the event loop).
+
+    Returns:
+        Template response with the live page.
+    """
+    todos = todo_service.get_all_todos()
+    context = {
+        "todos": todos,
+        "csrf_token": get_csrf_token(request),
+        "status": "all",
+        "order": "asc",
+        "live": True,
+    }
+    return await renderer.respond(request, "todos_live.html", context, size=len(todos))
+
+
+@websocket("/todos/ws")
+async def todo_live_socket(
+    socket: WebSocket,
+    todo_service: TodoService,
+    csrf_config: Annotated[CSRFConfig, Dependency(skip_validation=True)],
+) -> None:
+    """Todo操作用のWebSocket
+
+    接続時に一度だけCSRFトークンを検証し、以降は create / toggle / delete の
+    メッセージを受け取って部分HTMLを返します。
+
+    Args:
+        socket: The WebSocket connection.
+        todo_service: Injected TodoService instance (resolved once per connection).
+        csrf_config: Injected CSRF configuration.
+    """
+    if not verify_websocket_csrf(socket, csrf_config):
+        await socket.close(code=WS_1008_POLICY_VIOLATION, reason="CSRF token verification failed")
+        return
+
+    await socket.accept()
+    reply_template = socket.app.template_engine.get_template("todo_live_reply.html")
+    async for text in socket.iter_data(mode="text"):
+        await socket.send_text(render_live_reply(text, todo_service, reply_template))
+
+
+def render_live_reply(text: str, todo_service: TodoService, template: JinjaTemplate) -> str:
+    """Apply one live message and render the out-of-band swap fragments.
+
+    Args:
+        text: The raw JSON message.
+        todo_service: The TodoService of the connection.
+        template: The compiled ``todo_live_reply.html`` template.
+
+    Returns:
+        HTML fragments to send back over the socket.
+    """
+    try:
+        message = msgspec.json.decode(text, type=TodoLiveMessage, strict=False)
+    except (msgspec.DecodeError, msgspec.ValidationError):
+        return template.render(error="不正なメッセージです")
+
+    if message.action == "create":
+        try:
+            todo = todo_service.create_todo(TodoCreateForm(title=message.title).to_model())
+        except ValidationError as e:
+            errors = e.errors()
+            return template.render(error=errors[0]["msg"] if errors else "入力エラー")
+        return template.render(action="create", todo=todo, live=True)
+
+    if message.id is None:
+        return template.render(error="Todoが指定されていません")
+
+    if message.action == "toggle":
+        todo = todo_service.toggle_todo_completed(message.id)
+        if todo is None:
+            return template.render(error="Todoが見つかりません")
+        return template.render(action="toggle", todo=todo, live=True)
+
+    todo_service.delete_todo(message.id)
+    return template.render(action="delete", todo_id=message.id)
+
+
+router = Router(
+    path="",
+    route_handlers=[get_live_page, todo_live_socket],
+)
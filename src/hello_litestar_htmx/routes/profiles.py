@@ -0,0 +1,32 @@
+"""Routes for browsing request profiles."""
+
+import anyio.to_thread
+from litestar import Request, Router, get
+from litestar.exceptions import NotAuthorizedException
+
+from hello_litestar_htmx.middleware.profiling import ProfileInfo, ProfilingConfig, list_profiles
+
+
+@get("/_profiles")
+async def get_profiles(request: Request, profiling_config: ProfilingConfig) -> list[ProfileInfo]:
+    """最近のプロファイル一覧（新しい順）
+
+    プロファイル取得と同じトークンのヘッダーが必要です。
+    保存されたファイルは `python -m pstats <file>` や snakeviz で開けます。
+
+    Args:
+        request: The HTTP request object.
+        profiling_config: Injected profiling configuration.
+
+    Returns:
+        Metadata of the stored profiles.
+    """
+    if not profiling_config.is_authorized(request.headers.get(profiling_config.header_name)):
+        raise NotAuthorizedException()
+    return await anyio.to_thread.run_sync(list_profiles, profiling_config)
+
+
+router = Router(
+    path="",
+    route_handlers=[get_profiles],
+)
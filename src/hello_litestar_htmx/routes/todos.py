@@ -1,65 +1,149 @@
 """Routes for Todo operations."""
 
+import tempfile
+from collections.abc import AsyncIterator, Sequence
 from typing import Annotated
+from urllib.parse import urlencode
 
-from litestar import Request, Router, delete, get, post
+import anyio.to_thread
+from litestar import Request, Response, Router, delete, get, patch, post
 from litestar.enums import RequestEncodingType
-from litestar.params import Body
-from litestar.response import Template
-from litestar.status_codes import HTTP_200_OK, HTTP_201_CREATED
+from litestar.exceptions import NotFoundException, ValidationException
+from litestar.params import Body, Parameter
+from litestar.response import ServerSentEvent, ServerSentEventMessage, Stream, Template
+from litestar.status_codes import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_202_ACCEPTED,
+    HTTP_204_NO_CONTENT,
+)
 from pydantic import ValidationError
 
-from hello_litestar_htmx.models.todo import TodoCreate
+from hello_litestar_htmx.models.todo import (
+    ExportFormat,
+    SortOrder,
+    TagMatch,
+    TodoCreateForm,
+    TodoFilter,
+    TodoMoveForm,
+    TodoUpdateForm,
+)
 from hello_litestar_htmx.csrf import get_csrf_token
+from hello_litestar_htmx.rendering import TemplateRenderer
+from hello_litestar_htmx.services.reminders import ReminderScheduler
 from hello_litestar_htmx.services.todo import TodoService
+from hello_litestar_htmx.services.transfer import (
+    MEDIA_TYPES,
+    ImportFormatError,
+    csv_header,
+    encode_batch,
+    read_import_batches,
+)
+
+ARCHIVE_PAGE_SIZE = 20
+IMPORT_MAX_BYTES = 10 * 1024 * 1024
+"""Largest upload accepted by the background import, which spools it to disk; bigger ones get 413.
+
+The streaming import has no limit, since it holds only one batch in memory.
+"""
+
+
+def _tag_params(tags: Sequence[str], match: str) -> list[tuple[str, str]]:
+    """Return the query parameters of a tag filter (match only matters for 2+ tags)."""
+    params = [("tag", tag) for tag in tags]
+    if len(tags) > 1:
+        params.append(("match", match))
+    return params
+
+
+def _todos_url(status: str, order: str, tags: Sequence[str], match: str) -> str:
+    """Build a /todos URL for the given filters."""
+    return f"/todos?{urlencode([('status', status), ('order', order), *_tag_params(tags, match)])}"
 
 
 @get("/todos")
-async def get_todos_page(request: Request, todo_service: TodoService) -> Template:
+async def get_todos_page(
+    request: Request,
+    todo_service: TodoService,
+    renderer: TemplateRenderer,
+    status: TodoFilter = TodoFilter.ALL,
+    order: SortOrder = SortOrder.ASC,
+    tag: Annotated[list[str] | None, Parameter(query="tag")] = None,
+    match: TagMatch = TagMatch.ALL,
+) -> Response:
     """Todoリストページ
 
     通常アクセス: フルページ (todos.html)
     HTMXアクセス: 部分HTML (todos_partial.html)
 
+    Todoが多いページはイベントループを止めないようスレッドプールで描画します。
+
     Args:
         request: The HTTP request object.
         todo_service: Injected TodoService instance.
+        renderer: Injected TemplateRenderer that decides where to render.
+        status: Query parameter selecting all / active / completed todos.
+        order: Query parameter selecting the list order (asc) or its reverse (desc).
+        tag: Repeatable query parameter; only todos with these tags are listed.
+        match: Query parameter selecting todos with all (AND) or any (OR) of the tags.
 
     Returns:
         Template response with appropriate template based on request type.
     """
-    todos = todo_service.get_all_todos()
+    tags = list(dict.fromkeys(tag or ()))
+    todos = todo_service.get_all_todos(status=status, order=order, tags=tags, tag_match=match)
     csrf_token = get_csrf_token(request)
-    context = {"todos": todos, "csrf_token": csrf_token}
+
+    # タグチップは選択状態を切り替えたURLを持つ（選択中なら外し、未選択なら追加）
+    tag_chips = [
+        {
+            "name": name,
+            "count": count,
+            "selected": name in tags,
+            "url": _todos_url(
+                status.value,
+                order.value,
+                [t for t in tags if t != name] if name in tags else [*tags, name],
+                match.value,
+            ),
+        }
+        for name, count in todo_service.get_tags().items()
+    ]
+    other_match = TagMatch.ANY if match == TagMatch.ALL else TagMatch.ALL
+    context = {
+        "todos": todos,
+        "csrf_token": csrf_token,
+        "status": status.value,
+        "order": order.value,
+        "tags": tags,
+        "match": match.value,
+        "tag_chips": tag_chips,
+        "tag_query": urlencode(_tag_params(tags, match.value)),
+        "match_url": _todos_url(status.value, order.value, tags, other_match.value),
+        "clear_tags_url": _todos_url(status.value, order.value, [], match.value),
+        "version": todo_service.get_version(),
+        "archived_count": todo_service.count_archived(),
+    }
 
     # HTMXリクエストかどうかを HX-Request ヘッダーで判定
     is_htmx = request.headers.get("HX-Request") == "true"
 
-    if is_htmx:
-        # HTMXリクエストの場合は部分HTMLだけを返す
-        return Template(
-            template_name="todos_partial.html",
-            context=context
-        )
-
-    # 通常アクセスの場合はフルページを返す
-    return Template(
-        template_name="todos.html",
-        context=context
-    )
+    # HTMXリクエストの場合は部分HTMLだけ、通常アクセスの場合はフルページを返す
+    template_name = "todos_partial.html" if is_htmx else "todos.html"
+    return await renderer.respond(request, template_name, context, size=len(todos))
 
 
 @post("/todos")
 async def add_todo(
     request: Request,
-    data: Annotated[dict, Body(media_type=RequestEncodingType.URL_ENCODED)],
+    data: Annotated[TodoCreateForm, Body(media_type=RequestEncodingType.URL_ENCODED)],
     todo_service: TodoService,
 ) -> Template:
     """Todo追加
 
     Args:
         request: The HTTP request object.
-        data: Form data containing the todo title.
+        data: Typed form data containing the todo title.
         todo_service: Injected TodoService instance.
 
     Returns:
@@ -67,20 +151,25 @@ async def add_todo(
     """
     try:
         # Pydantic validation will automatically strip and validate
-        todo_data = TodoCreate(title=data.get("title", ""))
+        todo_data = data.to_model()
         todo = todo_service.create_todo(todo_data)
         csrf_token = get_csrf_token(request)
         return Template(
-            template_name="todo_item.html",
-            context={"todo": todo, "csrf_token": csrf_token},
+            template_name="todo_created.html",
+            context={"todo": todo, "csrf_token": csrf_token, "order": data.order.value},
             status_code=HTTP_201_CREATED,
         )
     except ValidationError as e:
         # Extract first error message
-        error_msg = e.errors()[0]["msg"] if e.errors() else "入力エラー"
+        errors = e.errors()
+        error_msg = errors[0]["msg"] if errors else "入力エラー"
         return Template(
-            template_name="todo_error.html",
-            context={"error": error_msg},
+            template_name="todo_create_error.html",
+            context={
+                "error": error_msg,
+                "csrf_token": get_csrf_token(request),
+                "order": data.order.value,
+            },
             status_code=HTTP_200_OK,  # Validation error returns 200 with error message
         )
     except Exception as e:
@@ -112,6 +201,75 @@ async def toggle_todo(
     )
 
 
+@patch("/todos/{todo_id:int}")
+async def update_todo(
+    request: Request,
+    todo_id: int,
+    data: Annotated[TodoUpdateForm, Body(media_type=RequestEncodingType.URL_ENCODED)],
+    todo_service: TodoService,
+) -> Template:
+    """Todo更新（送信された項目だけを変更）
+
+    入力エラーは #error-message に表示し、Todo項目はそのまま残します。
+
+    Args:
+        request: The HTTP request object.
+        todo_id: The ID of the todo to update.
+        data: Typed form data with the fields to change.
+        todo_service: Injected TodoService instance.
+
+    Returns:
+        Template response with the updated todo item or error message.
+
+    Raises:
+        NotFoundException: If the todo does not exist.
+    """
+    csrf_token = get_csrf_token(request)
+    try:
+        todo_data = data.to_model()
+    except ValidationError as e:
+        errors = e.errors()
+        return Template(
+            template_name="todo_error.html",
+            context={"error": errors[0]["msg"] if errors else "入力エラー"},
+            headers={"HX-Retarget": "#error-message", "HX-Reswap": "innerHTML"},
+        )
+    todo = todo_service.update_todo(todo_id, todo_data)
+    if todo is None:
+        raise NotFoundException(detail="Todo not found")
+    return Template(
+        template_name="todo_item.html",
+        context={"todo": todo, "csrf_token": csrf_token},
+    )
+
+
+@post("/todos/{todo_id:int}/move", status_code=HTTP_204_NO_CONTENT)
+async def move_todo(
+    todo_id: int,
+    data: Annotated[TodoMoveForm, Body(media_type=RequestEncodingType.URL_ENCODED)],
+    todo_service: TodoService,
+) -> None:
+    """ドラッグ&ドロップで並び替えたTodoの位置を保存
+
+    画面上で上下に隣り合うTodoのIDを受け取り、その間に移動します。
+    書き換えるのは移動したTodoだけです。
+
+    Args:
+        todo_id: The ID of the moved todo.
+        data: Typed form data with the neighbouring todo IDs and the list order.
+        todo_service: Injected TodoService instance.
+
+    Raises:
+        NotFoundException: If the todo or its neighbour no longer exists.
+    """
+    # 逆順の表示では、画面上で上にあるTodoがリスト上では後ろにある
+    after_id, before_id = data.prev_id, data.next_id
+    if data.order == SortOrder.DESC:
+        after_id, before_id = before_id, after_id
+    if todo_service.move_todo(todo_id, after_id=after_id, before_id=before_id) is None:
+        raise NotFoundException(detail="Todo not found")
+
+
 @delete("/todos/{todo_id:int}", status_code=HTTP_200_OK)
 async def delete_todo(todo_id: int, todo_service: TodoService) -> str:
     """Todo削除
@@ -127,7 +285,222 @@ async def delete_todo(todo_id: int, todo_service: TodoService) -> str:
     return ""  # 削除時は空文字列を返す
 
 
+@get("/todos/changes")
+async def get_todo_changes(
+    request: Request, todo_service: TodoService, since: int, order: SortOrder = SortOrder.ASC
+) -> Response:
+    """前回のバージョン以降に変更されたTodoだけを返す（差分同期）
+
+    変更されたTodoを `hx-swap-oob` の断片で返し、新しいカーソル付きの
+    ポーリング要素に置き換えます。カーソルが変更ログより古い場合は
+    `HX-Refresh` でページ全体を再読み込みさせます。
+
+    Args:
+        request: The HTTP request object.
+        todo_service: Injected TodoService instance.
+        since: Query parameter with the version the client last saw.
+        order: Query parameter with the direction of the list being synced.
+
+    Returns:
+        Out-of-band fragments plus the next poller, or a refresh instruction.
+    """
+    version = todo_service.get_version()
+    changes = todo_service.get_changes(since)
+    if changes is None:
+        return Response(content="", headers={"HX-Refresh": "true"})
+    return Template(
+        template_name="todo_changes.html",
+        context={
+            "changes": changes,
+            "version": version,
+            "order": order.value,
+            "csrf_token": get_csrf_token(request),
+        },
+    )
+
+
+@get("/todos/reminders")
+async def stream_reminders(request: Request, reminders: ReminderScheduler) -> ServerSentEvent:
+    """期限が来たTodoのリマインダーを Server-Sent Events で配信
+
+    スケジューラが発火させたリマインダーを、`reminder` イベントの部分HTMLとして
+    接続中のページに送ります（htmx の sse 拡張が `#reminders` に追加）。
+
+    Args:
+        request: The HTTP request object.
+        reminders: Injected ReminderScheduler instance.
+
+    Returns:
+        An endless event stream; it ends when the client disconnects.
+    """
+    template = request.app.template_engine.get_template("todo_reminder.html")
+
+    async def events() -> AsyncIterator[ServerSentEventMessage]:
+        async for todos in reminders.subscribe():
+            yield ServerSentEventMessage(event="reminder", data=template.render(todos=todos))
+
+    return ServerSentEvent(events())
+
+
+@get("/todos/archive")
+async def get_archived_todos(
+    todo_service: TodoService,
+    offset: Annotated[int, Parameter(ge=0)] = 0,
+) -> Template:
+    """アーカイブされたTodoを1ページ分返す（新しい順）
+
+    「アーカイブを表示」ボタンから呼ばれ、続きがある場合は次のページを
+    読み込む「さらに表示」ボタンを末尾に付けます。
+
+    Args:
+        todo_service: Injected TodoService instance.
+        offset: Query parameter with the number of archived todos already shown.
+
+    Returns:
+        Template response with one page of archived todos.
+    """
+    total = todo_service.count_archived()
+    todos = await todo_service.get_archived_page(offset, ARCHIVE_PAGE_SIZE) if total else []
+    next_offset = offset + len(todos)
+    return Template(
+        template_name="todo_archive.html",
+        context={
+            "todos": todos,
+            "next_offset": next_offset if todos and next_offset < total else None,
+        },
+    )
+
+
+@get("/todos/export")
+async def export_todos(
+    todo_service: TodoService,
+    fmt: Annotated[ExportFormat, Parameter(query="format")] = ExportFormat.NDJSON,
+) -> Stream:
+    """Todoをエクスポート（NDJSON / CSV）
+
+    リポジトリからバッチ単位で読み出しながらストリーミングするため、
+    件数に関係なくメモリ使用量は一定です。
+
+    Args:
+        todo_service: Injected TodoService instance.
+        fmt: Query parameter ``format`` (ndjson or csv).
+
+    Returns:
+        Streaming response with one todo per line.
+    """
+
+    async def body() -> AsyncIterator[bytes]:
+        if fmt == ExportFormat.CSV:
+            yield csv_header()
+        for batch in todo_service.iter_todo_batches():
+            yield encode_batch(batch, fmt)
+
+    return Stream(
+        body(),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="todos.{fmt.value}"'},
+    )
+
+
+@post("/todos/import", request_max_body_size=None)
+async def import_todos(
+    request: Request,
+    todo_service: TodoService,
+    fmt: Annotated[ExportFormat, Parameter(query="format")] = ExportFormat.NDJSON,
+) -> dict[str, int]:
+    """Todoをインポート（NDJSON / CSV）
+
+    リクエストボディを受信しながら1行ずつパースし、バッチ単位でリポジトリに追加します。
+    不正な行があった場合は400を返しますが、それまでのバッチは追加済みです。
+
+    Args:
+        request: The HTTP request object.
+        todo_service: Injected TodoService instance.
+        fmt: Query parameter ``format`` (ndjson or csv).
+
+    Returns:
+        The number of imported todos.
+    """
+    imported = 0
+    try:
+        async for batch in read_import_batches(request.stream(), fmt):
+            imported += todo_service.import_todos(batch)
+    except ImportFormatError as e:
+        raise ValidationException(detail=str(e), extra={"imported": imported}) from e
+    return {"imported": imported}
+
+
+@post("/todos/import/jobs", request_max_body_size=IMPORT_MAX_BYTES)
+async def enqueue_import_todos(
+    request: Request,
+    todo_service: TodoService,
+    fmt: Annotated[ExportFormat, Parameter(query="format")] = ExportFormat.NDJSON,
+) -> Template:
+    """Todoをバックグラウンドでインポート
+
+    アップロードを一時ファイルに退避してすぐに返し、パースと追加はジョブで行います。
+    一時ファイルへの書き込みはスレッドで行い、IMPORT_MAX_BYTES を超えるボディは413で拒否します。
+
+    Args:
+        request: The HTTP request object.
+        todo_service: Injected TodoService instance.
+        fmt: Query parameter ``format`` (ndjson or csv).
+
+    Returns:
+        Job status fragment that polls until the import finishes.
+    """
+    upload = await anyio.to_thread.run_sync(tempfile.TemporaryFile)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            await anyio.to_thread.run_sync(upload.write, chunk)
+            size += len(chunk)
+        await anyio.to_thread.run_sync(upload.seek, 0)
+        job = todo_service.enqueue_import(upload, size, fmt)
+    except BaseException:
+        # Once enqueued, the job owns the file and closes it
+        upload.close()
+        raise
+    return Template(
+        template_name="job_status.html",
+        context={"job": job},
+        status_code=HTTP_202_ACCEPTED,
+    )
+
+
+@post("/todos/clear-completed")
+async def clear_completed_todos(todo_service: TodoService) -> Template:
+    """完了済みTodoをバックグラウンドで一括削除
+
+    Args:
+        todo_service: Injected TodoService instance.
+
+    Returns:
+        Job status fragment that polls until the deletion finishes.
+    """
+    job = todo_service.enqueue_clear_completed()
+    return Template(
+        template_name="job_status.html",
+        context={"job": job},
+        status_code=HTTP_202_ACCEPTED,
+    )
+
+
 router = Router(
     path="",
-    route_handlers=[get_todos_page, add_todo, toggle_todo, delete_todo],
+    route_handlers=[
+        get_todos_page,
+        add_todo,
+        toggle_todo,
+        update_todo,
+        move_todo,
+        delete_todo,
+        get_todo_changes,
+        stream_reminders,
+        get_archived_todos,
+        export_todos,
+        import_todos,
+        enqueue_import_todos,
+        clear_completed_todos,
+    ],
 )
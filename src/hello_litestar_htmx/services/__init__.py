@@ -1,5 +1,7 @@
 """Service layer for business logic."""
 
+from hello_litestar_htmx.services.audit import AuditLog, AuditLogConfig
+from hello_litestar_htmx.services.jobs import Job, JobRunner, JobStatus
 from hello_litestar_htmx.services.todo import TodoService
 
-__all__ = ["TodoService"]
+__all__ = ["AuditLog", "AuditLogConfig", "Job", "JobRunner", "JobStatus", "TodoService"]
@@ -0,0 +1,197 @@
+"""Non-blocking, batched access and audit logging.
+
+Handlers, services and middleware call `AuditLog.record`, which only appends a
+dict to a bounded `asyncio.Queue` and never touches the disk. A background
+writer task collects records into batches (up to ``batch_size`` records or
+``flush_interval`` seconds) and hands each batch to a single worker thread that
+serialises it as JSON lines and appends it to a size-rotated file. Using one
+thread keeps the batches in order without any locking.
+
+When the queue is full, new records are dropped instead of slowing the request
+down. Drops are counted in `AuditLog.dropped` and reported in the log itself
+as an ``audit.dropped`` record with the next batch. GET requests, which make up
+most of the traffic, are access-logged only for a configurable sample.
+
+A batch that cannot be written (disk full, permissions) is logged and counted
+as dropped, and the writer carries on with the next batch.
+"""
+
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import msgspec
+
+logger = logging.getLogger(__name__)
+
+LOG_FILE_NAME = "audit.log"
+
+
+@dataclass
+class AuditLogConfig:
+    """Configuration for `AuditLog`."""
+
+    directory: Path
+    queue_size: int = 10_000
+    """Records buffered in memory before new ones are dropped."""
+    batch_size: int = 500
+    flush_interval: float = 1.0
+    """Maximum seconds a record waits in memory before it is written."""
+    max_bytes: int = 10 * 1024 * 1024
+    """Size at which the log file is rotated."""
+    backup_count: int = 5
+    get_sample_rate: float = 0.0
+    """Fraction of GET requests (0.0-1.0) that are access-logged."""
+
+
+class RotatingLogFile:
+    """Append-only file rotated like `logging.handlers.RotatingFileHandler`.
+
+    ``audit.log`` is renamed to ``audit.log.1`` (and older files shifted up to
+    ``backup_count``) when a write would grow it past ``max_bytes``.
+    Not thread-safe; `AuditLog` only uses it from its single writer thread.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, backup_count: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._size: int | None = None
+
+    def write(self, data: bytes) -> None:
+        """Append data, rotating first if the file would exceed ``max_bytes``."""
+        if self._size is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._size = self.path.stat().st_size if self.path.exists() else 0
+        if self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        with self.path.open("ab") as f:
+            f.write(data)
+        self._size += len(data)
+
+    def _rotate(self) -> None:
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                source = self.path.with_name(f"{self.path.name}.{i}")
+                if source.exists():
+                    source.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink(missing_ok=True)
+        self._size = 0
+
+
+class AuditLog:
+    """Buffers log records in memory and writes them in batches off the event loop."""
+
+    def __init__(self, config: AuditLogConfig) -> None:
+        """Initialize the log. Records are accepted once `start` has been awaited.
+
+        Args:
+            config: Queue, batching, rotation and sampling settings.
+        """
+        self.config = config
+        self.dropped = 0
+        self.written = 0
+        self._reported_dropped = 0
+        self._file = RotatingLogFile(
+            config.directory / LOG_FILE_NAME, config.max_bytes, config.backup_count
+        )
+        self._queue: asyncio.Queue[dict[str, Any]] | None = None
+        self._writer: asyncio.Task[None] | None = None
+        self._batch: list[dict[str, Any]] = []
+        self._executor: ThreadPoolExecutor | None = None
+        self._encoder = msgspec.json.Encoder()
+
+    def record(self, event: str, **fields: Any) -> bool:
+        """Enqueue a record without blocking. Must be called from the event loop.
+
+        Args:
+            event: Event name, e.g. ``"todo.created"``.
+            **fields: JSON-serialisable details of the event.
+
+        Returns:
+            True if the record was queued, False if it was dropped.
+        """
+        if self._queue is None:
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait({"ts": time.time(), "event": event, **fields})
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+
+    def should_log_request(self, method: str) -> bool:
+        """Return True if a request with this method should be access-logged."""
+        if method != "GET":
+            return True
+        rate = self.config.get_sample_rate
+        return rate > 0 and random.random() < rate
+
+    async def start(self) -> None:
+        """Start the background writer."""
+        if self._writer is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.config.queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit-log")
+        self._writer = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer and flush every queued record."""
+        if self._writer is None:
+            return
+        self._writer.cancel()
+        await asyncio.gather(self._writer, return_exceptions=True)
+        remaining, self._batch = self._batch, []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        self._queue = None
+        await self._flush(remaining)
+        self._executor.shutdown(wait=True)
+        self._writer = self._executor = None
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            # Kept on the instance so that stop() can flush a batch cut short by cancellation
+            self._batch = batch = [await queue.get()]
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout(self.config.flush_interval):
+                    while len(batch) < self.config.batch_size:
+                        batch.append(await queue.get())
+            self._batch = []
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[dict[str, Any]]) -> None:
+        records = len(batch)
+        dropped = self.dropped - self._reported_dropped
+        if dropped:
+            self._reported_dropped = self.dropped
+            batch.append({"ts": time.time(), "event": "audit.dropped", "count": dropped})
+        if not batch:
+            return
+        # Submitted to the single worker thread, so batches stay in order even
+        # if the awaiting task is cancelled before the write finishes.
+        future = self._executor.submit(self._write, batch)
+        self.written += len(batch)
+        try:
+            await asyncio.wrap_future(future)
+        except Exception:
+            logger.exception("Failed to write %d audit records", records)
+            self.written -= len(batch)
+            # The lost records, and the drop report that went with them, are
+            # reported with the next batch that can be written
+            self.dropped += records
+            self._reported_dropped -= dropped
+
+    def _write(self, batch: list[dict[str, Any]]) -> None:
+        encode = self._encoder.encode
+        self._file.write(b"".join(encode(r) + b"\n" for r in batch))
@@ -0,0 +1,150 @@
+"""In-process background jobs for long-running todo operations.
+
+Jobs run as asyncio tasks on the application's event loop, at most
+``max_concurrency`` at a time. Job bodies work in batches and yield to the
+loop between them, so a huge operation never blocks other requests for long.
+Blocking I/O (e.g. reading a spooled upload) is pushed to a bounded thread
+pool via `JobRunner.run_in_worker`. The repository itself is only touched from
+the event loop, because `InMemoryTodoRepository` is not thread-safe.
+
+Job status is kept in memory; the oldest finished jobs are evicted once
+``max_jobs`` is exceeded.
+"""
+
+import asyncio
+import functools
+import secrets
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import ParamSpec, TypeVar
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class JobStatus(StrEnum):
+    """Lifecycle state of a background job."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """A background job and its progress."""
+
+    id: str
+    name: str
+    status: JobStatus = JobStatus.PENDING
+    done: int = 0
+    total: int | None = None
+    result: str | None = None
+    error: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    @property
+    def percent(self) -> int | None:
+        """Progress in percent, or None if the total is unknown."""
+        if not self.total:
+            return None
+        return min(100, self.done * 100 // self.total)
+
+
+JobFunc = Callable[[Job], Awaitable[str]]
+"""A job body: receives its Job to report progress and returns a result message."""
+
+
+class JobRunner:
+    """Runs and tracks background jobs with bounded concurrency."""
+
+    def __init__(self, max_concurrency: int = 2, max_jobs: int = 100) -> None:
+        """Initialize the runner.
+
+        Args:
+            max_concurrency: Maximum number of jobs (and worker threads) running at once.
+            max_jobs: Maximum number of jobs whose status is retained.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_jobs = max_jobs
+        self._jobs: dict[str, Job] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._semaphore: asyncio.Semaphore | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    def submit(self, name: str, func: JobFunc) -> Job:
+        """Enqueue a job. Must be called from the event loop.
+
+        Args:
+            name: Human readable job name.
+            func: The job body.
+
+        Returns:
+            The pending Job.
+        """
+        job = Job(id=secrets.token_urlsafe(8), name=name)
+        self._jobs[job.id] = job
+        self._evict()
+        task = asyncio.get_running_loop().create_task(self._run(job, func))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """Get a job by ID."""
+        return self._jobs.get(job_id)
+
+    async def run_in_worker(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """Run a blocking callable in the runner's bounded thread pool."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="todo-job"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def shutdown(self, grace_period: float = 0.0) -> None:
+        """Stop the runner and its worker threads.
+
+        Args:
+            grace_period: Seconds to let running jobs finish before they are cancelled.
+        """
+        if grace_period > 0 and self._tasks:
+            await asyncio.wait(list(self._tasks), timeout=grace_period)
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._semaphore = None
+
+    async def _run(self, job: Job, func: JobFunc) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            job.status = JobStatus.RUNNING
+            try:
+                job.result = await func(job)
+            except asyncio.CancelledError:
+                job.status = JobStatus.FAILED
+                job.error = "cancelled"
+                raise
+            except Exception as e:
+                job.status = JobStatus.FAILED
+                job.error = str(e) or type(e).__name__
+            else:
+                job.status = JobStatus.SUCCEEDED
+
+    def _evict(self) -> None:
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.finished][:excess]:
+            del self._jobs[job_id]
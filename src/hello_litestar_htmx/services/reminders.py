@@ -0,0 +1,115 @@
+"""Reminder scheduler for todos with a due time.
+
+The repository keeps pending reminders in a min-heap keyed by due time, so the
+scheduler never scans the todo list: it asks for the earliest due time, sleeps
+until then (or until `ReminderScheduler.wake` reports an earlier one), and pops
+only the reminders that are due. Its cost per wake-up is O(log n) in the number
+of pending reminders, plus O(log n) per reminder fired.
+
+Fired reminders are published to every subscriber, e.g. a Server-Sent Events
+stream per open page that renders them as HTMX fragments. Each subscriber has
+a bounded queue; a client too slow to keep up misses batches instead of
+holding memory.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import AsyncIterator
+
+from hello_litestar_htmx.models.todo import Todo
+from hello_litestar_htmx.repositories.todo import TodoRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderScheduler:
+    """Fires due reminders from the repository and fans them out to subscribers."""
+
+    def __init__(
+        self,
+        repository: TodoRepository,
+        batch_size: int = 100,
+        subscriber_queue_size: int = 100,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            repository: Repository holding the pending reminders.
+            batch_size: Maximum reminders fired (and published) at once.
+            subscriber_queue_size: Batches buffered per subscriber before dropping.
+        """
+        self.repository = repository
+        self.batch_size = batch_size
+        self.subscriber_queue_size = subscriber_queue_size
+        self.fired = 0
+        """Number of reminders fired since startup."""
+        self.wakeups = 0
+        """Number of times the scheduler loop woke up since startup."""
+        self._subscribers: set[asyncio.Queue[list[Todo]]] = set()
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start the scheduler task on the running event loop."""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="reminder-scheduler")
+
+    async def stop(self) -> None:
+        """Cancel the scheduler task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def wake(self) -> None:
+        """Re-check the earliest due time, e.g. after a due time was added or moved earlier."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def subscribe(self) -> AsyncIterator[list[Todo]]:
+        """Yield each batch of fired reminders until the caller stops iterating."""
+        queue: asyncio.Queue[list[Todo]] = asyncio.Queue(self.subscriber_queue_size)
+        self._subscribers.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+
+    def fire_due(self, now: float | None = None) -> list[Todo]:
+        """Fire and publish the reminders due at ``now`` (one batch at most).
+
+        Args:
+            now: Epoch seconds; defaults to the current time.
+
+        Returns:
+            The todos whose reminders fired.
+        """
+        todos = self.repository.pop_due(time.time() if now is None else now, self.batch_size)
+        if todos:
+            self.fired += len(todos)
+            for queue in self._subscribers:
+                try:
+                    queue.put_nowait(todos)
+                except asyncio.QueueFull:
+                    logger.warning("Dropping %d reminders for a slow subscriber", len(todos))
+        return todos
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            self._wakeup.clear()
+            self.wakeups += 1
+            if len(self.fire_due()) == self.batch_size:
+                # More may be due; let other tasks run before the next batch
+                await asyncio.sleep(0)
+                continue
+            next_due = self.repository.next_due()
+            timeout = None if next_due is None else max(next_due - time.time(), 0)
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
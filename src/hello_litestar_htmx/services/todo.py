@@ -1,7 +1,35 @@
 """Todo service for business logic layer."""
 
-from hello_litestar_htmx.models.todo import Todo, TodoCreate, TodoUpdate
+import asyncio
+import time
+from collections.abc import AsyncIterator, Callable, Iterator, Sequence
+from datetime import UTC, datetime
+from typing import BinaryIO, ParamSpec, TypeVar
+
+from hello_litestar_htmx.models.todo import (
+    ArchivedTodo,
+    ExportFormat,
+    SortOrder,
+    TagMatch,
+    Todo,
+    TodoChange,
+    TodoCreate,
+    TodoFilter,
+    TodoImport,
+    TodoUpdate,
+)
+from hello_litestar_htmx.repositories.archive import TodoArchive
 from hello_litestar_htmx.repositories.todo import TodoRepository
+from hello_litestar_htmx.services.audit import AuditLog
+from hello_litestar_htmx.services.jobs import Job, JobRunner
+from hello_litestar_htmx.services.reminders import ReminderScheduler
+from hello_litestar_htmx.services.transfer import read_import_batches
+
+JOB_BATCH_SIZE = 1000
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+P = ParamSpec("P")
+T = TypeVar("T")
 
 
 class TodoService:
@@ -11,21 +39,87 @@ class TodoService:
     It contains business logic, validation, and orchestration of multiple repository calls.
     """
 
-    def __init__(self, repository: TodoRepository) -> None:
+    def __init__(
+        self,
+        repository: TodoRepository,
+        jobs: JobRunner | None = None,
+        audit: AuditLog | None = None,
+        archive: TodoArchive | None = None,
+        reminders: ReminderScheduler | None = None,
+    ) -> None:
         """Initialize the service with a repository.
 
         Args:
             repository: The Todo repository instance for data access.
+            jobs: Runner for long-running operations. Required by the ``enqueue_*`` methods.
+            audit: Optional audit log that receives one record per mutation.
+            archive: Optional cold storage for old completed todos.
+            reminders: Optional scheduler to notify when due times change.
         """
         self.repository = repository
+        self.jobs = jobs
+        self.audit = audit
+        self.archive = archive
+        self.reminders = reminders
+        self._rebalance_job: Job | None = None
 
-    def get_all_todos(self) -> list[Todo]:
-        """Get all todos.
+    def get_all_todos(
+        self,
+        status: TodoFilter = TodoFilter.ALL,
+        order: SortOrder = SortOrder.ASC,
+        tags: Sequence[str] = (),
+        tag_match: TagMatch = TagMatch.ALL,
+    ) -> list[Todo]:
+        """Get todos, optionally filtered by completion status and tags.
+
+        Args:
+            status: Which todos to include (all, active or completed).
+            order: List order or reversed.
+            tags: Only include todos with these tags (no tag filter if empty).
+            tag_match: Whether a todo needs all of ``tags`` or any of them.
 
         Returns:
-            List of all Todo items.
+            List of matching Todo items.
         """
-        return self.repository.get_all()
+        return self.repository.get_all(status=status, order=order, tags=tags, tag_match=tag_match)
+
+    def get_tags(self) -> dict[str, int]:
+        """Get every tag in use with its number of todos.
+
+        Returns:
+            Mapping of tag to todo count, sorted by tag.
+        """
+        return self.repository.get_tags()
+
+    def iter_todo_batches(self, batch_size: int = 1000) -> Iterator[list[Todo]]:
+        """Iterate over all todos in creation order without copying the list.
+
+        Args:
+            batch_size: Maximum number of todos per batch.
+
+        Returns:
+            Iterator of Todo batches.
+        """
+        return self.repository.iter_batches(batch_size)
+
+    def get_version(self) -> int:
+        """Get the current change-log version of the todo list.
+
+        Returns:
+            Sequence number of the latest change.
+        """
+        return self.repository.get_version()
+
+    def get_changes(self, since: int) -> list[TodoChange] | None:
+        """Get net changes since a version.
+
+        Args:
+            since: The version the client last saw.
+
+        Returns:
+            Changes oldest first, or None if the client must reload everything.
+        """
+        return self.repository.get_changes(since)
 
     def get_todo(self, todo_id: int) -> Todo | None:
         """Get a specific todo by ID.
@@ -50,7 +144,26 @@ class TodoService:
         Note:
             Validation is handled by Pydantic in the TodoCreate model.
         """
-        return self.repository.create(todo_data)
+        todo = self.repository.create(todo_data)
+        self._audit("todo.created", todo_id=todo.id)
+        if todo.due_at is not None:
+            self._wake_reminders()
+        return todo
+
+    def import_todos(self, todos: Sequence[TodoImport]) -> int:
+        """Insert a batch of imported todos.
+
+        Args:
+            todos: Validated todos read from an import file.
+
+        Returns:
+            The number of todos created.
+        """
+        count = self.repository.create_many(todos)
+        self._audit("todo.imported", count=count)
+        if any(todo.due_at is not None for todo in todos):
+            self._wake_reminders()
+        return count
 
     def update_todo(self, todo_id: int, todo_data: TodoUpdate) -> Todo | None:
         """Update an existing todo.
@@ -62,7 +175,12 @@ class TodoService:
         Returns:
             The updated Todo item if found, None otherwise.
         """
-        return self.repository.update(todo_id, todo_data)
+        todo = self.repository.update(todo_id, todo_data)
+        if todo is not None:
+            self._audit("todo.updated", todo_id=todo_id)
+            if todo.due_at is not None:
+                self._wake_reminders()
+        return todo
 
     def delete_todo(self, todo_id: int) -> bool:
         """Delete a todo.
@@ -73,7 +191,10 @@ class TodoService:
         Returns:
             True if the todo was deleted, False if not found.
         """
-        return self.repository.delete(todo_id)
+        deleted = self.repository.delete(todo_id)
+        if deleted:
+            self._audit("todo.deleted", todo_id=todo_id)
+        return deleted
 
     def toggle_todo_completed(self, todo_id: int) -> Todo | None:
         """Toggle the completed status of a todo.
@@ -84,4 +205,188 @@ class TodoService:
         Returns:
             The updated Todo item if found, None otherwise.
         """
-        return self.repository.toggle_completed(todo_id)
+        todo = self.repository.toggle_completed(todo_id)
+        if todo is not None:
+            self._audit("todo.toggled", todo_id=todo_id, completed=todo.completed)
+            if todo.due_at is not None and not todo.completed:
+                self._wake_reminders()
+        return todo
+
+    def move_todo(
+        self, todo_id: int, after_id: int | None = None, before_id: int | None = None
+    ) -> Todo | None:
+        """Move a todo to a new place in the list.
+
+        Only the moved todo is rewritten. When repeated moves have nearly used
+        up the gap between two positions, a rebalance of all positions is run
+        as a background job (or immediately, without a JobRunner).
+
+        Args:
+            todo_id: The ID of the todo to move.
+            after_id: Place the todo directly after this todo.
+            before_id: Place the todo directly before this todo (used if ``after_id`` is None).
+
+        Returns:
+            The moved Todo item, or None if the todo or the anchor was not found.
+        """
+        todo = self.repository.move(todo_id, after_id=after_id, before_id=before_id)
+        if todo is None:
+            return None
+        self._audit("todo.moved", todo_id=todo_id)
+        if self.repository.needs_rebalance():
+            self._schedule_rebalance()
+        return todo
+
+    def enqueue_clear_completed(self) -> Job:
+        """Delete all completed todos in a background job.
+
+        Returns:
+            The enqueued Job.
+        """
+
+        async def run(job: Job) -> str:
+            job.total = self.repository.count(status=TodoFilter.COMPLETED)
+            while removed := self.repository.clear_completed(limit=JOB_BATCH_SIZE):
+                job.done += removed
+                await asyncio.sleep(0)
+            self._audit("todo.cleared", count=job.done)
+            return f"完了済みのTodoを{job.done}件削除しました"
+
+        return self._require_jobs().submit("完了済みTodoの削除", run)
+
+    def enqueue_import(self, upload: BinaryIO, size: int, fmt: ExportFormat) -> Job:
+        """Import a spooled upload in a background job.
+
+        Args:
+            upload: Readable file positioned at the start; closed when the job ends.
+            size: Size of the upload in bytes, used for progress.
+            fmt: Format of the upload.
+
+        Returns:
+            The enqueued Job.
+        """
+        jobs = self._require_jobs()
+
+        async def chunks(job: Job) -> AsyncIterator[bytes]:
+            while chunk := await jobs.run_in_worker(upload.read, UPLOAD_CHUNK_SIZE):
+                job.done += len(chunk)
+                yield chunk
+
+        async def run(job: Job) -> str:
+            job.total = size
+            imported = 0
+            try:
+                async for batch in read_import_batches(chunks(job), fmt, JOB_BATCH_SIZE):
+                    imported += self.import_todos(batch)
+                    await asyncio.sleep(0)
+            finally:
+                upload.close()
+            return f"{imported}件のTodoをインポートしました"
+
+        return jobs.submit("Todoのインポート", run)
+
+    async def archive_completed(self, older_than: float) -> int:
+        """Move todos completed more than ``older_than`` seconds ago to the archive.
+
+        Todos are removed from the hot list in batches of the archive's
+        ``block_size`` and each is written as one block in a worker thread; a
+        batch that fails to be written is put back.
+
+        Args:
+            older_than: Minimum age of the completion in seconds.
+
+        Returns:
+            The number of todos archived.
+        """
+        archive = self._require_archive()
+        cutoff = time.time() - older_than
+        archived = 0
+        # One batch per block, so a failed append never leaves part of a batch archived
+        batch_size = archive.config.block_size
+        while popped := self.repository.pop_completed_before(cutoff, batch_size):
+            now = datetime.now(UTC)
+            records = [
+                ArchivedTodo(
+                    **todo.model_dump(),
+                    completed_at=datetime.fromtimestamp(completed_at, UTC),
+                    archived_at=now,
+                )
+                for todo, completed_at in popped
+            ]
+            try:
+                await self._in_worker(archive.append, records)
+            except BaseException:
+                self.repository.restore(popped)
+                raise
+            archived += len(records)
+        if archived:
+            self._audit("todo.archived", count=archived)
+        return archived
+
+    async def get_archived_page(self, offset: int, limit: int) -> list[ArchivedTodo]:
+        """Read archived todos, most recently archived first.
+
+        Args:
+            offset: Number of archived todos to skip.
+            limit: Maximum number of todos to return.
+
+        Returns:
+            Up to ``limit`` archived todos.
+        """
+        return await self._in_worker(self._require_archive().page, offset, limit)
+
+    async def get_archived_todo(self, todo_id: int) -> ArchivedTodo | None:
+        """Look up an archived todo by ID.
+
+        Args:
+            todo_id: The ID of the archived todo.
+
+        Returns:
+            The ArchivedTodo if found, None otherwise.
+        """
+        return await self._in_worker(self._require_archive().get, todo_id)
+
+    def count_archived(self) -> int:
+        """Count archived todos (0 if there is no archive)."""
+        return len(self.archive) if self.archive is not None else 0
+
+    async def _in_worker(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        if self.jobs is not None:
+            return await self.jobs.run_in_worker(func, *args, **kwargs)
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    def _schedule_rebalance(self) -> None:
+        if self.jobs is None:
+            self.repository.rebalance_positions()
+            return
+        if self._rebalance_job is not None and not self._rebalance_job.finished:
+            return
+
+        async def run(job: Job) -> str:
+            count = self.repository.count()
+            job.total = 2 * count  # iter_rebalance makes two passes
+            for handled in self.repository.iter_rebalance(JOB_BATCH_SIZE):
+                job.done += handled
+                await asyncio.sleep(0)
+            return f"{count}件のTodoの並び順を再採番しました"
+
+        self._rebalance_job = self.jobs.submit("並び順の再採番", run)
+
+    def _require_archive(self) -> TodoArchive:
+        if self.archive is None:
+            raise RuntimeError("TodoService was created without a TodoArchive")
+        return self.archive
+
+    def _wake_reminders(self) -> None:
+        # A due time may now be earlier than the one the scheduler sleeps until
+        if self.reminders is not None:
+            self.reminders.wake()
+
+    def _audit(self, event: str, **fields: object) -> None:
+        if self.audit is not None:
+            self.audit.record(event, **fields)
+
+    def _require_jobs(self) -> JobRunner:
+        if self.jobs is None:
+            raise RuntimeError("TodoService was created without a JobRunner")
+        return self.jobs
@@ -0,0 +1,192 @@
+"""Streaming encoders and decoders for todo import/export.
+
+Both directions work on bounded batches so that memory use does not depend on
+the number of todos: export encodes one repository batch at a time, and import
+splits the request body into records as chunks arrive.
+
+Records carry the id, title, completion, due time (ISO 8601, empty/null if
+none) and tags (a JSON array, or one comma-separated CSV cell), so an export
+can be imported back without losing anything but the ids. Files written
+before due times and tags existed still import.
+"""
+
+import csv
+import io
+from collections.abc import AsyncIterator, Iterable, Iterator
+
+import msgspec
+from pydantic import ValidationError
+
+from hello_litestar_htmx.models.todo import ExportFormat, Todo, TodoImport, split_tags
+
+CSV_FIELDS = ("id", "title", "completed", "due_at", "tags")
+MAX_RECORD_BYTES = 64 * 1024
+IMPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+_json_encoder = msgspec.json.Encoder()
+_json_decoder = msgspec.json.Decoder(dict)
+
+
+class ImportFormatError(ValueError):
+    """Raised when an import file contains an invalid record."""
+
+    def __init__(self, line: int, message: str) -> None:
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+def csv_header() -> bytes:
+    """Return the CSV header row."""
+    return _encode_csv_rows([CSV_FIELDS])
+
+
+def encode_batch(todos: list[Todo], fmt: ExportFormat) -> bytes:
+    """Encode a batch of todos as NDJSON lines or CSV rows."""
+    if fmt == ExportFormat.CSV:
+        return _encode_csv_rows(
+            (
+                todo.id,
+                todo.title,
+                "true" if todo.completed else "false",
+                todo.due_at.isoformat() if todo.due_at else "",
+                ",".join(todo.tags),
+            )
+            for todo in todos
+        )
+    return _json_encoder.encode_lines(
+        [
+            {
+                "id": todo.id,
+                "title": todo.title,
+                "completed": todo.completed,
+                "due_at": todo.due_at,
+                "tags": todo.tags,
+            }
+            for todo in todos
+        ]
+    )
+
+
+def _encode_csv_rows(rows: Iterable[Iterable[object]]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode()
+
+
+async def read_import_batches(
+    chunks: AsyncIterator[bytes],
+    fmt: ExportFormat,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> AsyncIterator[list[TodoImport]]:
+    """Parse an uploaded NDJSON/CSV body into batches of validated todos.
+
+    Only the current partial record and one batch are held in memory. The
+    ``id`` column is ignored; imported todos get new ids.
+
+    Raises:
+        ImportFormatError: On a malformed or invalid record.
+    """
+    parser = _CsvParser() if fmt == ExportFormat.CSV else _NdjsonParser()
+    batch: list[TodoImport] = []
+    async for first_line, lines in _iter_lines(chunks):
+        for line, record in parser.feed(first_line, lines):
+            batch.append(_to_import(line, record))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    parser.close()
+    if batch:
+        yield batch
+
+
+def _to_import(line: int, record: dict) -> TodoImport:
+    tags = record.get("tags") or ()
+    if isinstance(tags, str):
+        tags = split_tags(tags)
+    try:
+        return TodoImport(
+            title=record.get("title", ""),
+            completed=record.get("completed", False),
+            due_at=record.get("due_at") or None,
+            tags=tags,
+        )
+    except ValidationError as e:
+        errors = e.errors()
+        raise ImportFormatError(line, errors[0]["msg"] if errors else "入力エラー") from e
+
+
+def _decode(line_no: int, raw: bytes) -> str:
+    try:
+        return raw.rstrip(b"\r").decode()
+    except UnicodeDecodeError as e:
+        raise ImportFormatError(line_no, f"invalid UTF-8: {e.reason}") from e
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, list[str]]]:
+    """Split a byte stream into lines, yielding ``(first_line_no, lines)`` per chunk."""
+    buffer = b""
+    line_no = 1
+    async for chunk in chunks:
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        if len(buffer) > MAX_RECORD_BYTES:
+            raise ImportFormatError(line_no + len(lines), "record too long")
+        if lines:
+            yield line_no, [_decode(n, raw) for n, raw in enumerate(lines, line_no)]
+            line_no += len(lines)
+    if buffer.strip():
+        yield line_no, [_decode(line_no, buffer)]
+
+
+class _NdjsonParser:
+    def feed(self, first_line: int, lines: list[str]) -> Iterator[tuple[int, dict]]:
+        for line_no, line in enumerate(lines, first_line):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, _json_decoder.decode(line)
+            except msgspec.DecodeError as e:
+                raise ImportFormatError(line_no, str(e)) from e
+
+    def close(self) -> None:
+        pass
+
+
+class _CsvParser:
+    def __init__(self) -> None:
+        self._header: list[str] | None = None
+        self._pending: list[str] = []
+        self._line_no = 0
+
+    def feed(self, first_line: int, lines: list[str]) -> Iterator[tuple[int, dict]]:
+        for line_no, line in enumerate(lines, first_line):
+            self._line_no = line_no
+            self._pending.append(line)
+            record = "\n".join(self._pending)
+            # RFC 4180 doubles embedded quotes, so an odd count means a quoted
+            # field continues on the next line
+            if record.count('"') % 2:
+                if len(record) > MAX_RECORD_BYTES:
+                    raise ImportFormatError(line_no, "record too long")
+                continue
+            self._pending.clear()
+            if not record.strip():
+                continue
+            try:
+                row = next(csv.reader([record]))
+            except csv.Error as e:
+                raise ImportFormatError(line_no, str(e)) from e
+            if self._header is None:
+                if "title" not in row:
+                    raise ImportFormatError(line_no, "missing title column")
+                self._header = row
+                continue
+            yield line_no, dict(zip(self._header, row))
+
+    def close(self) -> None:
+        if self._pending:
+            raise ImportFormatError(self._line_no, "unterminated quoted field")
@@ -1,5 +1,15 @@
 import os
 
+import pytest
+
 
 os.environ.setdefault("LITESTAR_CSRF_SECRET", "test-csrf-secret")
 
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--perf-exhaustive",
+        action="store_true",
+        default=False,
+        help="run performance tests at every size up to 1M todos (slow)",
+    )
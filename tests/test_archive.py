@@ -0,0 +1,248 @@
+"""Tests for the cold-storage archive."""
+
+import asyncio
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from hello_litestar_htmx.models.todo import ArchivedTodo, TodoCreate, TodoFilter
+from hello_litestar_htmx.repositories.archive import SEGMENT_GLOB, ArchiveConfig, TodoArchive
+from hello_litestar_htmx.repositories.todo import InMemoryTodoRepository
+from hello_litestar_htmx.resources import AppResources
+from hello_litestar_htmx.services.todo import TodoService
+
+
+def archived(todo_id: int) -> ArchivedTodo:
+    now = datetime.now(UTC)
+    return ArchivedTodo(
+        id=todo_id, title=f"todo {todo_id}", completed=True, completed_at=now, archived_at=now
+    )
+
+
+class BrokenTruncate:
+    def __init__(self, f):
+        self.f = f
+
+    def truncate(self, size):
+        raise OSError("read-only file system")
+
+
+@pytest.fixture
+def config(tmp_path):
+    return ArchiveConfig(directory=tmp_path, block_size=3)
+
+
+class TestTodoArchive:
+    """Test suite for TodoArchive."""
+
+    def test_get_by_id(self, config):
+        """Test looking up todos across blocks."""
+        archive = TodoArchive(config)
+        archive.append([archived(i) for i in (5, 1, 9, 3)])
+        archive.append([archived(2)])
+
+        assert len(archive) == 5
+        assert archive.get(9).title == "todo 9"
+        assert archive.get(2).title == "todo 2"
+        assert archive.get(4) is None
+        assert archive.max_id == 9
+
+    def test_page_newest_first(self, config):
+        """Test paging from the most recently archived block backwards."""
+        archive = TodoArchive(config)
+        archive.append([archived(i) for i in range(1, 6)])
+        archive.append([archived(i) for i in range(6, 8)])
+
+        pages = [[t.id for t in archive.page(offset, 3)] for offset in (0, 3, 6, 9)]
+        assert pages == [[7, 6, 5], [4, 3, 2], [1], []]
+
+    def test_reopen_rebuilds_index(self, config):
+        """Test that a new instance reads the existing segments."""
+        TodoArchive(config).append([archived(i) for i in range(1, 5)])
+
+        reopened = TodoArchive(config)
+        assert len(reopened) == 4
+        assert reopened.max_id == 4
+        assert reopened.get(4).title == "todo 4"
+
+    def test_torn_block_is_discarded(self, config, tmp_path):
+        """Test that a partially written block is cut off on reopen."""
+        TodoArchive(config).append([archived(1)])
+        segment = next(tmp_path.glob(SEGMENT_GLOB))
+        with segment.open("ab") as f:
+            f.write(b"\x00\x00\x10\x00\x00\x00\x00\x01partial")
+
+        reopened = TodoArchive(config)
+        reopened.append([archived(2)])
+        assert [t.id for t in TodoArchive(config).page(0, 10)] == [2, 1]
+
+    def test_failed_append_is_truncated(self, config, monkeypatch):
+        """Test that a block cut short by a write error does not corrupt later blocks."""
+        archive = TodoArchive(config)
+        archive.append([archived(1)])
+        real_open = Path.open
+
+        class HalfWrite:
+            def __init__(self, f):
+                self.f = f
+                self.writes = 0
+
+            def __getattr__(self, name):
+                return getattr(self.f, name)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self.f.close()
+
+            def write(self, data):
+                self.writes += 1
+                if self.writes == 2:
+                    self.f.write(data[: len(data) // 2])
+                    raise OSError(28, "No space left on device")
+                return self.f.write(data)
+
+        def open_half(path, mode="r", *args, **kwargs):
+            return HalfWrite(real_open(path, mode, *args, **kwargs))
+
+        monkeypatch.setattr(Path, "open", open_half)
+        with pytest.raises(OSError):
+            archive.append([archived(2)])
+        monkeypatch.setattr(Path, "open", real_open)
+
+        archive.append([archived(3)])
+        reopened = TodoArchive(config)
+        assert [t.id for t in reopened.page(0, 10)] == [3, 1]
+
+    def test_failed_truncate_starts_new_segment(self, config, tmp_path, monkeypatch):
+        """Test that blocks go to a new segment if a partial block cannot be cut off."""
+        archive = TodoArchive(config)
+        archive.append([archived(1)])
+        segment = next(tmp_path.glob(SEGMENT_GLOB))
+        with segment.open("ab") as f:
+            f.write(b"\x00\x00\x10")
+            archive._discard_partial(BrokenTruncate(f), 0)
+
+        archive.append([archived(2)])
+        assert len(list(tmp_path.glob(SEGMENT_GLOB))) == 2
+        assert [t.id for t in TodoArchive(config).page(0, 10)] == [2, 1]
+
+    def test_short_trailing_header_is_discarded(self, config, tmp_path):
+        """Test that fewer than a header's bytes at the end count as a torn block."""
+        TodoArchive(config).append([archived(1)])
+        segment = next(tmp_path.glob(SEGMENT_GLOB))
+        with segment.open("ab") as f:
+            f.write(b"\x00\x00\x10")
+
+        reopened = TodoArchive(config)
+        reopened.append([archived(2)])
+        assert [t.id for t in TodoArchive(config).page(0, 10)] == [2, 1]
+
+    def test_segments_roll_over(self, tmp_path):
+        """Test that a new segment starts once the current one is full."""
+        archive = TodoArchive(ArchiveConfig(directory=tmp_path, segment_max_bytes=1))
+        archive.append([archived(1)])
+        archive.append([archived(2)])
+
+        assert len(list(tmp_path.glob(SEGMENT_GLOB))) == 2
+        assert [t.id for t in TodoArchive(ArchiveConfig(directory=tmp_path)).page(0, 10)] == [2, 1]
+
+
+class TestTodoServiceArchive:
+    """Test suite for moving completed todos to the archive."""
+
+    @pytest.mark.asyncio
+    async def test_archive_completed(self, config):
+        """Test that only old completed todos leave the hot list."""
+        repository = InMemoryTodoRepository()
+        service = TodoService(repository, archive=TodoArchive(config))
+        for i in range(5):
+            service.create_todo(TodoCreate(title=f"todo {i}"))
+        service.toggle_todo_completed(2)
+        service.toggle_todo_completed(4)
+
+        assert await service.archive_completed(older_than=60) == 0
+        assert await service.archive_completed(older_than=-1) == 2
+
+        assert [t.id for t in service.get_all_todos()] == [1, 3, 5]
+        assert repository.count(TodoFilter.COMPLETED) == 0
+        assert service.count_archived() == 2
+        assert [t.id for t in await service.get_archived_page(0, 10)] == [4, 2]
+        assert (await service.get_archived_todo(2)).completed_at <= datetime.now(UTC)
+
+    @pytest.mark.asyncio
+    async def test_failed_write_restores_todos(self, config):
+        """Test that todos are put back when the archive cannot be written."""
+
+        class BrokenArchive(TodoArchive):
+            def append(self, todos):
+                raise OSError("disk full")
+
+        repository = InMemoryTodoRepository()
+        service = TodoService(repository, archive=BrokenArchive(config))
+        for i in range(3):
+            service.create_todo(TodoCreate(title=f"todo {i}"))
+        service.toggle_todo_completed(1)
+
+        with pytest.raises(OSError):
+            await service.archive_completed(older_than=-1)
+
+        assert [t.id for t in service.get_all_todos()] == [1, 2, 3]
+        assert [t.id for t in service.get_all_todos(status=TodoFilter.COMPLETED)] == [1]
+
+
+    @pytest.mark.asyncio
+    async def test_batches_follow_block_size(self, config):
+        """Test that a failed batch is never both archived and restored."""
+
+        class FailSecondAppend(TodoArchive):
+            calls = 0
+
+            def append(self, todos):
+                self.calls += 1
+                if self.calls == 2:
+                    raise OSError("disk full")
+                super().append(todos)
+
+        repository = InMemoryTodoRepository()
+        archive = FailSecondAppend(config)
+        service = TodoService(repository, archive=archive)
+        for i in range(5):
+            todo = service.create_todo(TodoCreate(title=f"todo {i}"))
+            service.toggle_todo_completed(todo.id)
+
+        with pytest.raises(OSError):
+            await service.archive_completed(older_than=-1)
+
+        archived_ids = {t.id for t in archive.page(0, 10)}
+        hot_ids = {t.id for t in service.get_all_todos()}
+        assert len(archived_ids) == config.block_size
+        assert archived_ids.isdisjoint(hot_ids)
+        assert archived_ids | hot_ids == {1, 2, 3, 4, 5}
+
+class TestArchiveSweep:
+    """Test suite for the periodic archive sweep."""
+
+    @pytest.mark.asyncio
+    async def test_sweep_survives_errors(self, tmp_path):
+        """Test that a failing sweep is logged and the next round still runs."""
+        config = ArchiveConfig(directory=tmp_path, archive_after=-1, sweep_interval=0.01)
+        resources = AppResources(archive=TodoArchive(config))
+        calls = 0
+
+        async def archive_completed(older_than: float) -> int:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise ValueError("boom")
+            return 0
+
+        resources.todo_service.archive_completed = archive_completed
+        await resources.start()
+        try:
+            await asyncio.sleep(0.1)
+        finally:
+            await resources.close()
+        assert calls >= 2
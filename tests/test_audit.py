@@ -0,0 +1,174 @@
+"""Tests for the non-blocking audit log pipeline."""
+
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+from litestar import Litestar, get, post
+from litestar.middleware import DefineMiddleware
+from litestar.testing import TestClient
+
+from hello_litestar_htmx.middleware.access_log import AccessLogMiddleware
+from hello_litestar_htmx.models.todo import TodoCreate
+from hello_litestar_htmx.repositories.todo import InMemoryTodoRepository
+from hello_litestar_htmx.services.audit import (
+    LOG_FILE_NAME,
+    AuditLog,
+    AuditLogConfig,
+    RotatingLogFile,
+)
+from hello_litestar_htmx.services.todo import TodoService
+
+
+def read_records(directory):
+    path = directory / LOG_FILE_NAME
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+@pytest_asyncio.fixture
+async def audit(tmp_path):
+    log = AuditLog(AuditLogConfig(directory=tmp_path, queue_size=3, flush_interval=0.01))
+    await log.start()
+    yield log
+    await log.stop()
+
+
+class TestAuditLog:
+    """Test suite for AuditLog."""
+
+    @pytest.mark.asyncio
+    async def test_records_are_written_in_batches(self, audit, tmp_path):
+        """Test that queued records end up in the file in order."""
+        assert audit.record("todo.created", todo_id=1)
+        assert audit.record("todo.deleted", todo_id=1)
+        await asyncio.sleep(0.05)
+
+        records = read_records(tmp_path)
+        assert [(r["event"], r["todo_id"]) for r in records] == [
+            ("todo.created", 1),
+            ("todo.deleted", 1),
+        ]
+        assert audit.written == 2
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_and_reports(self, audit, tmp_path):
+        """Test that records beyond the queue size are dropped and counted."""
+        results = [audit.record("todo.toggled", todo_id=i) for i in range(5)]
+        assert results == [True, True, True, False, False]
+        assert audit.dropped == 2
+
+        await audit.stop()
+        records = read_records(tmp_path)
+        assert [r["todo_id"] for r in records if r["event"] == "todo.toggled"] == [0, 1, 2]
+        assert records[-1]["event"] == "audit.dropped"
+        assert records[-1]["count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_records(self, tmp_path):
+        """Test that stopping before the flush interval still writes everything."""
+        log = AuditLog(AuditLogConfig(directory=tmp_path, flush_interval=60))
+        await log.start()
+        for i in range(3):
+            log.record("todo.created", todo_id=i)
+        await asyncio.sleep(0)
+        await log.stop()
+
+        assert [r["todo_id"] for r in read_records(tmp_path)] == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_write_error_keeps_writer_running(self, audit, tmp_path, monkeypatch):
+        """Test that a failed write is counted as dropped and later records still land."""
+        original = audit._file.write
+
+        def fail_once(data):
+            monkeypatch.setattr(audit._file, "write", original)
+            raise OSError(28, "No space left on device")
+
+        monkeypatch.setattr(audit._file, "write", fail_once)
+        audit.record("todo.created", todo_id=1)
+        await asyncio.sleep(0.05)
+        assert audit.dropped == 1
+        assert audit.written == 0
+
+        audit.record("todo.created", todo_id=2)
+        await asyncio.sleep(0.05)
+        records = read_records(tmp_path)
+        assert [r.get("todo_id") for r in records] == [2, None]
+        assert records[-1] == {**records[-1], "event": "audit.dropped", "count": 1}
+
+    def test_get_sampling(self, tmp_path):
+        """Test that only GET requests are subject to sampling."""
+        never = AuditLog(AuditLogConfig(directory=tmp_path))
+        always = AuditLog(AuditLogConfig(directory=tmp_path, get_sample_rate=1.0))
+
+        assert never.should_log_request("POST")
+        assert not never.should_log_request("GET")
+        assert always.should_log_request("GET")
+
+
+class TestRotatingLogFile:
+    """Test suite for size-based rotation."""
+
+    def test_rotation_keeps_backups(self, tmp_path):
+        """Test that files rotate at max_bytes and only backup_count are kept."""
+        log_file = RotatingLogFile(tmp_path / "audit.log", max_bytes=10, backup_count=2)
+        for chunk in (b"first...\n", b"second..\n", b"third...\n", b"fourth..\n"):
+            log_file.write(chunk)
+
+        assert (tmp_path / "audit.log").read_bytes() == b"fourth..\n"
+        assert (tmp_path / "audit.log.1").read_bytes() == b"third...\n"
+        assert (tmp_path / "audit.log.2").read_bytes() == b"second..\n"
+        assert not (tmp_path / "audit.log.3").exists()
+
+
+class TestAuditIntegration:
+    """Test suite for service and middleware records."""
+
+    @pytest.mark.asyncio
+    async def test_service_mutations_are_audited(self, tmp_path):
+        """Test that TodoService records one event per successful mutation."""
+        log = AuditLog(AuditLogConfig(directory=tmp_path))
+        await log.start()
+        service = TodoService(InMemoryTodoRepository(), audit=log)
+
+        todo = service.create_todo(TodoCreate(title="監査"))
+        service.toggle_todo_completed(todo.id)
+        service.delete_todo(todo.id)
+        service.delete_todo(todo.id)
+        await log.stop()
+
+        assert [(r["event"], r["todo_id"]) for r in read_records(tmp_path)] == [
+            ("todo.created", 1),
+            ("todo.toggled", 1),
+            ("todo.deleted", 1),
+        ]
+
+    def test_access_log_middleware(self, tmp_path):
+        """Test that mutations are always logged and unsampled GETs are skipped."""
+        log = AuditLog(AuditLogConfig(directory=tmp_path))
+
+        @get("/ping", sync_to_thread=False)
+        def ping() -> str:
+            return "pong"
+
+        @post("/things", sync_to_thread=False)
+        def create_thing() -> str:
+            return "created"
+
+        app = Litestar(
+            route_handlers=[ping, create_thing],
+            middleware=[DefineMiddleware(AccessLogMiddleware, audit=log)],
+            on_startup=[log.start],
+            on_shutdown=[log.stop],
+        )
+        with TestClient(app=app) as client:
+            client.get("/ping")
+            client.post("/things")
+
+        records = read_records(tmp_path)
+        assert len(records) == 1
+        assert records[0]["event"] == "http.request"
+        assert records[0]["method"] == "POST"
+        assert records[0]["path"] == "/things"
+        assert records[0]["status"] == 201
@@ -0,0 +1,184 @@
+"""Tests for idempotency keys on todo mutations."""
+
+import asyncio
+import re
+
+import pytest
+from litestar import Litestar, post
+from litestar.middleware import DefineMiddleware
+from litestar.testing import AsyncTestClient, TestClient
+
+from hello_litestar_htmx.app import app
+from hello_litestar_htmx.middleware.idempotency import (
+    IdempotencyCache,
+    IdempotencyConfig,
+    IdempotencyMiddleware,
+)
+
+KEY_PATTERN = re.compile(r'"Idempotency-Key": "([^"]+)"')
+
+
+@pytest.fixture
+def client():
+    with TestClient(app=app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def csrf_headers(client):
+    token = client.get("/todos").cookies.get("csrf_token")
+    return {"x-csrftoken": token}
+
+
+def todo_count(client) -> int:
+    return len(re.findall(r'id="todo-\d+"', client.get("/todos").text))
+
+
+class TestIdempotencyCache:
+    """Test suite for IdempotencyCache."""
+
+    @pytest.mark.asyncio
+    async def test_entries_expire(self):
+        """Test that responses are only replayed within the TTL."""
+        cache = IdempotencyCache(ttl=0.01, max_entries=10)
+        cache.begin(("a",))
+        cache.finish(("a",), 200, [], b"ok")
+        assert cache.get(("a",)).body == b"ok"
+
+        await asyncio.sleep(0.02)
+        assert cache.get(("a",)) is None
+
+    @pytest.mark.asyncio
+    async def test_size_is_bounded(self):
+        """Test that the oldest entries are evicted beyond max_entries."""
+        cache = IdempotencyCache(ttl=60, max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.begin((key,))
+            cache.finish((key,), 200, [], key.encode())
+
+        assert len(cache) == 2
+        assert cache.get(("a",)) is None
+        assert cache.get(("c",)).body == b"c"
+
+
+class TestIdempotentRoutes:
+    """Test suite for replaying todo mutations."""
+
+    def test_pages_render_keys(self, client):
+        """Test that the form and every todo control carry distinct keys."""
+        keys = KEY_PATTERN.findall(client.get("/todos").text)
+        assert keys
+        assert len(keys) == len(set(keys))
+
+    def test_repeated_add_creates_one_todo(self, client, csrf_headers):
+        """Test that a repeated POST /todos replays the first response."""
+        before = todo_count(client)
+        headers = {**csrf_headers, "Idempotency-Key": "add-1"}
+
+        first = client.post("/todos", data={"title": "一度だけ"}, headers=headers)
+        second = client.post("/todos", data={"title": "一度だけ"}, headers=headers)
+
+        assert first.status_code == second.status_code == 201
+        assert second.text == first.text
+        assert second.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in first.headers
+        assert todo_count(client) == before + 1
+
+    def test_add_response_rotates_form_key(self, client, csrf_headers):
+        """Test that the add response swaps in a form with a new key."""
+        page_key = KEY_PATTERN.search(client.get("/todos").text).group(1)
+        headers = {**csrf_headers, "Idempotency-Key": page_key}
+
+        response = client.post("/todos", data={"title": "新しいキー"}, headers=headers)
+        assert 'id="todo-form"' in response.text
+        assert 'hx-swap-oob="true"' in response.text
+        assert page_key not in response.text
+
+    def test_new_key_creates_new_todo(self, client, csrf_headers):
+        """Test that a different key is a new request."""
+        before = todo_count(client)
+        for key in ("add-a", "add-b"):
+            client.post(
+                "/todos", data={"title": "別々"}, headers={**csrf_headers, "Idempotency-Key": key}
+            )
+        assert todo_count(client) == before + 2
+
+    def test_repeated_toggle_toggles_once(self, client, csrf_headers):
+        """Test that a double-clicked checkbox only toggles once."""
+        created = client.post("/todos", data={"title": "トグル"}, headers=csrf_headers)
+        todo_id = re.search(r'id="todo-(\d+)"', created.text).group(1)
+        headers = {**csrf_headers, "Idempotency-Key": "toggle-1"}
+
+        client.post(f"/todos/{todo_id}/toggle", headers=headers)
+        replay = client.post(f"/todos/{todo_id}/toggle", headers=headers)
+
+        assert replay.headers["idempotent-replayed"] == "true"
+        assert "completed" in replay.text.split(">", 1)[0]
+        fresh = client.post(
+            f"/todos/{todo_id}/toggle", headers={**csrf_headers, "Idempotency-Key": "toggle-2"}
+        )
+        assert "completed" not in fresh.text.split(">", 1)[0]
+
+    def test_csrf_is_checked_before_replay(self, client, csrf_headers):
+        """Test that a cached key does not bypass CSRF protection."""
+        headers = {**csrf_headers, "Idempotency-Key": "add-csrf"}
+        client.post("/todos", data={"title": "CSRF"}, headers=headers)
+
+        response = client.post(
+            "/todos",
+            data={"title": "CSRF"},
+            headers={"x-csrftoken": "invalid", "Idempotency-Key": "add-csrf"},
+        )
+        assert response.status_code == 403
+
+
+class TestIdempotencyMiddleware:
+    """Test suite for concurrent repeats."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_repeat_waits_for_first(self):
+        """Test that a repeat arriving mid-request replays instead of running."""
+        calls = 0
+
+        @post("/slow")
+        async def slow() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return f"call {calls}"
+
+        test_app = Litestar(
+            route_handlers=[slow],
+            middleware=[DefineMiddleware(IdempotencyMiddleware, config=IdempotencyConfig())],
+        )
+        async with AsyncTestClient(app=test_app) as client:
+            headers = {"Idempotency-Key": "same"}
+            first, second = await asyncio.gather(
+                client.post("/slow", headers=headers), client.post("/slow", headers=headers)
+            )
+
+        assert calls == 1
+        assert first.text == second.text == "call 1"
+
+    @pytest.mark.asyncio
+    async def test_failed_request_is_not_cached(self):
+        """Test that an error response lets the repeat run the handler."""
+        calls = 0
+
+        @post("/flaky", sync_to_thread=False)
+        def flaky() -> str:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise RuntimeError("boom")
+            return "ok"
+
+        test_app = Litestar(
+            route_handlers=[flaky],
+            middleware=[DefineMiddleware(IdempotencyMiddleware, config=IdempotencyConfig())],
+        )
+        async with AsyncTestClient(app=test_app) as client:
+            headers = {"Idempotency-Key": "retry"}
+            assert (await client.post("/flaky", headers=headers)).status_code == 500
+            assert (await client.post("/flaky", headers=headers)).text == "ok"
+        assert calls == 2
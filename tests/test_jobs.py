@@ -0,0 +1,191 @@
+"""Tests for the background job runner."""
+
+import asyncio
+import io
+
+import pytest
+import pytest_asyncio
+
+from hello_litestar_htmx.models.todo import ExportFormat, TodoCreate, TodoFilter
+from hello_litestar_htmx.repositories.todo import InMemoryTodoRepository
+from hello_litestar_htmx.services.jobs import Job, JobRunner, JobStatus
+from hello_litestar_htmx.services.todo import TodoService
+
+
+async def wait_for(job: Job) -> Job:
+    for _ in range(1000):
+        if job.finished:
+            return job
+        await asyncio.sleep(0.001)
+    raise AssertionError(f"job {job.name} did not finish")
+
+
+@pytest_asyncio.fixture
+async def runner():
+    job_runner = JobRunner(max_concurrency=1, max_jobs=3)
+    yield job_runner
+    await job_runner.shutdown()
+
+
+class TestJobRunner:
+    """Test suite for JobRunner."""
+
+    @pytest.mark.asyncio
+    async def test_successful_job(self, runner):
+        """Test that a job records its result and progress."""
+
+        async def work(job: Job) -> str:
+            job.total = 2
+            job.done = 2
+            return "ok"
+
+        job = await wait_for(runner.submit("test", work))
+        assert job.status is JobStatus.SUCCEEDED
+        assert job.result == "ok"
+        assert job.percent == 100
+        assert runner.get(job.id) is job
+
+    @pytest.mark.asyncio
+    async def test_failed_job(self, runner):
+        """Test that exceptions are reported on the job."""
+
+        async def work(job: Job) -> str:
+            raise ValueError("boom")
+
+        job = await wait_for(runner.submit("test", work))
+        assert job.status is JobStatus.FAILED
+        assert job.error == "boom"
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self, runner):
+        """Test that at most max_concurrency jobs run at once."""
+        release = asyncio.Event()
+
+        async def work(job: Job) -> str:
+            await release.wait()
+            return "done"
+
+        first = runner.submit("first", work)
+        second = runner.submit("second", work)
+        await asyncio.sleep(0.01)
+        assert first.status is JobStatus.RUNNING
+        assert second.status is JobStatus.PENDING
+
+        release.set()
+        await wait_for(second)
+        assert first.status is second.status is JobStatus.SUCCEEDED
+
+    @pytest.mark.asyncio
+    async def test_finished_jobs_are_evicted(self, runner):
+        """Test that only max_jobs job statuses are retained."""
+
+        async def work(job: Job) -> str:
+            return "ok"
+
+        jobs = [await wait_for(runner.submit(f"job {i}", work)) for i in range(5)]
+        assert runner.get(jobs[0].id) is None
+        assert runner.get(jobs[-1].id) is jobs[-1]
+
+    @pytest.mark.asyncio
+    async def test_shutdown_grace_period(self, runner):
+        """Test that shutdown lets short jobs finish and cancels the rest."""
+
+        async def short(job: Job) -> str:
+            await asyncio.sleep(0.01)
+            return "ok"
+
+        async def endless(job: Job) -> str:
+            await asyncio.Event().wait()
+            return "unreachable"
+
+        quick = runner.submit("short", short)
+        await runner.shutdown(grace_period=1.0)
+        assert quick.status is JobStatus.SUCCEEDED
+
+        stuck = runner.submit("endless", endless)
+        await asyncio.sleep(0)
+        await runner.shutdown(grace_period=0.01)
+        assert stuck.status is JobStatus.FAILED
+        assert stuck.error == "cancelled"
+
+
+class TestTodoServiceJobs:
+    """Test suite for TodoService background operations."""
+
+    @pytest.mark.asyncio
+    async def test_clear_completed(self, runner):
+        """Test clearing completed todos in batches."""
+        repository = InMemoryTodoRepository()
+        service = TodoService(repository, runner)
+        for i in range(2500):
+            todo = repository.create(TodoCreate(title=f"todo {i}"))
+            if i % 2:
+                repository.toggle_completed(todo.id)
+
+        job = await wait_for(service.enqueue_clear_completed())
+        assert job.status is JobStatus.SUCCEEDED
+        assert job.done == job.total == 1250
+        assert repository.count(status=TodoFilter.COMPLETED) == 0
+        assert repository.count() == 1250
+
+    @pytest.mark.asyncio
+    async def test_import(self, runner):
+        """Test importing a spooled upload."""
+        repository = InMemoryTodoRepository()
+        service = TodoService(repository, runner)
+        body = b"".join(b'{"title": "todo %d"}\n' % i for i in range(1500))
+
+        job = await wait_for(
+            service.enqueue_import(io.BytesIO(body), len(body), ExportFormat.NDJSON)
+        )
+        assert job.status is JobStatus.SUCCEEDED
+        assert job.percent == 100
+        assert repository.count() == 1500
+
+    @pytest.mark.asyncio
+    async def test_move_schedules_rebalance(self, runner):
+        """Test that crowded positions are spread out again in the background."""
+        repository = InMemoryTodoRepository()
+        service = TodoService(repository, runner)
+        for i in range(3):
+            repository.create(TodoCreate(title=f"todo {i}"))
+
+        moved = 2
+        while not repository.needs_rebalance():
+            moved = 5 - moved
+            service.move_todo(moved, after_id=1)
+        assert repository.needs_rebalance()
+
+        await asyncio.sleep(0.01)
+        assert not repository.needs_rebalance()
+        assert [t.position for t in service.get_all_todos()] == [1.0, 2.0, 3.0]
+        assert service.get_all_todos()[1].id == moved
+
+    @pytest.mark.asyncio
+    async def test_rebalance_yields_between_batches(self, runner):
+        """Test that the rebalance job hands the loop back after every batch."""
+        repository = InMemoryTodoRepository()
+        service = TodoService(repository, runner)
+        for i in range(2500):
+            repository.create(TodoCreate(title=f"todo {i}"))
+
+        moved = 2
+        while not repository.needs_rebalance():
+            moved = 5 - moved
+            service.move_todo(moved, after_id=1)
+        expected = [t.id for t in service.get_all_todos()]
+        spread = [float(i) for i in range(1, len(expected) + 1)]
+
+        turns = 0
+        while [t.position for t in service.get_all_todos()] != spread:
+            turns += 1
+            assert turns < 100
+            await asyncio.sleep(0)
+            assert [t.id for t in service.get_all_todos()] == expected
+        assert turns >= 5
+
+    def test_enqueue_without_runner(self):
+        """Test that enqueueing requires a JobRunner."""
+        service = TodoService(InMemoryTodoRepository())
+        with pytest.raises(RuntimeError):
+            service.enqueue_clear_completed()
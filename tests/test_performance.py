@@ -0,0 +1,250 @@
+"""Complexity and memory regression tests for the data layer.
+
+Each operation is timed at several collection sizes, and the slope of
+log(time per op) against log(size) is compared with the expected complexity:
+~0 for O(1)/O(log n) operations and ~1 for O(n) ones. Memory budgets are
+enforced with tracemalloc.
+
+These tests depend on wall-clock timing, so the default ``pytest`` run skips
+them; select them with ``-m perf``. The sizes stay small so they run in
+seconds; pass ``--perf-exhaustive`` to measure from 1k up to 1M todos.
+
+    uv run pytest -m perf --perf-exhaustive
+"""
+
+import gc
+import math
+import random
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import pytest
+
+from hello_litestar_htmx.models.todo import TagMatch, TodoCreate, TodoFilter, TodoImport, TodoUpdate
+from hello_litestar_htmx.repositories.todo import InMemoryTodoRepository, TodoRepository
+from hello_litestar_htmx.services.todo import TodoService
+
+pytestmark = pytest.mark.perf
+
+FAST_SIZES = (1_000, 5_000, 25_000)
+EXHAUSTIVE_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+# Upper bounds on the log-log slope of time per operation vs. size
+CONSTANT_SLOPE = 0.35
+LINEAR_SLOPE = 1.3
+
+BYTES_PER_TODO_BUDGET = 1024
+BYTES_PER_LISTED_TODO_BUDGET = 16
+BATCH_ITERATION_BUDGET = 512 * 1024
+# populate() completes a third of the todos; once they are archived the hot
+# list must shrink to roughly the remaining two thirds
+HOT_MEMORY_AFTER_ARCHIVING = 0.75
+
+OPS = 200
+REPEATS = 5
+
+REPOSITORY_FACTORIES: dict[str, Callable[[], TodoRepository]] = {
+    "in_memory": InMemoryTodoRepository,
+}
+
+
+@pytest.fixture(scope="module")
+def sizes(request) -> tuple[int, ...]:
+    if request.config.getoption("--perf-exhaustive"):
+        return EXHAUSTIVE_SIZES
+    return FAST_SIZES
+
+
+@pytest.fixture(params=list(REPOSITORY_FACTORIES))
+def repository_factory(request) -> Callable[[], TodoRepository]:
+    return REPOSITORY_FACTORIES[request.param]
+
+
+def populate(factory: Callable[[], TodoRepository], size: int) -> TodoRepository:
+    """Create a repository with ``size`` todos, every third one completed."""
+    repository = factory()
+    repository.create_many(
+        TodoImport(title=f"todo {i}", completed=i % 3 == 0) for i in range(size)
+    )
+    return repository
+
+
+def seconds_per_op(run: Callable[[int], object], ids: list[int]) -> float:
+    """Best-of-REPEATS time per call of ``run`` over a slice of ``ids``."""
+    best = math.inf
+    for r in range(REPEATS):
+        chunk = ids[r * OPS : (r + 1) * OPS]
+        start = time.perf_counter()
+        for todo_id in chunk:
+            run(todo_id)
+        best = min(best, (time.perf_counter() - start) / len(chunk))
+    return best
+
+
+def loglog_slope(sizes: tuple[int, ...], times: list[float]) -> float:
+    """Least-squares slope of log(time) against log(size)."""
+    xs = [math.log(s) for s in sizes]
+    ys = [math.log(t) for t in times]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    return numerator / sum((x - mean_x) ** 2 for x in xs)
+
+
+def measure_slope(
+    sizes: tuple[int, ...],
+    factory: Callable[[], TodoRepository],
+    operation: Callable[[TodoRepository, int], object],
+) -> float:
+    """Time ``operation(repository, todo_id)`` on random existing ids at each size."""
+    times = []
+    for size in sizes:
+        repository = populate(factory, size)
+        ids = random.Random(size).sample(range(1, size + 1), OPS * REPEATS)
+        times.append(seconds_per_op(lambda todo_id: operation(repository, todo_id), ids))
+    return loglog_slope(sizes, times)
+
+
+class TestRepositoryComplexity:
+    """Scaling bounds for TodoRepositoryProtocol implementations."""
+
+    @pytest.mark.parametrize(
+        "operation",
+        [
+            pytest.param(lambda repo, todo_id: repo.get_by_id(todo_id), id="get_by_id"),
+            pytest.param(lambda repo, todo_id: repo.toggle_completed(todo_id), id="toggle"),
+            pytest.param(lambda repo, todo_id: repo.delete(todo_id), id="delete"),
+            pytest.param(lambda repo, todo_id: repo.create(TodoCreate(title="new")), id="create"),
+            pytest.param(lambda repo, todo_id: repo.count(TodoFilter.ACTIVE), id="count"),
+            pytest.param(
+                lambda repo, todo_id: repo.move(todo_id, after_id=todo_id // 2 + 1), id="move"
+            ),
+        ],
+    )
+    def test_constant_time_operations(self, sizes, repository_factory, operation):
+        """Point operations must not grow with the collection size."""
+        slope = measure_slope(sizes, repository_factory, operation)
+        assert slope < CONSTANT_SLOPE, f"slope {slope:.2f} suggests O(n) behaviour"
+
+    def test_batch_iteration_is_constant_per_batch(self, sizes, repository_factory):
+        """Fetching one batch must not depend on how many todos precede it."""
+
+        def first_batch_after(repo: TodoRepository, todo_id: int) -> None:
+            next(repo.iter_batches(batch_size=100))
+
+        slope = measure_slope(sizes, repository_factory, first_batch_after)
+        assert slope < CONSTANT_SLOPE, f"slope {slope:.2f} suggests O(n) behaviour"
+
+    def test_archiving_is_constant_per_todo(self, sizes, repository_factory):
+        """Popping old completed todos must cost O(1) per todo removed."""
+        times = []
+        for size in sizes:
+            repository = repository_factory()
+            repository.create_many(TodoImport(title="done", completed=True) for _ in range(size))
+
+            def pop_one(_: int) -> None:
+                repository.pop_completed_before(math.inf, 1)
+
+            times.append(seconds_per_op(pop_one, list(range(OPS * REPEATS))))
+        slope = loglog_slope(sizes, times)
+        assert slope < CONSTANT_SLOPE, f"slope {slope:.2f} suggests O(n) behaviour"
+
+    @pytest.mark.parametrize("status", [TodoFilter.ALL, TodoFilter.COMPLETED])
+    def test_listing_is_at_most_linear(self, sizes, repository_factory, status):
+        """Listing a view may be O(view size) but no worse."""
+        times = []
+        for size in sizes:
+            repository = populate(repository_factory, size)
+            start = time.perf_counter()
+            repository.get_all(status=status)
+            times.append(time.perf_counter() - start)
+        slope = loglog_slope(sizes, times)
+        assert slope < LINEAR_SLOPE, f"slope {slope:.2f} suggests worse than O(n)"
+
+    @pytest.mark.parametrize("tag_match", list(TagMatch))
+    def test_tag_filter_scales_with_matches(self, sizes, repository_factory, tag_match):
+        """Filtering by tag must cost O(matches), not O(size)."""
+        times = []
+        for size in sizes:
+            repository = populate(repository_factory, size)
+            # The same number of tagged todos at every size, spread over the id range
+            for todo_id in range(1, size + 1, size // OPS):
+                repository.update(todo_id, TodoUpdate(tags=("rare", "other")))
+
+            def filter_by_tag(_: int) -> None:
+                repository.get_all(tags=["rare", "other"], tag_match=tag_match)
+
+            times.append(seconds_per_op(filter_by_tag, list(range(OPS * REPEATS))))
+        slope = loglog_slope(sizes, times)
+        assert slope < CONSTANT_SLOPE, f"slope {slope:.2f} suggests O(n) behaviour"
+
+
+class TestServiceComplexity:
+    """Scaling bounds for TodoService on top of each repository."""
+
+    @pytest.mark.parametrize(
+        "operation",
+        [
+            pytest.param(lambda svc, todo_id: svc.get_todo(todo_id), id="get_todo"),
+            pytest.param(lambda svc, todo_id: svc.toggle_todo_completed(todo_id), id="toggle"),
+            pytest.param(lambda svc, todo_id: svc.delete_todo(todo_id), id="delete"),
+        ],
+    )
+    def test_constant_time_operations(self, sizes, repository_factory, operation):
+        """Service point operations must not grow with the collection size."""
+        slope = measure_slope(
+            sizes,
+            repository_factory,
+            lambda repo, todo_id: operation(TodoService(repo), todo_id),
+        )
+        assert slope < CONSTANT_SLOPE, f"slope {slope:.2f} suggests O(n) behaviour"
+
+
+class TestRepositoryMemory:
+    """Memory budgets measured with tracemalloc."""
+
+    def test_bytes_per_todo(self, sizes, repository_factory):
+        """Each stored todo must stay within its memory budget."""
+        size = sizes[-1]
+        tracemalloc.start()
+        repository = populate(repository_factory, size)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert repository.count() == size
+        assert current / size < BYTES_PER_TODO_BUDGET
+
+    def test_listing_does_not_copy_todos(self, sizes, repository_factory):
+        """get_all may allocate a list of references, not copies of todos."""
+        size = sizes[-1]
+        repository = populate(repository_factory, size)
+        tracemalloc.start()
+        todos = repository.get_all()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert len(todos) == size
+        assert peak / size < BYTES_PER_LISTED_TODO_BUDGET
+
+    def test_batch_iteration_memory_is_bounded(self, sizes, repository_factory):
+        """Iterating all batches must use memory independent of size."""
+        repository = populate(repository_factory, sizes[-1])
+        tracemalloc.start()
+        for _ in repository.iter_batches(batch_size=1000):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert peak < BATCH_ITERATION_BUDGET
+
+    def test_archiving_releases_hot_memory(self, sizes, repository_factory):
+        """Hot-list memory must depend only on the todos that were not archived."""
+        size = sizes[-1]
+        tracemalloc.start()
+        repository = populate(repository_factory, size)
+        before, _ = tracemalloc.get_traced_memory()
+        popped = repository.pop_completed_before(math.inf, size)
+        del popped
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert repository.count(TodoFilter.COMPLETED) == 0
+        assert after / before < HOT_MEMORY_AFTER_ARCHIVING
@@ -0,0 +1,92 @@
+"""Tests for the on-demand profiling middleware."""
+
+import pytest
+from litestar import Litestar, get
+from litestar.di import Provide
+from litestar.middleware import DefineMiddleware
+from litestar.testing import TestClient
+
+from hello_litestar_htmx.middleware.profiling import ProfilingConfig, ProfilingMiddleware
+from hello_litestar_htmx.routes import profiles_router
+
+
+@get("/ping")
+async def ping() -> str:
+    return "pong"
+
+
+def make_client(config: ProfilingConfig) -> TestClient:
+    app = Litestar(
+        route_handlers=[ping, profiles_router],
+        dependencies={"profiling_config": Provide(lambda: config, sync_to_thread=False)},
+        middleware=[DefineMiddleware(ProfilingMiddleware, config=config)],
+    )
+    return TestClient(app=app)
+
+
+@pytest.fixture
+def config(tmp_path):
+    return ProfilingConfig(directory=tmp_path / "profiles", token="secret-token", max_profiles=2)
+
+
+class TestProfilingMiddleware:
+    """Test suite for ProfilingMiddleware."""
+
+    def test_disabled_by_default(self, tmp_path):
+        """Test that a config without token or sampling is disabled."""
+        assert ProfilingConfig(directory=tmp_path).enabled is False
+
+    def test_sampling_requires_token(self, tmp_path):
+        """Test that sampled profiles cannot be enabled without a token protecting them."""
+        with pytest.raises(ValueError, match="token"):
+            ProfilingConfig(directory=tmp_path, sample_rate=0.5)
+
+    def test_request_without_header_is_not_profiled(self, config):
+        """Test that ordinary requests are not profiled."""
+        with make_client(config) as client:
+            assert client.get("/ping").text == "pong"
+        assert not config.directory.exists()
+
+    def test_request_with_wrong_token_is_not_profiled(self, config):
+        """Test that an invalid header token does not trigger profiling."""
+        with make_client(config) as client:
+            client.get("/ping", headers={"x-profile": "wrong"})
+        assert not config.directory.exists()
+
+    def test_request_with_token_is_profiled(self, config):
+        """Test that the authorized header stores a pstats file."""
+        with make_client(config) as client:
+            assert client.get("/ping", headers={"x-profile": "secret-token"}).text == "pong"
+        files = list(config.directory.glob("*.prof"))
+        assert len(files) == 1
+        assert files[0].name.endswith("-GET-ping.prof")
+
+    def test_sampling_profiles_every_request(self, tmp_path):
+        """Test that sample_rate=1.0 profiles requests without a header."""
+        config = ProfilingConfig(directory=tmp_path, token="secret-token", sample_rate=1.0)
+        with make_client(config) as client:
+            client.get("/ping")
+        assert len(list(tmp_path.glob("*.prof"))) == 1
+
+    def test_directory_is_bounded(self, config):
+        """Test that only the newest max_profiles files are kept."""
+        with make_client(config) as client:
+            for _ in range(5):
+                client.get("/ping", headers={"x-profile": "secret-token"})
+        assert len(list(config.directory.glob("*.prof"))) == 2
+
+    def test_listing_requires_token(self, config):
+        """Test that the listing endpoint is protected by the token."""
+        with make_client(config) as client:
+            assert client.get("/_profiles").status_code == 401
+
+    def test_listing_returns_recent_profiles(self, config):
+        """Test listing stored profiles, newest first."""
+        headers = {"x-profile": "secret-token"}
+        with make_client(config) as client:
+            client.get("/ping", headers=headers)
+            response = client.get("/_profiles", headers=headers)
+        assert response.status_code == 200
+        profiles = response.json()
+        assert len(profiles) == 1
+        assert profiles[0]["name"].endswith("-GET-ping.prof")
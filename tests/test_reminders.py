@@ -0,0 +1,128 @@
+"""Tests for due dates and the reminder scheduler."""
+
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from hello_litestar_htmx.models.todo import TodoCreate, TodoCreateForm, TodoUpdate
+from hello_litestar_htmx.repositories.todo import InMemoryTodoRepository
+from hello_litestar_htmx.services.reminders import ReminderScheduler
+from hello_litestar_htmx.services.todo import TodoService
+
+
+def due_in(seconds: float) -> datetime:
+    return datetime.now(UTC) + timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def repository():
+    return InMemoryTodoRepository()
+
+
+class TestDueIndex:
+    """Test suite for the repository's reminder heap."""
+
+    def test_pop_due_in_due_order(self, repository):
+        """Test that only due reminders fire, earliest first, once each."""
+        for title, offset in (("later", 60), ("second", -10), ("first", -20), ("none", None)):
+            due_at = None if offset is None else due_in(offset)
+            repository.create(TodoCreate(title=title, due_at=due_at))
+
+        assert [t.title for t in repository.pop_due(time.time(), limit=10)] == ["first", "second"]
+        assert repository.pop_due(time.time(), limit=10) == []
+        assert repository.next_due() == pytest.approx(due_in(60).timestamp(), abs=1)
+
+    def test_update_reschedules(self, repository):
+        """Test that changing or removing a due time replaces the pending reminder."""
+        todo = repository.create(TodoCreate(title="a", due_at=due_in(60)))
+        other = repository.create(TodoCreate(title="b", due_at=due_in(120)))
+
+        repository.update(todo.id, TodoUpdate(due_at=due_in(-1)))
+        assert [t.id for t in repository.pop_due(time.time(), limit=10)] == [todo.id]
+
+        repository.update(other.id, TodoUpdate(due_at=None))
+        repository.update(todo.id, TodoUpdate(title="kept"))
+        assert repository.next_due() is None
+
+    def test_completed_and_deleted_todos_do_not_fire(self, repository):
+        """Test that toggling and deleting cancel reminders, and reopening re-arms them."""
+        done = repository.create(TodoCreate(title="done", due_at=due_in(-1)))
+        gone = repository.create(TodoCreate(title="gone", due_at=due_in(-1)))
+        repository.toggle_completed(done.id)
+        repository.delete(gone.id)
+        assert repository.pop_due(time.time(), limit=10) == []
+
+        repository.toggle_completed(done.id)
+        assert [t.id for t in repository.pop_due(time.time(), limit=10)] == [done.id]
+
+    def test_stale_entries_are_compacted(self, repository):
+        """Test that rescheduling many times does not grow the heap without bound."""
+        todo = repository.create(TodoCreate(title="a", due_at=due_in(60)))
+        for i in range(1000):
+            repository.update(todo.id, TodoUpdate(due_at=due_in(60 + i)))
+        assert len(repository._due_heap) < 100
+        assert repository.next_due() == pytest.approx(due_in(1059).timestamp(), abs=1)
+
+    def test_form_due_time_is_local(self):
+        """Test that a datetime-local form value is read as local time."""
+        todo_data = TodoCreateForm(title="a", due_at="2030-01-02T03:04").to_model()
+        assert todo_data.due_at == datetime(2030, 1, 2, 3, 4).astimezone()
+        assert TodoCreateForm(title="a").to_model().due_at is None
+
+
+class TestReminderScheduler:
+    """Test suite for ReminderScheduler."""
+
+    @pytest.mark.asyncio
+    async def test_fires_when_due(self, repository):
+        """Test that subscribers receive a reminder at its due time, not before."""
+        scheduler = ReminderScheduler(repository)
+        service = TodoService(repository, reminders=scheduler)
+        scheduler.start()
+        received = scheduler.subscribe()
+        try:
+            next_batch = asyncio.ensure_future(anext(received))
+            await asyncio.sleep(0)
+            # The scheduler is asleep with nothing due; a new due time must wake it
+            service.create_todo(TodoCreate(title="soon", due_at=due_in(0.05)))
+            await asyncio.sleep(0.01)
+            assert not next_batch.done()
+
+            batch = await asyncio.wait_for(next_batch, timeout=1)
+            assert [t.title for t in batch] == ["soon"]
+            assert scheduler.fired == 1
+        finally:
+            await received.aclose()
+            await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_wakeups_do_not_depend_on_pending_count(self, repository):
+        """Test that far-future reminders cost no wake-ups while waiting."""
+        for i in range(1000):
+            repository.create(TodoCreate(title=f"todo {i}", due_at=due_in(3600 + i)))
+        scheduler = ReminderScheduler(repository)
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+        assert scheduler.wakeups == 1
+        assert scheduler.fired == 0
+
+    def test_slow_subscriber_drops_batches(self, repository):
+        """Test that a full subscriber queue drops batches instead of growing."""
+        scheduler = ReminderScheduler(repository, subscriber_queue_size=1)
+
+        async def run() -> list:
+            received = scheduler.subscribe()
+            first = asyncio.ensure_future(anext(received))
+            await asyncio.sleep(0)
+            for i in range(3):
+                repository.create(TodoCreate(title=f"todo {i}", due_at=due_in(-1)))
+                scheduler.fire_due()
+            batch = await first
+            await received.aclose()
+            return batch
+
+        assert [t.title for t in asyncio.run(run())] == ["todo 0"]
+        assert scheduler.fired == 3
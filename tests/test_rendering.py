@@ -0,0 +1,81 @@
+"""Tests for off-loop template rendering."""
+
+import re
+
+import pytest
+from litestar import Response
+from litestar.response import Template
+from litestar.testing import RequestFactory, TestClient
+
+from hello_litestar_htmx.app import app, resources
+from hello_litestar_htmx.rendering import RenderConfig
+
+
+@pytest.fixture
+def client():
+    with TestClient(app=app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def renderer(client):
+    renderer = resources.current.renderer
+    original = renderer.config
+    yield renderer
+    renderer.config = original
+
+
+class TestTemplateRenderer:
+    """Test suite for TemplateRenderer."""
+
+    def test_small_render_stays_inline(self, client, renderer):
+        """Test that renders below the threshold return a lazy Template."""
+        renderer.config = RenderConfig(offload_threshold=10)
+        request = client.blocking_portal.call(self._request)
+
+        response = client.blocking_portal.call(
+            renderer.respond, request, "hello.html", {"name": "Litestar"}, 9
+        )
+        assert isinstance(response, Template)
+
+    def test_large_render_is_offloaded(self, client, renderer):
+        """Test that renders at the threshold return finished HTML."""
+        renderer.config = RenderConfig(offload_threshold=10)
+        request = client.blocking_portal.call(self._request)
+
+        response = client.blocking_portal.call(
+            renderer.respond, request, "hello.html", {"name": "Litestar"}, 10
+        )
+        assert type(response) is Response
+        assert "こんにちは、Litestarさん" in response.content
+
+    @staticmethod
+    async def _request():
+        return RequestFactory(app=app).get("/")
+
+
+class TestOffloadedRoutes:
+    """Test suite for pages rendered in the thread pool."""
+
+    @pytest.mark.parametrize("headers", [{}, {"HX-Request": "true"}])
+    def test_todos_page_is_identical(self, client, renderer, headers):
+        """Test that an offloaded /todos render matches the inline one."""
+        renderer.config = RenderConfig(offload_threshold=10_000)
+        inline = client.get("/todos", headers=headers)
+        renderer.config = RenderConfig(offload_threshold=0)
+        offloaded = client.get("/todos", headers=headers)
+
+        assert offloaded.status_code == 200
+        assert offloaded.headers["content-type"].startswith("text/html")
+        assert _strip_tokens(offloaded.text) == _strip_tokens(inline.text)
+
+    def test_live_page_is_offloaded(self, client, renderer):
+        """Test that the live page renders in the thread pool."""
+        renderer.config = RenderConfig(offload_threshold=0)
+        response = client.get("/todos/live")
+        assert response.status_code == 200
+        assert "ws-connect" in response.text
+
+
+def _strip_tokens(html: str) -> str:
+    return re.sub(r'"Idempotency-Key": "[^"]+"', "", html)
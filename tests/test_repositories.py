@@ -2,7 +2,16 @@
 
 import pytest
 
-from hello_litestar_htmx.models.todo import TodoCreate, TodoUpdate
+from hello_litestar_htmx.models.todo import (
+    ChangeKind,
+    SortOrder,
+    TagMatch,
+    TodoCreate,
+    TodoFilter,
+    TodoImport,
+    TodoUpdate,
+)
+from hello_litestar_htmx.repositories.indexes import Bitmap, SortedIndex
 from hello_litestar_htmx.repositories.todo import InMemoryTodoRepository
 
 
@@ -110,3 +119,392 @@ class TestInMemoryTodoRepository:
         """Test toggling a non-existent todo."""
         toggled = repository.toggle_completed(999)
         assert toggled is None
+
+
+class TestInMemoryTodoRepositoryViews:
+    """Test suite for filtered and sorted views."""
+
+    @pytest.fixture
+    def populated(self, repository):
+        """Repository with todos 1..4 where 2 and 4 are completed."""
+        for title in ["one", "two", "three", "four"]:
+            repository.create(TodoCreate(title=title))
+        repository.toggle_completed(2)
+        repository.toggle_completed(4)
+        return repository
+
+    @staticmethod
+    def ids(todos):
+        return [t.id for t in todos]
+
+    def test_all_ascending_by_default(self, populated):
+        """Test that the default view is all todos in list order."""
+        assert self.ids(populated.get_all()) == [1, 2, 3, 4]
+
+    def test_all_descending(self, populated):
+        """Test the reversed list order."""
+        assert self.ids(populated.get_all(order=SortOrder.DESC)) == [4, 3, 2, 1]
+
+    def test_active_and_completed(self, populated):
+        """Test filtering by completion status."""
+        assert self.ids(populated.get_all(status=TodoFilter.ACTIVE)) == [1, 3]
+        assert self.ids(populated.get_all(status=TodoFilter.COMPLETED)) == [2, 4]
+        assert self.ids(
+            populated.get_all(status=TodoFilter.COMPLETED, order=SortOrder.DESC)
+        ) == [4, 2]
+
+    def test_toggle_keeps_creation_order(self, populated):
+        """Test that toggling moves a todo into the other view in creation order."""
+        populated.toggle_completed(3)
+        assert self.ids(populated.get_all(status=TodoFilter.ACTIVE)) == [1]
+        assert self.ids(populated.get_all(status=TodoFilter.COMPLETED)) == [2, 3, 4]
+
+        populated.toggle_completed(4)
+        assert self.ids(populated.get_all(status=TodoFilter.ACTIVE)) == [1, 4]
+
+    def test_update_completed_updates_views(self, populated):
+        """Test that update(completed=...) keeps the views in sync."""
+        populated.update(1, TodoUpdate(completed=True))
+        populated.update(2, TodoUpdate(completed=True))  # no-op
+        assert self.ids(populated.get_all(status=TodoFilter.COMPLETED)) == [1, 2, 4]
+        assert self.ids(populated.get_all(status=TodoFilter.ACTIVE)) == [3]
+
+    def test_delete_removes_from_views(self, populated):
+        """Test that deleted todos disappear from every view."""
+        populated.delete(2)
+        populated.delete(3)
+        assert self.ids(populated.get_all()) == [1, 4]
+        assert self.ids(populated.get_all(status=TodoFilter.ACTIVE)) == [1]
+        assert self.ids(populated.get_all(status=TodoFilter.COMPLETED)) == [4]
+
+
+class TestInMemoryTodoRepositoryOrdering:
+    """Test suite for moving todos with fractional positions."""
+
+    @pytest.fixture
+    def populated(self, repository):
+        """Repository with todos 1..5 where 2 and 4 are completed."""
+        for i in range(5):
+            repository.create(TodoCreate(title=f"todo {i}"))
+        repository.toggle_completed(2)
+        repository.toggle_completed(4)
+        return repository
+
+    @staticmethod
+    def ids(todos):
+        return [t.id for t in todos]
+
+    def test_move_after_and_before(self, populated):
+        """Test placing a todo next to an anchor."""
+        populated.move(5, after_id=1)
+        assert self.ids(populated.get_all()) == [1, 5, 2, 3, 4]
+        populated.move(1, before_id=4)
+        assert self.ids(populated.get_all()) == [5, 2, 3, 1, 4]
+        populated.move(5)
+        assert self.ids(populated.get_all()) == [2, 3, 1, 4, 5]
+        assert self.ids(populated.get_all(order=SortOrder.DESC)) == [5, 4, 1, 3, 2]
+
+    def test_move_to_either_end(self, populated):
+        """Test moving before the first and after the last todo."""
+        populated.move(3, before_id=1)
+        populated.move(2, after_id=5)
+        assert self.ids(populated.get_all()) == [3, 1, 4, 5, 2]
+
+    def test_move_rewrites_one_todo(self, populated):
+        """Test that only the moved todo changes position or appears in the change log."""
+        before = {t.id: t.position for t in populated.get_all()}
+        version = populated.get_version()
+
+        populated.move(5, after_id=1)
+
+        after = {t.id: t.position for t in populated.get_all()}
+        assert [i for i in before if before[i] != after[i]] == [5]
+        assert [(c.kind, c.todo_id) for c in populated.get_changes(version)] == [
+            (ChangeKind.UPDATE, 5)
+        ]
+
+    def test_filtered_views_follow_moves(self, populated):
+        """Test that status views and toggles keep the moved order."""
+        populated.move(4, before_id=2)
+        assert self.ids(populated.get_all(status=TodoFilter.COMPLETED)) == [4, 2]
+        populated.toggle_completed(4)
+        assert self.ids(populated.get_all(status=TodoFilter.ACTIVE)) == [1, 4, 3, 5]
+
+    def test_new_todos_go_last(self, populated):
+        """Test that a created todo is appended after moved ones."""
+        populated.move(1, after_id=5)
+        todo = populated.create(TodoCreate(title="new"))
+        assert self.ids(populated.get_all())[-2:] == [1, todo.id]
+
+    def test_move_not_found(self, populated):
+        """Test moving a missing todo or next to a missing anchor."""
+        assert populated.move(99, after_id=1) is None
+        assert populated.move(1, after_id=99) is None
+        assert populated.move(1, after_id=1).id == 1
+        assert self.ids(populated.get_all()) == [1, 2, 3, 4, 5]
+
+    def test_repeated_moves_into_one_gap(self, populated):
+        """Test that halving one gap asks for a rebalance and never breaks the order."""
+        expected = self.ids(populated.get_all())
+        for i in range(200):
+            todo_id = expected[-1] if i % 2 else expected[2]
+            populated.move(todo_id, after_id=1)
+            expected.remove(todo_id)
+            expected.insert(1, todo_id)
+            assert self.ids(populated.get_all()) == expected
+        assert populated.needs_rebalance()
+
+        assert populated.rebalance_positions() == 5
+        assert not populated.needs_rebalance()
+        assert self.ids(populated.get_all()) == expected
+        assert [t.position for t in populated.get_all()] == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+    def test_batched_rebalance_keeps_order_between_batches(self, populated):
+        """Test that writes between rebalance batches never break the order."""
+        for i in range(6, 41):
+            populated.create(TodoCreate(title=f"todo {i}"))
+        for i in range(60):
+            populated.move(40 - i % 7, after_id=1)
+        expected = self.ids(populated.get_all())
+
+        for step, _ in enumerate(populated.iter_rebalance(batch_size=4)):
+            if step % 3 == 0:
+                new = populated.create(TodoCreate(title=f"new {step}"))
+                expected.append(new.id)
+            if step % 3 == 1:
+                moved = expected.pop()
+                populated.move(moved, after_id=expected[step])
+                expected.insert(step + 1, moved)
+            if step % 5 == 2:
+                populated.toggle_completed(expected[-step])
+            if step == 7:
+                populated.delete(expected.pop(5))
+            todos = populated.get_all()
+            assert self.ids(todos) == expected
+            positions = [t.position for t in todos]
+            assert positions == sorted(set(positions))
+            for completed in (False, True):
+                status = TodoFilter.COMPLETED if completed else TodoFilter.ACTIVE
+                assert self.ids(populated.get_all(status=status)) == [
+                    t.id for t in todos if t.completed is completed
+                ]
+
+        assert not populated.needs_rebalance()
+        assert list(populated.iter_rebalance(batch_size=100)) == [len(expected)] * 2
+        positions = [t.position for t in populated.get_all()]
+        assert positions == [float(i) for i in range(1, len(expected) + 1)]
+        assert self.ids(populated.get_all()) == expected
+
+    def test_sorted_index_bulk_load(self):
+        """Test that keys loaded at construction behave like added keys."""
+        keys = [(i * 7919 % 1500, i % 3) for i in range(3000)]
+        loaded = SortedIndex(keys)
+        added = SortedIndex()
+        for key in keys:
+            added.add(key)
+
+        assert list(loaded) == list(added) == sorted(set(keys))
+        assert len(loaded) == len(set(keys))
+        assert loaded.after((700, 0), 5) == added.after((700, 0), 5)
+        assert loaded.before((3, 1), 10) == added.before((3, 1), 10)
+        loaded.add((-1, 0))
+        assert loaded.discard((1499, 2)) == ((1499, 2) in added)
+        assert next(iter(loaded)) == (-1, 0)
+
+
+class TestInMemoryTodoRepositoryTags:
+    """Test suite for filtering todos by tag."""
+
+    @pytest.fixture
+    def tagged(self, repository):
+        """Repository with todos 1..4 tagged work / home / (work, urgent) / none."""
+        for title, tags in [
+            ("report", ("work",)),
+            ("dishes", ("home",)),
+            ("deploy", ("work", "urgent")),
+            ("walk", ()),
+        ]:
+            repository.create(TodoCreate(title=title, tags=tags))
+        return repository
+
+    @staticmethod
+    def ids(todos):
+        return [t.id for t in todos]
+
+    def test_bitmap_matches_set_operations(self):
+        """Test Bitmap against Python sets across chunk boundaries."""
+        a_ids = {0, 5, 1023, 1024, 4096, 100_000}
+        b_ids = {5, 1024, 2048, 100_000, 100_001}
+        a, b = Bitmap(a_ids), Bitmap(b_ids)
+
+        assert list(a & b) == sorted(a_ids & b_ids)
+        assert list(a | b) == sorted(a_ids | b_ids)
+        assert len(a) == len(a_ids)
+        assert 1023 in a and 1025 not in a
+
+        for todo_id in a_ids:
+            a.discard(todo_id)
+        assert not a
+        assert list(a | b) == sorted(b_ids)
+
+    def test_tags_are_normalized(self, repository):
+        """Test that tags are stripped and deduplicated."""
+        todo = repository.create(TodoCreate(title="a", tags=(" work ", "work", "", "home")))
+        assert todo.tags == ("work", "home")
+
+    def test_filter_all_and_any(self, tagged):
+        """Test AND and OR filters."""
+        assert self.ids(tagged.get_all(tags=["work"])) == [1, 3]
+        assert self.ids(tagged.get_all(tags=["work", "urgent"])) == [3]
+        assert self.ids(tagged.get_all(tags=["home", "urgent"], tag_match=TagMatch.ANY)) == [2, 3]
+        assert tagged.get_all(tags=["work", "unknown"]) == []
+        assert self.ids(tagged.get_all(tags=["work", "unknown"], tag_match=TagMatch.ANY)) == [1, 3]
+
+    def test_filter_respects_status_and_position(self, tagged):
+        """Test that tag filters combine with status and list order."""
+        tagged.toggle_completed(1)
+        assert self.ids(tagged.get_all(status=TodoFilter.ACTIVE, tags=["work"])) == [3]
+
+        tagged.move(3, before_id=1)
+        assert self.ids(tagged.get_all(tags=["work"])) == [3, 1]
+        assert self.ids(tagged.get_all(order=SortOrder.DESC, tags=["work"])) == [1, 3]
+
+    def test_update_and_delete_maintain_index(self, tagged):
+        """Test that replacing tags and deleting todos update the counts."""
+        assert tagged.get_tags() == {"home": 1, "urgent": 1, "work": 2}
+
+        tagged.update(3, TodoUpdate(tags=("home",)))
+        tagged.update(1, TodoUpdate(title="renamed"))
+        assert self.ids(tagged.get_all(tags=["home"])) == [2, 3]
+        assert tagged.get_tags() == {"home": 2, "work": 1}
+
+        tagged.delete(1)
+        assert tagged.get_all(tags=["work"]) == []
+        assert tagged.get_tags() == {"home": 2}
+
+    def test_archived_todos_leave_index(self, tagged):
+        """Test that archiving removes tags and restoring brings them back."""
+        tagged.toggle_completed(3)
+        popped = tagged.pop_completed_before(cutoff=float("inf"), limit=10)
+        assert "urgent" not in tagged.get_tags()
+
+        tagged.restore(popped)
+        assert self.ids(tagged.get_all(tags=["urgent"])) == [3]
+
+
+class TestInMemoryTodoRepositoryBulk:
+    """Test suite for batch iteration and bulk creation."""
+
+    def test_iter_batches(self, repository):
+        """Test that batches cover all todos in creation order."""
+        for i in range(7):
+            repository.create(TodoCreate(title=f"todo {i}"))
+        repository.toggle_completed(3)
+        repository.delete(5)
+
+        batches = list(repository.iter_batches(batch_size=3))
+        assert [[t.id for t in b] for b in batches] == [[1, 2, 3], [4, 6, 7]]
+
+    def test_iter_batches_tolerates_writes(self, repository):
+        """Test that writes between batches do not break iteration."""
+        for i in range(4):
+            repository.create(TodoCreate(title=f"todo {i}"))
+
+        batches = repository.iter_batches(batch_size=2)
+        first = next(batches)
+        repository.delete(3)
+        repository.create(TodoCreate(title="new"))
+        rest = [t.id for b in batches for t in b]
+
+        assert [t.id for t in first] == [1, 2]
+        assert rest == [4, 5]
+
+    def test_create_many(self, repository):
+        """Test bulk creation keeps ids and status indexes consistent."""
+        count = repository.create_many(
+            [TodoImport(title="a"), TodoImport(title="b", completed=True)]
+        )
+
+        assert count == 2
+        assert [t.id for t in repository.get_all()] == [1, 2]
+        assert [t.id for t in repository.get_all(status=TodoFilter.COMPLETED)] == [2]
+        assert repository.create(TodoCreate(title="c")).id == 3
+
+
+class TestInMemoryTodoRepositoryChanges:
+    """Test suite for the change log used by delta sync."""
+
+    def test_changes_are_collapsed_per_todo(self, repository):
+        """Test that each todo appears once with its net change."""
+        kept = repository.create(TodoCreate(title="kept"))
+        removed = repository.create(TodoCreate(title="removed"))
+        since = repository.get_version()
+
+        repository.toggle_completed(kept.id)
+        repository.update(kept.id, TodoUpdate(title="renamed"))
+        repository.delete(removed.id)
+        transient = repository.create(TodoCreate(title="transient"))
+        repository.delete(transient.id)
+        added = repository.create(TodoCreate(title="added"))
+        repository.toggle_completed(added.id)
+
+        changes = repository.get_changes(since)
+        assert [(c.kind, c.todo_id) for c in changes] == [
+            (ChangeKind.UPDATE, kept.id),
+            (ChangeKind.DELETE, removed.id),
+            (ChangeKind.CREATE, added.id),
+        ]
+        assert changes[0].todo.title == "renamed"
+        assert changes[2].todo.completed is True
+        assert changes[1].todo is None
+
+    def test_no_changes(self, repository):
+        """Test that an up-to-date cursor yields an empty list."""
+        repository.create(TodoCreate(title="a"))
+        assert repository.get_changes(repository.get_version()) == []
+
+    def test_stale_cursor_requires_reload(self):
+        """Test that a cursor older than the log returns None."""
+        repository = InMemoryTodoRepository(max_changes=3)
+        for i in range(5):
+            repository.create(TodoCreate(title=f"todo {i}"))
+
+        assert repository.get_changes(0) is None
+        assert repository.get_changes(repository.get_version() + 1) is None
+        assert [c.todo_id for c in repository.get_changes(2)] == [3, 4, 5]
+
+
+class TestInMemoryTodoRepositoryArchiving:
+    """Test suite for removing old completed todos."""
+
+    def test_pop_completed_before_in_completion_order(self, repository):
+        """Test that todos come out in the order they were completed."""
+        for i in range(4):
+            repository.create(TodoCreate(title=f"todo {i}"))
+        for todo_id in (3, 1, 4):
+            repository.toggle_completed(todo_id)
+        repository.toggle_completed(1)
+        repository.toggle_completed(1)
+
+        popped = repository.pop_completed_before(cutoff=float("inf"), limit=2)
+        assert [todo.id for todo, _ in popped] == [3, 4]
+        assert [t.id for t in repository.get_all()] == [1, 2]
+
+        assert repository.pop_completed_before(cutoff=0, limit=10) == []
+
+    def test_restore(self, repository):
+        """Test that restored todos are back in their place in the list."""
+        for i in range(3):
+            repository.create(TodoCreate(title=f"todo {i}"))
+        repository.toggle_completed(1)
+        popped = repository.pop_completed_before(cutoff=float("inf"), limit=10)
+
+        repository.restore(popped)
+        assert [t.id for t in repository.get_all()] == [1, 2, 3]
+        assert [t.id for t in repository.get_all(status=TodoFilter.COMPLETED)] == [1]
+        assert repository.pop_completed_before(cutoff=float("inf"), limit=10) == popped
+
+    def test_next_id(self):
+        """Test that ids can continue after archived ones."""
+        repository = InMemoryTodoRepository(next_id=42)
+        assert repository.create(TodoCreate(title="a")).id == 42
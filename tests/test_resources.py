@@ -0,0 +1,73 @@
+"""Tests for lifespan-managed application resources."""
+
+import pytest
+from litestar import Litestar, get
+from litestar.contrib.jinja import JinjaTemplateEngine
+from litestar.di import Provide
+from litestar.template.config import TemplateConfig
+from litestar.testing import TestClient
+
+from hello_litestar_htmx.resources import AppResources, ResourceRegistry
+from hello_litestar_htmx.services.todo import TodoService
+
+seen: list[TodoService] = []
+
+
+@get("/service", sync_to_thread=False)
+def record_service(todo_service: TodoService) -> str:
+    seen.append(todo_service)
+    return "ok"
+
+
+def make_app(registry: ResourceRegistry) -> Litestar:
+    return Litestar(
+        route_handlers=[record_service],
+        template_config=TemplateConfig(directory="templates", engine=JinjaTemplateEngine),
+        dependencies={
+            "todo_service": Provide(registry.provide_todo_service, sync_to_thread=False)
+        },
+        lifespan=[registry.lifespan],
+    )
+
+
+class TestResourcesLifespan:
+    """Test suite for the lifespan-managed resource registry."""
+
+    def test_service_is_shared_between_requests(self):
+        """Test that every request receives the same TodoService."""
+        seen.clear()
+        registry = ResourceRegistry()
+        with TestClient(app=make_app(registry)) as client:
+            client.get("/service")
+            client.get("/service")
+            resources = registry.current
+
+        assert seen == [resources.todo_service, resources.todo_service]
+        assert seen[0].repository is resources.repository
+
+    def test_resources_are_released_on_shutdown(self):
+        """Test that resources exist only while the app is running."""
+        registry = ResourceRegistry()
+        with TestClient(app=make_app(registry)):
+            assert isinstance(registry.current, AppResources)
+        assert registry.resources is None
+        with pytest.raises(RuntimeError, match="lifespan"):
+            registry.provide_todo_service()
+
+    def test_nested_lifespan_shares_resources(self):
+        """Test that a nested startup reuses and keeps the outer resources."""
+        registry = ResourceRegistry()
+        app = make_app(registry)
+        with TestClient(app=app):
+            outer = registry.current
+            with TestClient(app=app):
+                assert registry.current is outer
+            assert registry.current is outer
+
+    def test_warm_compiles_templates(self):
+        """Test that warming loads every page template."""
+        app = make_app(ResourceRegistry())
+        count = AppResources().warm(app)
+        assert count >= 5
+        cache = app.template_engine.engine.cache
+        assert any(key[1] == "todos.html" for key in cache)
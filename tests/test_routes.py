@@ -1,10 +1,21 @@
 """Tests for route handlers."""
 
+import csv
+import io
+import json
+import re
+import tempfile
+import time
+
 import pytest
 from litestar import Litestar
+from litestar.exceptions import WebSocketDisconnect
 from litestar.testing import TestClient
 
-from hello_litestar_htmx.app import app
+from hello_litestar_htmx.app import app, resources
+from hello_litestar_htmx.models.todo import TodoCreate
+from hello_litestar_htmx.repositories.archive import ArchiveConfig
+from hello_litestar_htmx.routes import todos as todos_routes
 
 
 @pytest.fixture
@@ -53,6 +64,51 @@ class TestTodoRoutes:
         # Partial template should not have full page structure
         assert "<html>" not in response.text.lower()
 
+    def test_get_todos_filtered(self, client):
+        """Test the status and order query parameters."""
+        get_response = client.get("/todos")
+        csrf_token = get_response.cookies.get("csrf_token")
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "x-csrftoken": csrf_token,
+        }
+        client.post("/todos", data={"title": "未完了のTodo"}, headers=headers)
+        done = client.post("/todos", data={"title": "完了したTodo"}, headers=headers)
+        todo_id = done.text.split('id="todo-')[1].split('"')[0]
+        client.post(f"/todos/{todo_id}/toggle", headers={"x-csrftoken": csrf_token})
+
+        response = client.get("/todos?status=completed&order=desc")
+        assert response.status_code == 200
+        assert "完了したTodo" in response.text
+        assert "未完了のTodo" not in response.text
+
+        response = client.get("/todos?status=active")
+        assert "未完了のTodo" in response.text
+        assert "完了したTodo" not in response.text
+
+    @pytest.mark.parametrize(("order", "swap", "toggle"), [
+        ("asc", "beforeend", "逆順にする"),
+        ("desc", "afterbegin", "元の並び順に戻す"),
+    ])
+    def test_add_form_follows_order(self, client, order, swap, toggle):
+        """Test that new todos are inserted where the list order puts them."""
+        page = client.get(f"/todos?order={order}")
+        assert f'hx-swap="{swap}"' in page.text
+        assert f'<input type="hidden" name="order" value="{order}">' in page.text
+        assert toggle in page.text
+
+        headers = {"x-csrftoken": page.cookies.get("csrf_token")}
+        for title in ("追加", ""):
+            response = client.post("/todos", data={"title": title, "order": order}, headers=headers)
+            form = response.text[response.text.index('<form id="todo-form"') :]
+            assert f'hx-swap="{swap}"' in form
+            assert f'name="order" value="{order}"' in form
+
+    def test_get_todos_invalid_filter(self, client):
+        """Test that an unknown status value is rejected."""
+        response = client.get("/todos?status=unknown")
+        assert response.status_code == 400
+
     def test_create_todo(self, client):
         """Test creating a new todo."""
         # CSRFトークンを取得
@@ -88,6 +144,40 @@ class TestTodoRoutes:
         )
         # Should return error template
         assert "タイトルを入力してください" in response.text
+        # The add form is swapped out of band with a fresh idempotency key
+        assert 'id="todo-form" hx-post="/todos"' in response.text
+
+    def test_create_todo_strips_title(self, client):
+        """Test that the typed form path strips surrounding whitespace."""
+        get_response = client.get("/todos")
+        csrf_token = get_response.cookies.get("csrf_token")
+
+        response = client.post(
+            "/todos",
+            data={"title": "  前後に空白  "},
+            headers={
+                "Content-Type": "application/x-www-form-urlencoded",
+                "x-csrftoken": csrf_token,
+            },
+        )
+        assert response.status_code == 201
+        assert ">前後に空白<" in response.text
+
+    def test_create_todo_title_too_long(self, client):
+        """Test creating a todo with a title over the length limit."""
+        get_response = client.get("/todos")
+        csrf_token = get_response.cookies.get("csrf_token")
+
+        response = client.post(
+            "/todos",
+            data={"title": "a" * 201},
+            headers={
+                "Content-Type": "application/x-www-form-urlencoded",
+                "x-csrftoken": csrf_token,
+            },
+        )
+        assert response.status_code == 200
+        assert "at most 200 characters" in response.text
 
     def test_toggle_todo(self, client):
         """Test toggling a todo's completion status."""
@@ -147,6 +237,119 @@ class TestTodoRoutes:
         assert delete_response.status_code == 200
         assert delete_response.text == ""
 
+    @pytest.mark.parametrize(
+        ("order", "prev_id", "next_id", "expected"),
+        [
+            ("asc", 1, 2, [1, 3, 2]),
+            ("asc", None, 1, [3, 1, 2]),
+            ("desc", 2, 1, [1, 3, 2]),
+            ("desc", 1, None, [3, 1, 2]),
+        ],
+    )
+    def test_move_todo(self, client, order, prev_id, next_id, expected):
+        """Test that a dragged todo lands between its displayed neighbours."""
+        csrf_token = client.get("/todos").cookies.get("csrf_token")
+        headers = {"x-csrftoken": csrf_token}
+        ids = []
+        for title in ("一", "二", "三"):
+            response = client.post("/todos", data={"title": title}, headers=headers)
+            ids.append(int(re.search(r'id="todo-(\d+)"', response.text).group(1)))
+
+        form = {"order": order}
+        if prev_id is not None:
+            form["prev_id"] = ids[prev_id - 1]
+        if next_id is not None:
+            form["next_id"] = ids[next_id - 1]
+        response = client.post(f"/todos/{ids[2]}/move", data=form, headers=headers)
+        assert response.status_code == 204
+
+        page = client.get("/todos").text
+        listed = [int(i) for i in re.findall(r'id="todo-(\d+)"', page)]
+        assert listed == [ids[i - 1] for i in expected]
+        assert 'data-sortable data-order="asc"' in page
+
+    def test_move_missing_todo(self, client):
+        """Test that moving a deleted todo returns 404."""
+        csrf_token = client.get("/todos").cookies.get("csrf_token")
+        response = client.post(
+            "/todos/999/move", data={"order": "asc"}, headers={"x-csrftoken": csrf_token}
+        )
+        assert response.status_code == 404
+
+    def test_update_todo(self, client):
+        """Test that PATCH changes only the submitted fields."""
+        page = client.get("/todos")
+        headers = {"x-csrftoken": page.cookies.get("csrf_token")}
+        created = client.post("/todos", data={"title": "更新前", "tags": "a"}, headers=headers)
+        todo_id = created.text.split('id="todo-')[1].split('"')[0]
+
+        response = client.patch(
+            f"/todos/{todo_id}", data={"title": "更新後", "completed": "true"}, headers=headers
+        )
+        assert response.status_code == 200
+        assert "更新後" in response.text
+        assert "completed" in response.text.split(">", 1)[0]
+        assert "#a" in response.text
+
+        response = client.patch(f"/todos/{todo_id}", data={"tags": ""}, headers=headers)
+        assert "#a" not in response.text and "更新後" in response.text
+
+    def test_update_todo_errors(self, client):
+        """Test validation errors and missing todos on PATCH."""
+        page = client.get("/todos")
+        headers = {"x-csrftoken": page.cookies.get("csrf_token")}
+        created = client.post("/todos", data={"title": "そのまま"}, headers=headers)
+        todo_id = created.text.split('id="todo-')[1].split('"')[0]
+
+        response = client.patch(f"/todos/{todo_id}", data={"title": "   "}, headers=headers)
+        assert response.status_code == 200
+        assert "タイトルを入力してください" in response.text
+        assert response.headers["hx-retarget"] == "#error-message"
+        assert "そのまま" in client.get("/todos").text
+
+        response = client.patch("/todos/999999", data={"title": "x"}, headers=headers)
+        assert response.status_code == 404
+
+    def test_add_todo_with_due_time(self, client):
+        """Test that a due time from the form is shown and reminders are subscribed to."""
+        page = client.get("/todos")
+        assert 'sse-connect="/todos/reminders"' in page.text
+        assert 'name="due_at"' in page.text
+
+        response = client.post(
+            "/todos",
+            data={"title": "期限つき", "due_at": "2030-01-02T03:04"},
+            headers={"x-csrftoken": page.cookies.get("csrf_token")},
+        )
+        assert response.status_code == 201
+        assert "⏰ 01/02 03:04" in response.text
+
+    def test_filter_by_tags(self, client):
+        """Test tag chips and the tag / match query parameters."""
+        page = client.get("/todos")
+        assert 'name="tags"' in page.text
+        headers = {"x-csrftoken": page.cookies.get("csrf_token")}
+        for title, tags in [("タグA", "alpha"), ("タグB", "beta"), ("タグAB", "alpha、beta")]:
+            response = client.post("/todos", data={"title": title, "tags": tags}, headers=headers)
+            assert response.status_code == 201
+        assert "#alpha" in response.text
+
+        both = client.get("/todos?tag=alpha&tag=beta")
+        assert "タグAB" in both.text
+        assert "タグA<" not in both.text and "タグB<" not in both.text
+        assert 'id="todo-tags"' in both.text
+        assert "tag-chip selected" in both.text
+
+        either = client.get(
+            "/todos?tag=alpha&tag=beta&match=any", headers={"HX-Request": "true"}
+        )
+        assert all(title in either.text for title in ("タグA<", "タグB<", "タグAB<"))
+        # 絞り込み中は差分同期を止め、ステータスのリンクはタグを引き継ぐ
+        assert "/todos/changes" not in either.text
+        assert "status=active&order=asc&tag=alpha&amp;tag=beta&amp;match=any" in either.text
+
+        assert client.get("/todos?match=some").status_code == 400
+
     def test_delete_nonexistent_todo(self, client):
         """Test deleting a todo that doesn't exist."""
         # CSRFトークンを取得
@@ -159,3 +362,303 @@ class TestTodoRoutes:
             headers={"x-csrftoken": csrf_token},
         )
         assert response.status_code == 200
+
+
+class TestTodoTransferRoutes:
+    """Test suite for streaming import/export."""
+
+    @pytest.fixture
+    def csrf_headers(self, client):
+        get_response = client.get("/todos")
+        return {"x-csrftoken": get_response.cookies.get("csrf_token")}
+
+    def test_import_ndjson_and_export(self, client, csrf_headers):
+        """Test importing NDJSON and finding the rows in the export."""
+        body = '{"title": "インポートA"}\n{"title": "インポートB", "completed": true}\n'
+        response = client.post("/todos/import", content=body.encode(), headers=csrf_headers)
+        assert response.status_code == 201
+        assert response.json() == {"imported": 2}
+
+        export = client.get("/todos/export")
+        assert export.status_code == 200
+        assert export.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in export.text.splitlines()]
+        assert {"title": "インポートB", "completed": True} in [
+            {"title": row["title"], "completed": row["completed"]} for row in lines
+        ]
+
+    def test_import_csv_with_multiline_title(self, client, csrf_headers):
+        """Test that quoted CSV fields may span lines."""
+        body = 'id,title,completed\n1,"複数行\nのタイトル",true\n'
+        response = client.post(
+            "/todos/import?format=csv", content=body.encode(), headers=csrf_headers
+        )
+        assert response.json() == {"imported": 1}
+
+        export = client.get("/todos/export?format=csv")
+        assert export.text.startswith("id,title,completed,due_at,tags\n")
+        assert '"複数行\nのタイトル",true' in export.text
+
+    @pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+    def test_round_trip_keeps_due_time_and_tags(self, client, csrf_headers, fmt):
+        """Test that exported rows import back with their due time and tags."""
+        title = f"往復 {fmt}"
+        client.post(
+            "/todos",
+            data={"title": title, "due_at": "2030-01-02T03:04", "tags": "仕事, 急ぎ"},
+            headers=csrf_headers,
+        )
+
+        def exported_rows() -> list[dict]:
+            text = client.get(f"/todos/export?format={fmt}").text
+            if fmt == "csv":
+                rows = csv.DictReader(io.StringIO(text))
+            else:
+                rows = map(json.loads, text.splitlines())
+            return [{**row, "id": None} for row in rows if row["title"] == title]
+
+        export = client.get(f"/todos/export?format={fmt}").text.splitlines(keepends=True)
+        header = export[:1] if fmt == "csv" else []
+        body = "".join(header + [line for line in export if title in line])
+        response = client.post(
+            f"/todos/import?format={fmt}", content=body.encode(), headers=csrf_headers
+        )
+        assert response.json() == {"imported": 1}
+
+        original, imported = exported_rows()
+        assert imported == original
+        tags = "仕事,急ぎ" if fmt == "csv" else ["仕事", "急ぎ"]
+        assert original["tags"] == tags
+        assert original["due_at"].startswith("2030-01-02T03:04")
+
+    def test_import_has_no_size_limit(self, client, csrf_headers):
+        """Test that the streaming import accepts bodies larger than the job upload limit."""
+        padding = (b" " * 1023 + b"\n") * (todos_routes.IMPORT_MAX_BYTES // 1024 + 1)
+        body = padding + '{"title": "大きなファイル"}\n'.encode()
+        response = client.post("/todos/import", content=body, headers=csrf_headers)
+        assert response.status_code == 201
+        assert response.json() == {"imported": 1}
+
+    def test_import_invalid_row(self, client, csrf_headers):
+        """Test that an invalid row is reported with its line number."""
+        body = '{"title": "ok"}\n{"title": "   "}\n'
+        response = client.post("/todos/import", content=body.encode(), headers=csrf_headers)
+        assert response.status_code == 400
+        assert "line 2" in response.json()["detail"]
+        assert "タイトルを入力してください" in response.json()["detail"]
+
+    def test_import_invalid_utf8(self, client, csrf_headers):
+        """Test that a non-UTF-8 line is a 400 with its line number, not a 500."""
+        body = '{"title": "ok"}\n'.encode() + '{"title": "シフトJIS"}\n'.encode("shift_jis")
+        response = client.post("/todos/import", content=body, headers=csrf_headers)
+        assert response.status_code == 400
+        assert "line 2: invalid UTF-8" in response.json()["detail"]
+        assert response.json()["extra"]["imported"] == 0
+
+    def test_import_requires_csrf_token(self, client):
+        """Test that import is CSRF protected."""
+        response = client.post("/todos/import", content=b'{"title": "x"}\n')
+        assert response.status_code == 403
+
+
+class TestTodoChangesRoutes:
+    """Test suite for delta sync."""
+
+    @pytest.fixture
+    def csrf_headers(self, client):
+        get_response = client.get("/todos")
+        return {"x-csrftoken": get_response.cookies.get("csrf_token")}
+
+    def current_version(self, client):
+        page = client.get("/todos")
+        return int(re.search(r"/todos/changes\?since=(\d+)", page.text).group(1))
+
+    def test_changes_since_version(self, client, csrf_headers):
+        """Test that only todos changed after the cursor are returned."""
+        client.post("/todos", data={"title": "同期前"}, headers=csrf_headers)
+        since = self.current_version(client)
+        response = client.post("/todos", data={"title": "同期後"}, headers=csrf_headers)
+        todo_id = re.search(r'id="todo-(\d+)"', response.text).group(1)
+
+        changes = client.get(f"/todos/changes?since={since}")
+        assert changes.status_code == 200
+        assert "同期後" in changes.text
+        assert "同期前" not in changes.text
+        assert 'hx-swap-oob="beforeend"' in changes.text
+        assert f"since={since + 1}&order=asc" in changes.text
+
+        reversed_changes = client.get(f"/todos/changes?since={since}&order=desc")
+        assert 'hx-swap-oob="afterbegin"' in reversed_changes.text
+        assert f"since={since + 1}&order=desc" in reversed_changes.text
+
+        client.delete(f"/todos/{todo_id}", headers=csrf_headers)
+        deleted = client.get(f"/todos/changes?since={since + 1}")
+        assert f'<div id="todo-{todo_id}" hx-swap-oob="delete">' in deleted.text
+
+    def test_stale_cursor_refreshes(self, client):
+        """Test that a cursor from the future triggers a full reload."""
+        response = client.get(f"/todos/changes?since={self.current_version(client) + 100}")
+        assert response.status_code == 200
+        assert response.headers["hx-refresh"] == "true"
+
+
+class TestArchiveRoutes:
+    """Test suite for the archived todo pager."""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(resources, "archive_config", ArchiveConfig(directory=tmp_path))
+        with TestClient(app=app) as test_client:
+            yield test_client
+
+    def test_archive_pager(self, client, monkeypatch):
+        """Test showing archived todos page by page."""
+        monkeypatch.setattr(todos_routes, "ARCHIVE_PAGE_SIZE", 2)
+        service = resources.current.todo_service
+        for i in range(3):
+            todo = service.create_todo(TodoCreate(title=f"アーカイブ{i}"))
+            service.toggle_todo_completed(todo.id)
+        assert client.blocking_portal.call(service.archive_completed, -1) == 3
+
+        page = client.get("/todos")
+        assert "アーカイブを表示（3件）" in page.text
+        assert "アーカイブ0" not in page.text
+
+        first = client.get("/todos/archive")
+        assert "アーカイブ2" in first.text and "アーカイブ1" in first.text
+        assert "/todos/archive?offset=2" in first.text
+
+        second = client.get("/todos/archive?offset=2")
+        assert "アーカイブ0" in second.text
+        assert "さらに表示" not in second.text
+
+
+class TestJobRoutes:
+    """Test suite for background job routes."""
+
+    @pytest.fixture
+    def csrf_headers(self, client):
+        get_response = client.get("/todos")
+        return {"x-csrftoken": get_response.cookies.get("csrf_token")}
+
+    @staticmethod
+    def poll(client, fragment: str) -> str:
+        job_id = fragment.split('id="job-')[1].split('"')[0]
+        for _ in range(100):
+            fragment = client.get(f"/jobs/{job_id}").text
+            if "every 1s" not in fragment:
+                return fragment
+            time.sleep(0.01)
+        raise AssertionError("job did not finish")
+
+    def test_import_job(self, client, csrf_headers):
+        """Test that a background import polls until it finishes."""
+        body = '{"title": "ジョブA"}\n{"title": "ジョブB"}\n'
+        response = client.post("/todos/import/jobs", content=body.encode(), headers=csrf_headers)
+        assert response.status_code == 202
+        assert 'hx-trigger="every 1s"' in response.text
+
+        assert "2件のTodoをインポートしました" in self.poll(client, response.text)
+        assert "ジョブB" in client.get("/todos").text
+
+    def test_import_job_rejects_large_upload(self, client, csrf_headers):
+        """Test that uploads over the size limit are refused before a job starts."""
+        body = b"x" * (todos_routes.IMPORT_MAX_BYTES + 1)
+        response = client.post("/todos/import/jobs", content=body, headers=csrf_headers)
+        assert response.status_code == 413
+
+    def test_import_job_closes_upload_on_error(self, client, csrf_headers, monkeypatch):
+        """Test that the spooled upload is closed if the job cannot be enqueued."""
+        uploads = []
+        original = tempfile.TemporaryFile
+
+        def temporary_file():
+            uploads.append(original())
+            return uploads[-1]
+
+        def fail(*args):
+            raise RuntimeError("queue full")
+
+        monkeypatch.setattr(tempfile, "TemporaryFile", temporary_file)
+        monkeypatch.setattr(resources.current.todo_service, "enqueue_import", fail)
+        response = client.post("/todos/import/jobs", content=b"{}\n", headers=csrf_headers)
+        assert response.status_code == 500
+        assert uploads[0].closed
+
+    def test_clear_completed_job(self, client, csrf_headers):
+        """Test clearing completed todos through a job."""
+        created = client.post(
+            "/todos",
+            data={"title": "完了して消える"},
+            headers={**csrf_headers, "Content-Type": "application/x-www-form-urlencoded"},
+        )
+        todo_id = created.text.split('id="todo-')[1].split('"')[0]
+        client.post(f"/todos/{todo_id}/toggle", headers=csrf_headers)
+
+        response = client.post("/todos/clear-completed", headers=csrf_headers)
+        assert response.status_code == 202
+        assert "件削除しました" in self.poll(client, response.text)
+        assert "完了して消える" not in client.get("/todos").text
+
+    def test_unknown_job(self, client):
+        """Test polling a job that does not exist."""
+        assert client.get("/jobs/unknown").status_code == 404
+
+
+class TestLiveRoutes:
+    """Test suite for the live WebSocket channel."""
+
+    @pytest.fixture
+    def csrf_token(self, client):
+        return client.get("/todos/live").cookies.get("csrf_token")
+
+    def test_live_page(self, client):
+        """Test that the live page connects through the ws extension."""
+        response = client.get("/todos/live")
+        assert response.status_code == 200
+        assert 'hx-ext="ws"' in response.text
+        assert "ws-connect=" in response.text
+
+    def test_rejects_missing_csrf_token(self, client, csrf_token):
+        """Test that the handshake requires the CSRF token."""
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect("/todos/ws"):
+                pass
+
+    def test_rejects_mismatched_csrf_token(self, client, csrf_token):
+        """Test that the query token must match the cookie."""
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect("/todos/ws?csrf_token=invalid"):
+                pass
+
+    def test_create_toggle_delete(self, client, csrf_token):
+        """Test mutations over one connection."""
+        with client.websocket_connect(f"/todos/ws?csrf_token={csrf_token}") as ws:
+            ws.send_json({"action": "create", "title": "ライブTodo", "HEADERS": {}})
+            created = ws.receive_text()
+            assert 'id="todo-list" hx-swap-oob="beforeend"' in created
+            assert "ライブTodo" in created
+            todo_id = re.search(r'id="todo-(\d+)"', created).group(1)
+
+            ws.send_json({"action": "toggle", "id": todo_id})
+            toggled = ws.receive_text()
+            assert f'id="todo-{todo_id}"' in toggled
+            assert "checked" in toggled
+
+            ws.send_json({"action": "delete", "id": todo_id})
+            assert f'id="todo-{todo_id}" hx-swap-oob="delete"' in ws.receive_text()
+
+    def test_invalid_messages(self, client, csrf_token):
+        """Test that invalid input is answered with an error fragment."""
+        with client.websocket_connect(f"/todos/ws?csrf_token={csrf_token}") as ws:
+            ws.send_json({"action": "create", "title": "   "})
+            reply = ws.receive_text()
+            assert "タイトルを入力してください" in reply
+            # ライブ画面の追加フォームは差し替えない
+            assert 'id="todo-form"' not in reply
+
+            ws.send_text("not json")
+            assert "不正なメッセージです" in ws.receive_text()
+
+            ws.send_json({"action": "toggle", "id": 999999})
+            assert "Todoが見つかりません" in ws.receive_text()